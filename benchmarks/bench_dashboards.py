@@ -0,0 +1,173 @@
+"""
+Benchmark the /pc and /mdm dashboard loaders on synthetic repositories.
+
+Each loader is timed in separate phases (query, transform, figures, heatmap, serialize)
+at 10k, 100k and 1M rows against a SQLite stand-in built by synthetic.py.
+
+The query phase calls the real pc_jobs/mdm_jobs loaders (uncached), but db.read_frame is
+replaced by one that runs the SQLite translation of each query from synthetic.py, looked up
+by query name. It therefore measures the loaders and frame building, not SQL Server plans or
+the production query text; a loader query without a translation fails the run. The other
+phases are the production code as is. CACHE_DIR points at a temporary directory, so a run
+never touches the dashboard's cache.
+
+    python benchmarks/bench_dashboards.py --save before
+    python benchmarks/bench_dashboards.py --sizes 10000 100000 --baseline before
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+from datetime import datetime
+from time import perf_counter
+
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'usage'))
+sys.path.insert(0, os.path.join(HERE, '..'))
+os.environ['CACHE_DIR'] = tempfile.mkdtemp(prefix='bench-cache-')
+
+import synthetic  # noqa: E402
+# The SQLite job-group IN list has one placeholder per synthetic group
+os.environ['MDM_JOB_GROUPS'] = ','.join(synthetic.GROUPS)
+import db  # noqa: E402
+import pc_jobs  # noqa: E402
+import mdm_jobs  # noqa: E402
+
+QUERIES = {**synthetic.PC_QUERIES, **synthetic.MDM_QUERIES}
+
+DATA_DIR = os.path.join(HERE, 'data')
+RESULTS_DIR = os.path.join(HERE, 'results')
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+
+def ts(value):
+    return value.strftime(synthetic.TS_FORMAT) if isinstance(value, datetime) else value
+
+
+def sqlite_reader(conn):
+    """db.read_frame stand-in running the SQLite translation of the named query."""
+    def read_frame(conn_str, query, params=(), batch_size=0, name='query'):
+        sql = QUERIES[name]
+        return pd.read_sql(sql, conn, params=tuple(ts(p) for p in params)[:sql.count('?')])
+    return read_frame
+
+
+def timed(phases, name, func, *args):
+    started = perf_counter()
+    result = func(*args)
+    phases[name] = phases.get(name, 0.0) + perf_counter() - started
+    return result
+
+
+def serialize(figures):
+    return sum(len(fig.to_json()) for fig in figures)
+
+
+def run_pc(conn):
+    phases = {}
+    db.read_frame = sqlite_reader(conn)
+
+    def query():
+        # __wrapped__ skips the result cache
+        pc_jobs.load_pc_kpis.__wrapped__(None)
+        return pc_jobs.fetch_pc_frames.__wrapped__(None)
+
+    df_today, df_sess_today, trend = timed(phases, 'query', query)
+    df_today, df_merged = timed(phases, 'transform', pc_jobs.transform_pc_frames, df_today, df_sess_today)
+    figures = timed(phases, 'figures', pc_jobs.build_pc_figures, df_today, df_merged, trend)
+    pivot_fig = timed(phases, 'heatmap', pc_jobs.build_pc_heatmap, df_merged)
+    phases['payload_bytes'] = timed(phases, 'serialize', serialize, list(figures) + [pivot_fig])
+    phases['detail_rows'] = len(df_merged)
+    return phases
+
+
+def run_mdm(conn):
+    phases = {}
+    db.read_frame = sqlite_reader(conn)
+
+    def query():
+        mdm_jobs.load_mdm_kpis.__wrapped__()
+        return mdm_jobs.fetch_mdm_frames.__wrapped__()
+
+    df_today, trend_df = timed(phases, 'query', query)
+    df_today = timed(phases, 'transform', mdm_jobs.transform_mdm_frames, df_today)
+    figures = timed(phases, 'figures', mdm_jobs.build_mdm_figures, df_today, trend_df)
+    phases['payload_bytes'] = timed(phases, 'serialize', serialize, figures)
+    phases['detail_rows'] = len(df_today)
+    return phases
+
+
+def run(sizes, repeat, days, rebuild):
+    os.makedirs(DATA_DIR, exist_ok=True)
+    results = {}
+    for size in sizes:
+        path = os.path.join(DATA_DIR, f'repository_{size}.sqlite')
+        if rebuild or not os.path.exists(path):
+            print(f"Generating {size:,} rows -> {path}")
+            synthetic.build_repository(path, size, days=days).close()
+        conn = synthetic.sqlite3.connect(path)
+        results[str(size)] = {}
+        for loader, func in (('pc', run_pc), ('mdm', run_mdm)):
+            samples = [func(conn) for _ in range(repeat)]
+            # Median of each phase across repeats
+            results[str(size)][loader] = {
+                phase: statistics.median(s[phase] for s in samples) for phase in samples[0]
+            }
+        conn.close()
+    return results
+
+
+def print_results(results, baseline=None):
+    print(f"\n{'rows':>9} {'loader':<6} {'phase':<10} {'seconds':>10} {'baseline':>10} {'change':>8}")
+    for size, loaders in results.items():
+        for loader, phases in loaders.items():
+            for phase, value in phases.items():
+                if phase in ('payload_bytes', 'detail_rows'):
+                    continue
+                base = (baseline or {}).get(size, {}).get(loader, {}).get(phase)
+                change = f"{(value - base) / base:+.0%}" if base else ''
+                base = f"{base:.3f}" if base is not None else ''
+                print(f"{int(size):>9,} {loader:<6} {phase:<10} {value:>10.3f} {base:>10} {change:>8}")
+            print(f"{int(size):>9,} {loader:<6} {'payload':<10} {phases['payload_bytes'] / 1024:>9.0f}K"
+                  f" ({phases['detail_rows']:,} detail rows)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--days', type=int, default=180, help='nights of history to generate')
+    parser.add_argument('--rebuild', action='store_true', help='regenerate the SQLite files')
+    parser.add_argument('--save', metavar='NAME', help='store results as results/NAME.json')
+    parser.add_argument('--baseline', metavar='NAME', help='compare against results/NAME.json')
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat, args.days, args.rebuild)
+
+    baseline = None
+    if args.baseline:
+        with open(os.path.join(RESULTS_DIR, f'{args.baseline}.json')) as f:
+            baseline = json.load(f)['results']
+    print_results(results, baseline)
+
+    if args.save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f'{args.save}.json')
+        with open(path, 'w') as f:
+            json.dump({
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'pandas': pd.__version__,
+                'results': results,
+            }, f, indent=2)
+        print(f"\nSaved {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+Benchmark usage.update_dashboard on generated multi-month usage files.
+
+Files follow the usage-server/monitor.py schema (Timestamp|Metric|Value|Threshold, one sample
+per metric per minute) for a grid of history spans and drive counts. For each file the callback
+is run end to end and the harness reports latency, peak memory and where the time goes.
+
+    python benchmarks/bench_usage.py --days 30 180 365 --drives 4 12 20
+    python benchmarks/bench_usage.py --days 730 --drives 20 --range "Last 6 hours" --top 30
+"""
+
+import argparse
+import cProfile
+import os
+import pstats
+import statistics
+import string
+import sys
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+from plotly.io.json import to_json_plotly
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'usage'))
+sys.path.insert(0, os.path.join(HERE, '..'))
+
+import usage  # noqa: E402
+
+DATA_DIR = os.path.join(HERE, 'data')
+GB = 1024 ** 3
+
+
+def build_usage_file(path, days, drives, seed=0):
+    """Write `days` of one-minute samples for CPU, memory and `drives` disks."""
+    rng = np.random.default_rng(seed)
+    minutes = days * 24 * 60
+    end = datetime.now().replace(second=0, microsecond=0)
+    stamps = pd.date_range(end=end, periods=minutes, freq='min').strftime('%Y.%m.%d %H:%M:%S')
+
+    daily = np.sin(np.arange(minutes) * 2 * np.pi / 1440)
+    series = [
+        ('CPU Usage', np.clip(35 + 25 * daily + rng.normal(0, 8, minutes), 0, 100).round(1), 100),
+        ('Memory Usage', ((0.6 + 0.1 * daily + rng.normal(0, 0.02, minutes)) * 64 * GB).astype(np.int64), 64 * GB),
+    ]
+    for letter in string.ascii_uppercase[2:2 + drives]:
+        total = int(rng.choice([100, 250, 500, 1000])) * GB
+        # Slow fill with periodic clean-ups
+        used = (0.4 + 0.5 * (np.arange(minutes) % (30 * 1440)) / (30 * 1440)) * total
+        series.append((f'{letter}: Free Space', (total - used).astype(np.int64), total))
+
+    # Interleave like the collector does: all metrics for a minute, then the next minute
+    frame = pd.DataFrame({
+        'Timestamp': np.repeat(stamps, len(series)),
+        'Metric': np.tile([name for name, _, _ in series], minutes),
+        'Value': np.column_stack([values for _, values, _ in series]).ravel(),
+        'Threshold': np.tile([threshold for _, _, threshold in series], minutes),
+    })
+    frame.to_csv(path, sep='|', index=False)
+    return len(frame)
+
+
+def time_by_package(stats):
+    """Own time grouped by top-level package (pandas, plotly, numpy, usage, ...)."""
+    totals = defaultdict(float)
+    for (filename, _, _), (_, _, tottime, _, _) in stats.stats.items():
+        path = filename.replace('\\', '/')
+        if '/site-packages/' in path:
+            package = path.split('/site-packages/')[1].split('/')[0]
+        elif path.startswith('~') or path.startswith('<'):
+            package = 'builtins'
+        else:
+            package = os.path.splitext(os.path.basename(path))[0]
+        totals[package] += tottime
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def run_callback(path, selected_range):
+    """The callback plus the JSON encoding Dash does before sending the response."""
+    outputs = usage.update_dashboard(selected_range, path)
+    return len(to_json_plotly(outputs))
+
+
+def bench_file(path, selected_range, repeat, top):
+    latencies = []
+    for _ in range(repeat):
+        started = perf_counter()
+        payload = run_callback(path, selected_range)
+        latencies.append(perf_counter() - started)
+
+    tracemalloc.start()
+    run_callback(path, selected_range)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    profiler = cProfile.Profile()
+    profiler.runcall(run_callback, path, selected_range)
+    stats = pstats.Stats(profiler)
+
+    print(f"  latency  median {statistics.median(latencies):.2f}s  min {min(latencies):.2f}s  max {max(latencies):.2f}s")
+    print(f"  peak memory {peak / 1024 ** 2:.0f} MB, response {payload / 1024:.0f} KB")
+    print("  own time by package:")
+    for package, seconds in time_by_package(stats)[:8]:
+        print(f"    {package:<20} {seconds:7.2f}s")
+    if top:
+        print(f"  top {top} functions by cumulative time:")
+        stats.sort_stats('cumulative').print_stats(top)
+    return statistics.median(latencies), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--days', type=int, nargs='+', default=[30, 180, 365])
+    parser.add_argument('--drives', type=int, nargs='+', default=[4, 12, 20])
+    parser.add_argument('--range', dest='selected_range', default='All', choices=list(usage.TIME_OPTIONS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--top', type=int, default=0, help='also print the top N functions')
+    parser.add_argument('--rebuild', action='store_true', help='regenerate the usage files')
+    args = parser.parse_args()
+
+    os.makedirs(DATA_DIR, exist_ok=True)
+    summary = []
+    for days in args.days:
+        for drives in args.drives:
+            path = os.path.join(DATA_DIR, f'usage_{days}d_{drives}drives.csv')
+            if args.rebuild or not os.path.exists(path):
+                rows = build_usage_file(path, days, drives)
+                print(f"Generated {rows:,} rows -> {path}")
+            size_mb = os.path.getsize(path) / 1024 ** 2
+            print(f"\n{days} days, {drives} drives ({size_mb:.0f} MB), range {args.selected_range!r}")
+            latency, peak = bench_file(path, args.selected_range, args.repeat, args.top)
+            summary.append((days, drives, size_mb, latency, peak))
+
+    print(f"\n{'days':>5} {'drives':>6} {'file MB':>8} {'latency s':>10} {'peak MB':>8}")
+    for days, drives, size_mb, latency, peak in summary:
+        print(f"{days:>5} {drives:>6} {size_mb:>8.0f} {latency:>10.2f} {peak / 1024 ** 2:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+"""
+Synthetic PowerCenter and MDM repositories in SQLite for benchmarking the dashboard loaders.
+
+Generates stand-ins for REP_WFLOW_RUN, REP_SESS_LOG and the C_REPOS_JOB_* tables, with
+runs spread over the nights of the last `days` days, and the SQLite translations of the
+queries in usage/pc_jobs.py and usage/mdm_jobs.py.
+"""
+
+import os
+import sqlite3
+from datetime import datetime, timedelta
+import numpy as np
+
+FOLDERS = 5
+WORKFLOWS_PER_FOLDER = 20
+SESSIONS_PER_RUN = 5
+TS_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+GROUPS = [
+    'StgBatchGroupAD', 'BOBatchGroupAD',
+    'StgBatchGroupSAP', 'BOBatchGroupSap',
+    'StgBatchGroupWorkday', 'BOBatchGroupWorkday',
+    'BOBatchGroup_SRC_ID_SAPNO_FLAG_LDG_STG_BO',
+    'TokenMatchMergeGrp'
+]
+DISPLAYS = [
+    "Party", "Party Relationship", "Party Source ID", "Party Status", "Party Postal Address",
+    "Postal Address", "Party Electronic Address", "Party Phone Communication", "STG_PARTY",
+    "STG_PARTY_REL", "Staging Party Source ID", "STG_PARTY_STATUS", "STG_PARTY_POSTAL_ADD",
+    "STG_POSTAL_ADD", "STG_PARTY_ETRC_ADD", "STG_PARTY_PH_COMM", "STG_PARTY_WD",
+]
+
+SCHEMA = """
+CREATE TABLE REP_WFLOW_RUN (
+    SUBJECT_AREA TEXT, WORKFLOW_NAME TEXT, WORKFLOW_RUN_ID INTEGER PRIMARY KEY,
+    START_TIME TEXT, END_TIME TEXT, RUN_STATUS_CODE INTEGER,
+    RUN_ERR_CODE INTEGER, RUN_ERR_MSG TEXT, USER_NAME TEXT
+);
+CREATE TABLE REP_SESS_LOG (
+    SUBJECT_AREA TEXT, WORKFLOW_NAME TEXT, WORKFLOW_RUN_ID INTEGER, SESSION_NAME TEXT,
+    RUN_STATUS_CODE INTEGER, ACTUAL_START TEXT, SESSION_TIMESTAMP TEXT, SUCCESSFUL_ROWS INTEGER
+);
+CREATE TABLE C_REPOS_JOB_GROUP (ROWID_JOB_GROUP INTEGER PRIMARY KEY, JOB_GROUP_NAME TEXT);
+CREATE TABLE C_REPOS_JOB_GROUP_CONTROL (ROWID_JOB_GROUP_CONTROL INTEGER PRIMARY KEY, ROWID_JOB_GROUP INTEGER);
+CREATE TABLE C_REPOS_JOB_CONTROL (
+    ROWID_JOB_GROUP_CONTROL INTEGER, TABLE_DISPLAY_NAME TEXT, START_RUN_DATE TEXT,
+    END_RUN_DATE TEXT, RUN_STATUS INTEGER, STATUS_MESSAGE TEXT
+);
+CREATE TABLE C_REPOS_JOB_STATUS_TYPE (JOB_STATUS_CODE INTEGER PRIMARY KEY, JOB_STATUS_DESC TEXT);
+CREATE INDEX ix_wflow_start ON REP_WFLOW_RUN (START_TIME);
+CREATE INDEX ix_sess_start ON REP_SESS_LOG (ACTUAL_START);
+CREATE INDEX ix_job_start ON C_REPOS_JOB_CONTROL (START_RUN_DATE);
+CREATE INDEX ix_jgc_group ON C_REPOS_JOB_GROUP_CONTROL (ROWID_JOB_GROUP);
+"""
+
+
+def _timestamps(base, seconds):
+    return [(base + timedelta(seconds=float(s))).strftime(TS_FORMAT) for s in seconds]
+
+
+def build_repository(path, rows, days=180, seed=0):
+    """Create (or replace) a SQLite file with `rows` sessions and `rows` MDM job runs."""
+    if os.path.exists(path):
+        os.remove(path)
+    rng = np.random.default_rng(seed)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+
+    # Nights run from 22:00 the day before; the last one is today's batch window
+    today = datetime.combine(datetime.now().date(), datetime.min.time())
+    first_night = today - timedelta(days=days, hours=2)
+
+    # ---- PowerCenter: one workflow run per SESSIONS_PER_RUN sessions ----
+    runs = max(1, rows // SESSIONS_PER_RUN)
+    wf_index = rng.integers(0, FOLDERS * WORKFLOWS_PER_FOLDER, runs)
+    night = rng.integers(1, days + 1, runs)
+    start = night * 86400 + rng.uniform(0, 8 * 3600, runs)
+    sess_minutes = rng.exponential(4, (runs, SESSIONS_PER_RUN)) + 0.5
+    end = start + sess_minutes.sum(axis=1) * 60
+    status = rng.choice([1, 3, 4, 5, 2], runs, p=[0.9, 0.05, 0.02, 0.02, 0.01])
+    folders = [f"FOLDER_{i // WORKFLOWS_PER_FOLDER + 1}" for i in wf_index]
+    workflows = [f"wf_{i:03d}" for i in wf_index]
+
+    conn.executemany(
+        "INSERT INTO REP_WFLOW_RUN VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        zip(folders, workflows, range(1, runs + 1),
+            _timestamps(first_night, start), _timestamps(first_night, end), status.tolist(),
+            [0 if s == 1 else 36 for s in status], ['' if s == 1 else 'Session task failed' for s in status],
+            ['infa_batch'] * runs)
+    )
+
+    sess_start = start[:, None] + np.cumsum(sess_minutes, axis=1) * 60 - sess_minutes * 60
+    sess_end = sess_start + sess_minutes * 60
+    sess_status = np.where(rng.random((runs, SESSIONS_PER_RUN)) < 0.03, 3, 1)
+    sess_rows = rng.integers(0, 500000, (runs, SESSIONS_PER_RUN))
+    conn.executemany(
+        "INSERT INTO REP_SESS_LOG VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        zip(np.repeat(folders, SESSIONS_PER_RUN), np.repeat(workflows, SESSIONS_PER_RUN),
+            np.repeat(np.arange(1, runs + 1), SESSIONS_PER_RUN).tolist(),
+            [f"s_{w}_{k}" for w in workflows for k in range(SESSIONS_PER_RUN)],
+            sess_status.ravel().tolist(),
+            _timestamps(first_night, sess_start.ravel()), _timestamps(first_night, sess_end.ravel()),
+            sess_rows.ravel().tolist())
+    )
+
+    # ---- MDM: one group control per group and night, `rows` job runs ----
+    conn.executemany("INSERT INTO C_REPOS_JOB_GROUP VALUES (?, ?)", enumerate(GROUPS, 1))
+    conn.executemany(
+        "INSERT INTO C_REPOS_JOB_STATUS_TYPE VALUES (?, ?)",
+        [(1, 'RUN_STATUS|Completed'), (2, 'RUN_STATUS|Completed with errors'), (3, 'RUN_STATUS|Failed')]
+    )
+    controls = days * len(GROUPS)
+    conn.executemany(
+        "INSERT INTO C_REPOS_JOB_GROUP_CONTROL VALUES (?, ?)",
+        ((i + 1, i % len(GROUPS) + 1) for i in range(controls))
+    )
+    control = rng.integers(0, controls, rows)
+    job_night = control // len(GROUPS) + 1
+    job_start = job_night * 86400 + (control % len(GROUPS)) * 1800 + rng.uniform(0, 1800, rows)
+    job_end = job_start + rng.exponential(120, rows)
+    rejects = np.where(rng.random(rows) < 0.2, rng.integers(1, 1000, rows), 0)
+    run_status = rng.choice([1, 2, 3], rows, p=[0.9, 0.07, 0.03])
+    conn.executemany(
+        "INSERT INTO C_REPOS_JOB_CONTROL VALUES (?, ?, ?, ?, ?, ?)",
+        zip((control + 1).tolist(), rng.choice(DISPLAYS, rows).tolist(),
+            _timestamps(first_night, job_start), _timestamps(first_night, job_end), run_status.tolist(),
+            [f"Load completed with {r} rejected records" if r else "Load completed" for r in rejects])
+    )
+
+    conn.commit()
+    return conn
+
+
+STATUS_CASE = """CASE RUN_STATUS_CODE
+        WHEN 1 THEN 'Succeeded' WHEN 2 THEN 'Disabled' WHEN 3 THEN 'Failed' WHEN 4 THEN 'Stopped'
+        WHEN 5 THEN 'Aborted' WHEN 6 THEN 'Running' WHEN 15 THEN 'Terminated' ELSE 'Unknown'
+      END"""
+
+# SQLite translations of the pc_jobs queries (same filters, columns and grouping), keyed by the
+# name each loader passes to db.read_frame
+PC_QUERIES = {
+    'pc_kpis': f"""
+    SELECT {STATUS_CASE} AS Status, COUNT(*) AS Count,
+      SUM((julianday(END_TIME) - julianday(START_TIME)) * 1440) AS TotalDuration, COUNT(END_TIME) AS Timed
+    FROM REP_WFLOW_RUN
+    WHERE SUBJECT_AREA NOT IN ('Shared', 'Monitoring') AND START_TIME BETWEEN ? AND ?
+    GROUP BY RUN_STATUS_CODE
+    """,
+    'pc_kpis_sessions': """
+    SELECT COUNT(*) AS TotalSessions, COALESCE(SUM(CASE WHEN RUN_STATUS_CODE = 3 THEN 1 ELSE 0 END), 0) AS FailedSessions
+    FROM REP_SESS_LOG
+    WHERE SUBJECT_AREA NOT IN ('Shared', 'Monitoring') AND ACTUAL_START BETWEEN ? AND ?
+    """,
+    'pc_workflows': f"""
+    SELECT SUBJECT_AREA AS Folder, WORKFLOW_NAME AS Workflow, WORKFLOW_RUN_ID AS RunID, START_TIME, END_TIME,
+      CAST((julianday(END_TIME) - julianday(START_TIME)) * 1440 AS INTEGER) AS Duration,
+      {STATUS_CASE} AS Status, RUN_ERR_CODE AS ErrCode, RUN_ERR_MSG AS ErrMsg, USER_NAME AS UserName
+    FROM REP_WFLOW_RUN
+    WHERE START_TIME BETWEEN ? AND ? AND SUBJECT_AREA NOT IN ('Shared', 'Monitoring')
+    ORDER BY START_TIME DESC
+    """,
+    'pc_sessions': f"""
+    SELECT SUBJECT_AREA AS Folder, WORKFLOW_NAME AS Workflow, WORKFLOW_RUN_ID AS RunID, SESSION_NAME AS SessionName,
+      {STATUS_CASE} AS Status, ACTUAL_START AS ActualStart, SESSION_TIMESTAMP AS SessionEnd, SUCCESSFUL_ROWS AS SuccessfulRows
+    FROM REP_SESS_LOG
+    WHERE ACTUAL_START BETWEEN ? AND ? AND SUBJECT_AREA NOT IN ('Shared', 'Monitoring')
+    """,
+    'pc_trend': """
+    SELECT date(START_TIME) AS Date, COUNT(WORKFLOW_RUN_ID) AS total,
+      AVG((julianday(END_TIME) - julianday(START_TIME)) * 1440) AS avg_dur
+    FROM REP_WFLOW_RUN
+    WHERE START_TIME >= ? AND SUBJECT_AREA NOT IN ('Shared', 'Monitoring')
+    GROUP BY date(START_TIME) ORDER BY Date
+    """,
+    'pc_throughput': """
+    SELECT date(ACTUAL_START) AS Date, WORKFLOW_NAME AS Workflow, SESSION_NAME AS SessionName, COUNT(*) AS Runs,
+      SUM(SUCCESSFUL_ROWS) AS LoadedRows,
+      SUM((julianday(SESSION_TIMESTAMP) - julianday(ACTUAL_START)) * 1440) AS Minutes
+    FROM REP_SESS_LOG
+    WHERE ACTUAL_START >= ? AND RUN_STATUS_CODE = 1 AND SESSION_TIMESTAMP > ACTUAL_START
+      AND SUBJECT_AREA NOT IN ('Shared', 'Monitoring')
+    GROUP BY date(ACTUAL_START), WORKFLOW_NAME, SESSION_NAME ORDER BY Date
+    """,
+}
+
+JOBS_CTE = """
+    WITH jobs AS (
+        SELECT jg.JOB_GROUP_NAME AS GroupName, jc.TABLE_DISPLAY_NAME AS Display,
+          jc.START_RUN_DATE AS Start, jc.END_RUN_DATE AS "End",
+          substr(st.JOB_STATUS_DESC, instr(st.JOB_STATUS_DESC, '|') + 1) AS Status,
+          jc.STATUS_MESSAGE AS Message,
+          CASE WHEN jc.STATUS_MESSAGE LIKE '%rejected records%' THEN CAST(substr(
+            jc.STATUS_MESSAGE, instr(jc.STATUS_MESSAGE, 'with ') + 5,
+            instr(jc.STATUS_MESSAGE, ' rejected records') - (instr(jc.STATUS_MESSAGE, 'with ') + 5)) AS INTEGER)
+          ELSE 0 END AS Rejects
+        FROM C_REPOS_JOB_GROUP jg
+        LEFT JOIN C_REPOS_JOB_GROUP_CONTROL jgc ON jg.ROWID_JOB_GROUP = jgc.ROWID_JOB_GROUP
+        LEFT JOIN C_REPOS_JOB_CONTROL jc ON jgc.ROWID_JOB_GROUP_CONTROL = jc.ROWID_JOB_GROUP_CONTROL
+        LEFT JOIN C_REPOS_JOB_STATUS_TYPE st ON jc.RUN_STATUS = st.JOB_STATUS_CODE
+        WHERE jg.JOB_GROUP_NAME IN ({groups})
+    )
+""".format(groups=", ".join("?" * len(GROUPS)))
+
+# SQLite translations of the mdm_jobs queries
+MDM_QUERIES = {
+    'mdm_kpis': JOBS_CTE + """
+    SELECT j.Status, COUNT(*) AS Count, SUM(j.Rejects) AS Rejects,
+      SUM((julianday(j."End") - julianday(j.Start)) * 86400) AS TotalSeconds, COUNT(j."End") AS Timed,
+      SUM(CASE WHEN j.Message LIKE '%Error%' OR j.Message LIKE '%401%' OR j.Message LIKE '%Failed%'
+          THEN 1 ELSE 0 END) AS FailedJobs
+    FROM jobs j WHERE j.Start BETWEEN ? AND ? GROUP BY j.Status
+    """,
+    'mdm_jobs': JOBS_CTE + """
+    SELECT * FROM jobs j WHERE j.Start BETWEEN ? AND ?
+    """,
+    'mdm_trend': JOBS_CTE + """
+    SELECT date(j.Start) AS Date, COUNT(j.Display) AS total_jobs, SUM(j.Rejects) AS total_rejects,
+      AVG((julianday(j."End") - julianday(j.Start)) * 86400) AS avg_duration
+    FROM jobs j WHERE j.Start >= ? GROUP BY date(j.Start) ORDER BY Date
+    """,
+}
@@ -0,0 +1,6 @@
+"""
+Modules shared by the Teams monitor (infa/) and the dashboard (usage/).
+
+Each side puts the repository root on sys.path (pc_mdm_monitor.py, app.py) and imports them as
+`from common import instrument`.
+"""
@@ -0,0 +1,149 @@
+"""
+Streaming duration baselines for workflows, sessions and batch jobs.
+
+Every job keeps an exponentially weighted mean and variance of its duration, so a new run
+updates it in O(1) without reading any history. A run is flagged slow when it is more than
+BASELINE_SIGMAS standard deviations and at least BASELINE_MIN_EXCESS minutes over the job's usual
+duration, once the job has BASELINE_MIN_RUNS runs behind it. Only successful runs are learned
+from, so a hung run does not drag the baseline up. The same statistics track session row counts
+for the monitor's low-volume check (typical()).
+
+The Teams monitor (infa/) is the only writer: it learns every night's runs into its
+BASELINE_FILE, and the dashboard (usage/) reads that file to flag runs without learning from
+them.
+"""
+
+import json
+import math
+import os
+
+ALPHA = float(os.getenv("BASELINE_ALPHA", "0.1"))
+SIGMAS = float(os.getenv("BASELINE_SIGMAS", "3"))
+MIN_RUNS = int(os.getenv("BASELINE_MIN_RUNS", "5"))
+MIN_EXCESS = float(os.getenv("BASELINE_MIN_EXCESS", "5"))  # minutes
+
+
+def minutes_between(start, end):
+    if start is None or end is None:
+        return None
+    return (end - start).total_seconds() / 60
+
+
+class Baselines:
+    """Per-job [runs, mean, variance, last run start, [runs, mean, variance] before it] in a dict.
+
+    Loaded from and saved to the monitor's JSON file; the dashboard only reads it (read()).
+    """
+
+    def __init__(self, stats=None):
+        self.stats = {} if stats is None else stats
+        self.changed = False
+
+    def usual(self, key, minutes, started=None):
+        """The job's usual duration in minutes if `minutes` is slow for it, else None.
+
+        The last run learned from is judged against the baseline from before it, so it stays
+        flagged when the same window is summarized again.
+        """
+        return self._usual(self.stats.get(key), minutes, started)
+
+    @staticmethod
+    def _usual(entry, minutes, started):
+        if entry is None:
+            return None
+        runs, mean, variance = entry[4] if started == entry[3] else entry[:3]
+        if runs < MIN_RUNS:
+            return None
+        if minutes - mean > max(SIGMAS * math.sqrt(variance), MIN_EXCESS):
+            return mean
+        return None
+
+    def typical(self, key, started=None):
+        """The job's mean value once it has MIN_RUNS runs (from before the run at `started` if that was the last one learned)."""
+        entry = self.stats.get(key)
+        if entry is None:
+            return None
+        runs, mean, _variance = entry[4] if started == entry[3] else entry[:3]
+        return mean if runs >= MIN_RUNS else None
+
+    def has(self, key):
+        """True once the job has MIN_RUNS runs to judge a new one by."""
+        entry = self.stats.get(key)
+        return entry is not None and entry[0] >= MIN_RUNS
+
+    def observe(self, key, minutes, started, learn=True):
+        """Check a finished run against the baseline, then fold it in.
+
+        `started` is the run's ISO start time; a run not newer than the last one learned from is
+        only checked, so the same window can be summarized any number of times.
+        """
+        entry = self.stats.get(key)
+        usual = self._usual(entry, minutes, started)
+        if not learn or (entry is not None and started <= entry[3]):
+            return usual
+        if entry is None:
+            self.stats[key] = [1, minutes, 0.0, started, [0, 0.0, 0.0]]
+        else:
+            runs, mean, variance = entry[:3]
+            # Plain running average for the first runs, so the baseline warms up quickly
+            alpha = max(ALPHA, 1 / (runs + 1))
+            delta = minutes - mean
+            mean += alpha * delta
+            variance = (1 - alpha) * (variance + alpha * delta * delta)
+            self.stats[key] = [runs + 1, mean, variance, started, entry[:3]]
+        self.changed = True
+        return usual
+
+    def save(self, path):
+        if not self.changed:
+            return
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.stats, f)
+        os.replace(tmp, path)
+        self.changed = False
+
+
+def flag_frame(history, frame, keys, start, end, learn):
+    """Usual duration per DataFrame row (None unless the run was slower than usual).
+
+    `keys` is a per-row sequence, `learn` one too or a bool for every row, `start` and `end`
+    datetime columns; runs are observed oldest first and unfinished ones are skipped.
+    """
+    if isinstance(learn, bool):
+        learn = [learn] * len(frame)
+    minutes = ((frame[end] - frame[start]).dt.total_seconds() / 60).tolist()
+    starts = frame[start].tolist()
+    usual = [None] * len(minutes)
+    finished = [i for i, m in enumerate(minutes) if m == m]  # NaN for a missing start or end
+    for i in sorted(finished, key=starts.__getitem__):
+        usual[i] = history.observe(keys[i], minutes[i], starts[i].isoformat(), learn=learn[i])
+    return usual
+
+
+def slow_flags(history, keys, usual):
+    """'yes' or 'no' per run for "slower than usual", '' where the job has no baseline to judge by."""
+    return ['yes' if u is not None else 'no' if history.has(key) else '' for key, u in zip(keys, usual)]
+
+
+def load(path):
+    try:
+        with open(path) as f:
+            return Baselines(json.load(f))
+    except (OSError, ValueError):
+        return Baselines()
+
+
+_read = {}  # path -> (mtime, stats)
+
+
+def read(path):
+    """Baselines from `path` for flagging only, parsed again only when the file has changed."""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return Baselines()
+    cached = _read.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = _read[path] = (mtime, load(path).stats)
+    return Baselines(cached[1])
@@ -0,0 +1,153 @@
+"""
+Lightweight stage timing for the monitoring scripts.
+
+Spans record wall time per (stage, name) into fixed-bucket latency histograms plus a rolling
+window of recent samples, and the lot can be rendered in the Prometheus text format:
+
+    with instrument.span("query", "pc_workflows"):
+        ...
+
+    @instrument.timed("collector")
+    def check_pc_service(): ...
+
+    instrument.write_prometheus("pc_mdm_monitor.prom")
+
+A span costs two perf_counter calls, a bisect and a lock, so it is meant to stay on.
+"""
+
+import bisect
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+QUANTILES = (0.5, 0.95, 0.99)
+WINDOW = int(os.getenv("METRICS_WINDOW", "512"))  # recent samples kept per series
+
+_histograms = {}
+_lock = threading.Lock()
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "count", "errors", "recent")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.errors = 0
+        self.recent = deque(maxlen=WINDOW)
+
+    def observe(self, seconds, failed=False):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+        self.errors += failed
+        self.recent.append(seconds)
+
+    def quantiles(self):
+        ordered = sorted(self.recent)
+        if not ordered:
+            return {}
+        return {q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in QUANTILES}
+
+
+def observe(stage, name, seconds, failed=False):
+    """Record one duration for a (stage, name) series."""
+    key = (stage, name)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram()
+        histogram.observe(seconds, failed)
+
+
+@contextmanager
+def span(stage, name):
+    """Time the enclosed block; exceptions are counted as errors and re-raised."""
+    started = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        observe(stage, name, time.perf_counter() - started, failed)
+
+
+def timed(stage, name=None):
+    """Decorator form of span(); the series name defaults to the function name."""
+    def decorator(func):
+        series = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage, series):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def snapshot():
+    """Copy of the current series as {(stage, name): (counts, total, count, errors, quantiles)}."""
+    with _lock:
+        return {
+            key: (list(h.counts), h.total, h.count, h.errors, h.quantiles())
+            for key, h in _histograms.items()
+        }
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(stage, name, **extra):
+    pairs = {"stage": stage, "name": name, **extra}
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in pairs.items())
+
+
+def render_prometheus(prefix="monitoring"):
+    """All series in the Prometheus text exposition format (version 0.0.4)."""
+    series = sorted(snapshot().items())
+    metric = f"{prefix}_stage_duration_seconds"
+    lines = [
+        f"# HELP {metric} Wall time of monitoring stages.",
+        f"# TYPE {metric} histogram",
+    ]
+    for (stage, name), (counts, total, count, _, _) in series:
+        cumulative = 0
+        for bound, bucket in zip(BUCKETS + ("+Inf",), counts):
+            cumulative += bucket
+            lines.append(f"{metric}_bucket{{{_labels(stage, name, le=bound)}}} {cumulative}")
+        lines.append(f"{metric}_sum{{{_labels(stage, name)}}} {total:.6f}")
+        lines.append(f"{metric}_count{{{_labels(stage, name)}}} {count}")
+
+    recent = f"{prefix}_stage_recent_seconds"
+    lines += [
+        f"# HELP {recent} Quantiles over the last {WINDOW} samples of each stage.",
+        f"# TYPE {recent} gauge",
+    ]
+    for (stage, name), (_, _, _, _, quantiles) in series:
+        for q, value in quantiles.items():
+            lines.append(f"{recent}{{{_labels(stage, name, quantile=q)}}} {value:.6f}")
+
+    errors = f"{prefix}_stage_errors_total"
+    lines += [
+        f"# HELP {errors} Stages that raised an exception.",
+        f"# TYPE {errors} counter",
+    ]
+    for (stage, name), (_, _, _, failed, _) in series:
+        lines.append(f"{errors}{{{_labels(stage, name)}}} {failed}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path, prefix="monitoring"):
+    """Atomically write the metrics file, e.g. for the node_exporter textfile collector."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(render_prometheus(prefix))
+    os.replace(tmp, path)
@@ -0,0 +1,26 @@
+"""
+Settings the Teams monitor and the dashboard have to agree on.
+
+They are read by functions rather than at import, so each side can load its .env first.
+"""
+
+import os
+
+# The MDM job groups both sides report on when MDM_JOB_GROUPS is not set
+DEFAULT_MDM_JOB_GROUPS = (
+    "StgBatchGroupSAP,BOBatchGroupAD,StgBatchGroupAD,BOBatchGroupSap,TokenMatchMergeGrp,"
+    "BOBatchGroup_SRC_ID_SAPNO_FLAG_LDG_STG_BO,StgBatchGroupWorkday,BOBatchGroupWorkday"
+)
+
+
+def env_list(name, default):
+    """Comma-separated setting as a list, blanks dropped."""
+    return [item.strip() for item in os.getenv(name, default).split(",") if item.strip()]
+
+
+def mdm_job_groups():
+    """MDM_JOB_GROUPS as a list; an empty setting would match no job (and `IN ()` is not valid SQL)."""
+    groups = env_list("MDM_JOB_GROUPS", DEFAULT_MDM_JOB_GROUPS)
+    if not groups:
+        raise EnvironmentError("❌ MDM_JOB_GROUPS lists no job group; unset it for the default groups.")
+    return groups
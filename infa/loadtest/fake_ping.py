@@ -0,0 +1,29 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Stand-in for the `pmcmd pingservice` batch files used by check_pc_service.
+
+Behaviour is injected through environment variables:
+    FAKE_PING_LATENCY    seconds before answering (default 0)
+    FAKE_PING_FAIL_RATE  share of pings reporting the service down (default 0)
+    FAKE_PING_HANG_RATE  share of pings that hang past the 30 s timeout (default 0)
+"""
+
+import os
+import random
+import sys
+import time
+
+latency = float(os.getenv("FAKE_PING_LATENCY", "0"))
+fail_rate = float(os.getenv("FAKE_PING_FAIL_RATE", "0"))
+hang_rate = float(os.getenv("FAKE_PING_HANG_RATE", "0"))
+
+if random.random() < hang_rate:
+    time.sleep(3600)
+time.sleep(latency)
+
+print("Informatica(r) PMCMD, version [10.4.1 HotFix2], build [1214.0724], Windows 64-bit")
+if random.random() < fail_rate:
+    print("ERROR: Cannot connect to Integration Service [IS_MOCK].")
+    sys.exit(1)
+print("Integration Service is alive. Ping time is 0 ms.")
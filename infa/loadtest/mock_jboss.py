@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Local stand-in for the JBoss management API (and a Teams webhook sink) for load-testing the infa monitor.
+
+- POST /management speaks the JSON operations check_mdm_apps uses (read-children-names, read-resource)
+  behind HTTP digest auth, with injectable latency, HTTP failures, hung requests and failed deployments
+- POST /teams accepts webhook posts and counts them
+
+    python mock_jboss.py --port 9990 --deployments 200 --latency 2 --hang-rate 0.05
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REALM = "ManagementRealm"
+
+
+def md5(text):
+    return hashlib.md5(text.encode()).hexdigest()
+
+
+class MockConfig:
+    def __init__(self, deployments=10, latency=0.0, jitter=0.0, fail_rate=0.0, hang_rate=0.0,
+                 hang_seconds=60.0, failed_deployments=0.0, user="admin", password="admin"):
+        self.deployments = [f"app-{i:03d}.ear" for i in range(deployments)]
+        self.latency = latency
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.failed = set(random.sample(self.deployments, int(deployments * failed_deployments)))
+        self.user = user
+        self.password = password
+        self.nonces = set()
+        self.requests = 0
+        self.teams_posts = []
+        self.lock = threading.Lock()
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    config = None  # set by make_server
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, code, body=None, headers=None):
+        payload = json.dumps(body).encode() if body is not None else b""
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _authorized(self):
+        header = self.headers.get("Authorization", "")
+        if not header.startswith("Digest "):
+            return False
+        fields = {}
+        for part in header[len("Digest "):].split(","):
+            key, _, value = part.strip().partition("=")
+            fields[key] = value.strip('"')
+        if fields.get("nonce") not in self.config.nonces or fields.get("username") != self.config.user:
+            return False
+        ha1 = md5(f"{self.config.user}:{REALM}:{self.config.password}")
+        ha2 = md5(f"POST:{fields.get('uri')}")
+        if fields.get("qop"):
+            expected = md5(f"{ha1}:{fields['nonce']}:{fields['nc']}:{fields['cnonce']}:{fields['qop']}:{ha2}")
+        else:
+            expected = md5(f"{ha1}:{fields['nonce']}:{ha2}")
+        return fields.get("response") == expected
+
+    def _challenge(self):
+        nonce = os.urandom(16).hex()
+        with self.config.lock:
+            self.config.nonces.add(nonce)
+        self._send(401, headers={
+            "WWW-Authenticate": f'Digest realm="{REALM}", nonce="{nonce}", qop="auth", algorithm=MD5'
+        })
+
+    def do_POST(self):
+        config = self.config
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+
+        if self.path.startswith("/teams"):
+            with config.lock:
+                config.teams_posts.append(json.loads(body or b"{}").get("text", ""))
+            return self._send(200, {})
+
+        if not self._authorized():
+            return self._challenge()
+
+        with config.lock:
+            config.requests += 1
+        if random.random() < config.hang_rate:
+            time.sleep(config.hang_seconds)
+        time.sleep(max(0.0, config.latency + random.uniform(-config.jitter, config.jitter)))
+        if random.random() < config.fail_rate:
+            return self._send(500, {"outcome": "failed", "failure-description": "Injected failure"})
+
+        operation = json.loads(body or b"{}")
+        if operation.get("operation") == "read-children-names":
+            return self._send(200, {"outcome": "success", "result": config.deployments})
+        if operation.get("operation") == "read-resource":
+            name = operation["address"][0]["deployment"]
+            if name not in config.deployments:
+                return self._send(500, {"outcome": "failed", "failure-description": f"{name} not found"})
+            return self._send(200, {"outcome": "success", "result": {
+                "name": name,
+                "runtime-name": name,
+                "enabled": True,
+                "status": "FAILED" if name in config.failed else "OK",
+            }})
+        self._send(400, {"outcome": "failed", "failure-description": "Unsupported operation"})
+
+
+def make_server(port=0, config=None):
+    """Create a threaded mock server; port 0 picks a free port (see server.server_address)."""
+    handler = type("BoundMockHandler", (MockHandler,), {"config": config or MockConfig()})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    server.config = handler.config
+    return server
+
+
+def set_config(server, config):
+    """Swap the scenario a running server simulates."""
+    server.RequestHandlerClass.config = config
+    server.config = config
+
+
+def start_in_thread(config, port=0):
+    server = make_server(port, config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=9990)
+    parser.add_argument("--deployments", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of requests answered with HTTP 500")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="share of requests that hang")
+    parser.add_argument("--hang-seconds", type=float, default=60.0)
+    parser.add_argument("--failed-deployments", type=float, default=0.0, help="share of deployments reporting FAILED")
+    parser.add_argument("--user", default="admin")
+    parser.add_argument("--password", default="admin")
+    args = parser.parse_args()
+
+    config = MockConfig(args.deployments, args.latency, args.jitter, args.fail_rate, args.hang_rate,
+                        args.hang_seconds, args.failed_deployments, args.user, args.password)
+    server = make_server(args.port, config)
+    print(f"Mock JBoss on http://127.0.0.1:{args.port}/management, Teams sink on /teams")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Load-test driver for pc_mdm_monitor.monitor() against local stand-ins.
+
+Starts mock_jboss.py in-process, points the JBoss URLs and Teams webhooks at it, uses
+fake_ping.py for the three Integration Service pings, and reports end-to-end monitor()
+time per scenario. Repository queries are skipped unless --with-db is given.
+
+    python run_loadtest.py
+    python run_loadtest.py --scenario slow hung --runs 5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import mock_jboss  # noqa: E402
+
+SCENARIOS = {
+    "baseline": {"jboss": {"deployments": 10}, "ping": {}},
+    "many-deployments": {"jboss": {"deployments": 200}, "ping": {}},
+    "slow": {"jboss": {"deployments": 20, "latency": 2.0}, "ping": {"FAKE_PING_LATENCY": "2"}},
+    "flaky": {
+        "jboss": {"deployments": 50, "fail_rate": 0.1, "failed_deployments": 0.1},
+        "ping": {"FAKE_PING_FAIL_RATE": "0.3"},
+    },
+    "hung": {"jboss": {"deployments": 10, "hang_rate": 1.0}, "ping": {"FAKE_PING_HANG_RATE": "1"}},
+}
+PING_VARS = ("FAKE_PING_LATENCY", "FAKE_PING_FAIL_RATE", "FAKE_PING_HANG_RATE")
+
+
+def configure_env(base_url):
+    """Environment for pc_mdm_monitor, set before it is imported (it validates at import)."""
+    ping = os.path.join(HERE, "fake_ping.py")
+    for env in ("DEV", "SIT", "PRD"):
+        os.environ[f"BAT_{env}"] = ping
+    for env in ("SIT", "PRD"):
+        os.environ[f"{env}_JBOSS_URL"] = f"{base_url}/management"
+        os.environ[f"{env}_JBOSS_USER"] = "admin"
+        os.environ[f"{env}_JBOSS_PASS"] = "admin"
+    os.environ["WEBHOOK_POST"] = f"{base_url}/teams/post"
+    os.environ["WEBHOOK_CHAT"] = f"{base_url}/teams/chat"
+    for var in ("PMCMD_PATH", "DB_SERVER", "DB_SCHEMA_PC", "DB_USER_PC", "DB_PASS_PC",
+                "DB_SCHEMA_MDM", "DB_USER_MDM", "DB_PASS_MDM"):
+        os.environ.setdefault(var, "loadtest")
+
+
+def timed(stages, name, func):
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stages[name] = stages.get(name, 0.0) + time.perf_counter() - started
+    return wrapper
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--runs", type=int, default=3, help="monitor() runs per scenario")
+    parser.add_argument("--with-db", action="store_true", help="also run the repository queries")
+    args = parser.parse_args()
+
+    server = mock_jboss.start_in_thread(mock_jboss.MockConfig())
+    configure_env(f"http://127.0.0.1:{server.server_address[1]}")
+
+    import pc_mdm_monitor as monitor
+
+    originals = {name: getattr(monitor, name) for name in (
+        "check_pc_service", "check_mdm_apps", "send_to_teams",
+        "get_recent_workflows_and_sessions", "get_recent_jobs",
+    )}
+    if not args.with_db:
+        originals["get_recent_workflows_and_sessions"] = lambda stream=False: ([], [])
+        originals["get_recent_jobs"] = lambda stream=False: []
+
+    results = []
+    for name in args.scenario:
+        scenario = SCENARIOS[name]
+        config = mock_jboss.MockConfig(**scenario["jboss"])
+        mock_jboss.set_config(server, config)
+        for var in PING_VARS:
+            os.environ.pop(var, None)
+        os.environ.update(scenario["ping"])
+        monitor.BREAKERS.clear()
+
+        for run in range(1, args.runs + 1):
+            stages = {}
+            for func_name, func in originals.items():
+                setattr(monitor, func_name, timed(stages, func_name, func))
+            requests_before, posts_before = config.requests, len(config.teams_posts)
+            monitor._checked.clear()  # every run pings, rather than reusing the previous run's checks
+
+            started = time.perf_counter()
+            monitor.monitor()
+            total = time.perf_counter() - started
+
+            results.append((name, run, total, stages, config.requests - requests_before,
+                            len(config.teams_posts) - posts_before))
+
+    print(f"\n{'scenario':<17} {'run':>3} {'total s':>8} {'pmcmd s':>8} {'jboss s':>8} "
+          f"{'db s':>6} {'teams s':>8} {'jboss req':>9} {'posts':>5}")
+    for name, run, total, stages, jboss_requests, posts in results:
+        db = stages.get("get_recent_workflows_and_sessions", 0) + stages.get("get_recent_jobs", 0)
+        print(f"{name:<17} {run:>3} {total:>8.2f} {stages.get('check_pc_service', 0):>8.2f} "
+              f"{stages.get('check_mdm_apps', 0):>8.2f} {db:>6.2f} {stages.get('send_to_teams', 0):>8.2f} "
+              f"{jboss_requests:>9} {posts:>5}")
+
+
+if __name__ == "__main__":
+    main()
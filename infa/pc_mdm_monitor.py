@@ -9,18 +9,26 @@ Monitoring Solution for Informatica PowerCenter and Informatica Master Data Mana
 """
 
 import os
+import sys
 import json
+import itertools
 import pyodbc
 import requests
 import subprocess
 import datetime
 import schedule
 import time
+import random
+import threading
 import platform
 import urllib3
 from requests.auth import HTTPDigestAuth
 from dotenv import load_dotenv
 
+# Modules shared with the dashboard live in ../common
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import baselines, instrument, settings  # noqa: E402
+
 # ------------------ Config ------------------
 load_dotenv()
 
@@ -67,6 +75,9 @@ BAT_FILES = {
 
 WEBHOOK_POST = os.getenv("WEBHOOK_POST")
 WEBHOOK_CHAT = os.getenv("WEBHOOK_CHAT")
+# Dashboard endpoint to pre-warm its caches after the daily report, e.g. http://dashboard:8050/prewarm
+PREWARM_URL = os.getenv("PREWARM_URL")
+PREWARM_TOKEN = os.getenv("PREWARM_TOKEN")
 
 DB_SERVER = os.getenv("DB_SERVER")
 DB_SCHEMA_PC = os.getenv("DB_SCHEMA_PC")
@@ -89,6 +100,42 @@ ENVIRONMENTS = {
     },
 }
 
+# Scheduling (seconds unless noted)
+SERVICE_INTERVAL = int(os.getenv("SERVICE_INTERVAL", "60"))
+APP_INTERVAL = int(os.getenv("APP_INTERVAL", "300"))
+REPORT_TIME = os.getenv("REPORT_TIME", "06:00")
+REPORT_JITTER = int(os.getenv("REPORT_JITTER", "60"))
+JITTER_RATIO = float(os.getenv("JITTER_RATIO", "0.1"))
+# Circuit breakers (seconds unless noted)
+BREAKER_THRESHOLD = int(os.getenv("BREAKER_THRESHOLD", "3"))  # consecutive failures
+BREAKER_BACKOFF = int(os.getenv("BREAKER_BACKOFF", "60"))
+BREAKER_MAX_BACKOFF = int(os.getenv("BREAKER_MAX_BACKOFF", "900"))
+
+FETCH_BATCH_SIZE = int(os.getenv("FETCH_BATCH_SIZE", "5000"))
+
+
+# Monitored PowerCenter subject areas (one Teams section each) and MDM job groups, comma-separated
+PC_SUBJECT_AREAS = settings.env_list("PC_SUBJECT_AREAS", "GLENCORE_HR_PROD")
+MDM_JOB_GROUPS = settings.mdm_job_groups()  # shared with the dashboard's /mdm page
+
+STATE_FILE = os.getenv(
+    "SCHEDULE_STATE_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "schedule_state.json"),
+)
+# Prometheus text file with stage timings, rewritten after every job (e.g. for node_exporter)
+METRICS_FILE = os.getenv(
+    "METRICS_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "pc_mdm_monitor.prom"),
+)
+
+# Streaming duration baselines per workflow, session and MDM job (see baselines.py)
+BASELINE_FILE = os.getenv(
+    "BASELINE_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json"),
+)
+# Call out successful sessions that loaded under this share of their usual SUCCESSFUL_ROWS (0 = off)
+LOW_VOLUME_RATIO = float(os.getenv("LOW_VOLUME_RATIO", "0"))
+
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 # Job order
@@ -123,21 +170,136 @@ def connect_to_db(connection_type: str):
         raise ValueError("Invalid connection_type. Use 'pc' or 'mdm'.")
     return pyodbc.connect(conn_str)
 
+
+def stream_rows(connection_type: str, query: str, *params, name=None, names=None, batch_size=FETCH_BATCH_SIZE):
+    """Yield query rows in fetchmany batches; the connection is closed once they are exhausted.
+
+    `names` are first loaded into a #names temp table (one NAME column) for the query to join
+    on, so any number of subject areas or job groups is still a single set-based query.
+    The time from connect to the last row is recorded as the `query` stage under `name`.
+    """
+    started, count, failed = time.perf_counter(), 0, True
+    conn = connect_to_db(connection_type)
+    try:
+        cursor = conn.cursor()
+        if names is not None:
+            cursor.execute("CREATE TABLE #names (NAME NVARCHAR(240) COLLATE DATABASE_DEFAULT PRIMARY KEY)")
+            if names:
+                cursor.fast_executemany = True
+                cursor.executemany("INSERT INTO #names (NAME) VALUES (?)", [(n,) for n in dict.fromkeys(names)])
+                cursor.fast_executemany = False
+        cursor.execute(query, *params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            count += len(rows)
+            yield from rows
+        failed = False
+    finally:
+        conn.close()
+        elapsed = time.perf_counter() - started
+        instrument.observe("query", name or connection_type, elapsed, failed)
+        statement = " ".join(query.split())[:80]
+        print(f"⏱️ {elapsed:.2f}s, {count} rows: {statement}")
+
+# ------------------ Circuit Breaker ------------------
+
+class CircuitBreaker:
+    """Fail fast on an endpoint after repeated failures, letting one probe through on a back-off."""
+
+    def __init__(self, name, threshold=BREAKER_THRESHOLD, backoff=BREAKER_BACKOFF, max_backoff=BREAKER_MAX_BACKOFF):
+        self.name = name
+        self.threshold = threshold
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.state = "closed"
+        self.failures = 0
+        self.retry_in = backoff
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Return True if a call may go through; only one half-open probe is let through at a time."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.retry_in:
+                self.state = "half-open"
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                print(f"🔌 {self.name} circuit closed")
+            self.state = "closed"
+            self.failures = 0
+            self.retry_in = self.backoff
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half-open":
+                self.retry_in = min(self.retry_in * 2, self.max_backoff)
+            elif self.state == "open" or self.failures < self.threshold:
+                return
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            print(f"🔌 {self.name} circuit open, next probe in {self.retry_in}s")
+
+    def describe(self):
+        """Short state note for summaries; empty while the circuit is closed."""
+        if self.state == "open":
+            remaining = max(0, int(self.retry_in - (time.monotonic() - self.opened_at)))
+            return f"circuit open, retry in {remaining}s"
+        if self.state == "half-open":
+            return "circuit half-open, probing"
+        return ""
+
+
+BREAKERS = {}
+
+
+def get_breaker(key):
+    if key not in BREAKERS:
+        BREAKERS[key] = CircuitBreaker(key)
+    return BREAKERS[key]
+
+
+def breaker_note(key):
+    note = BREAKERS[key].describe() if key in BREAKERS else ""
+    return f" ({note})" if note else ""
+
 # ------------------ PowerCenter Service Check ------------------
 
+def ping_command(bat_file):
+    """Command line for a ping script: .bat files via cmd, .py stand-ins via this interpreter."""
+    if bat_file.lower().endswith(".py"):
+        return [sys.executable, bat_file]
+    return ["cmd", "/c", bat_file]   # run .bat via cmd
+
+
+@instrument.timed("collector")
 def check_pc_service():
     """Run environment .bat files and detect if the Integration Service is alive."""
     print("Checking PowerCenter services")
     status = {}
     for env, bat_file in BAT_FILES.items():
+        breaker = get_breaker(f"pc:{env}")
+        if not breaker.allow():
+            print(f"{env} - Skipped, circuit open")
+            status[env] = False
+            continue
         try:
-            result = subprocess.run(
-                ["cmd", "/c", bat_file],   # run .bat via cmd
-                capture_output=True,
-                text=True,
-                shell=False,
-                timeout=30
-            )
+            with instrument.span("pmcmd", env):
+                result = subprocess.run(
+                    ping_command(bat_file),
+                    capture_output=True,
+                    text=True,
+                    shell=False,
+                    timeout=30
+                )
             output = (result.stdout or "") + (result.stderr or "")
             status[env] = "Integration Service is alive" in output
         except subprocess.TimeoutExpired:
@@ -146,10 +308,15 @@ def check_pc_service():
         except Exception as e:
             print(f"{env} - Error: {e}")
             status[env] = False
+        if status[env]:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
     return status
 
 # ------------------ JBoss / MDM App Check ------------------
 
+@instrument.timed("collector")
 def check_mdm_apps():
     """Query JBoss management API to list deployments and their runtime status."""
     print("Checking Master Data Management apps")
@@ -158,31 +325,40 @@ def check_mdm_apps():
 
     for env, creds in ENVIRONMENTS.items():
         deployments = []
+        breaker = get_breaker(f"jboss:{env}")
+        if not breaker.allow():
+            print(f"{env} skipped, circuit open")
+            data[env] = [{"Deployment": "N/A", "Status": "❌", "Enabled": "Not Reachable"}]
+            continue
         try:
             auth = HTTPDigestAuth(creds["JBOSS_USER"], creds["JBOSS_PASS"])
             headers = {"Content-Type": "application/json"}
             verify_ssl = env.upper() != "DEV"
 
-            resp = requests.post(
-                creds["JBOSS_URL"], auth=auth, headers=headers,
-                data=json.dumps(list_payload), verify=verify_ssl, timeout=15
-            )
+            with instrument.span("http", f"jboss_list:{env}"):
+                resp = requests.post(
+                    creds["JBOSS_URL"], auth=auth, headers=headers,
+                    data=json.dumps(list_payload), verify=verify_ssl, timeout=15
+                )
 
             if resp.status_code != 200:
                 print(f"{env} returned HTTP {resp.status_code}")
+                breaker.record_failure()
                 data[env] = [{"Deployment": "N/A", "Status": "❌", "Enabled": "Not Reachable"}]
                 continue
+            breaker.record_success()
 
             for dep in resp.json().get("result", []):
-                status_resp = requests.post(
-                    creds["JBOSS_URL"], auth=auth, headers=headers,
-                    data=json.dumps({
-                        "operation": "read-resource",
-                        "address": [{"deployment": dep}],
-                        "include-runtime": "true"
-                    }),
-                    verify=verify_ssl, timeout=15
-                )
+                with instrument.span("http", f"jboss_resource:{env}"):
+                    status_resp = requests.post(
+                        creds["JBOSS_URL"], auth=auth, headers=headers,
+                        data=json.dumps({
+                            "operation": "read-resource",
+                            "address": [{"deployment": dep}],
+                            "include-runtime": "true"
+                        }),
+                        verify=verify_ssl, timeout=15
+                    )
                 if status_resp.status_code == 200:
                     result = status_resp.json().get("result", {})
                     deployments.append({
@@ -194,17 +370,20 @@ def check_mdm_apps():
 
         except Exception as e:
             print(f"{env} error: {e}")
+            breaker.record_failure()
             data[env] = [{"Deployment": "N/A", "Status": "❌", "Enabled": "Not Reachable"}]
 
     return data
 
 # ------------------ Workflows & Sessions ------------------
 
-def get_recent_workflows_and_sessions():
-    """Fetch recent PC workflows and sessions in a fixed window (yesterday 10 PM to midnight)."""
+@instrument.timed("collector")
+def get_recent_workflows_and_sessions(stream=False):
+    """Fetch recent PC workflows and sessions of PC_SUBJECT_AREAS in a fixed window (yesterday 10 PM to midnight).
+
+    Rows come back ordered by subject area, then start time. With stream=True two generators are returned and rows are fetched as they are consumed.
+    """
     print('Fetching PC workflows and sessions')
-    conn = connect_to_db("pc")
-    cursor = conn.cursor()
 
     now = datetime.datetime.now()
     today_midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
@@ -230,8 +409,9 @@ def get_recent_workflows_and_sessions():
             ELSE 'Unknown'
         END AS Status
     FROM REP_WFLOW_RUN run
-    WHERE run.SUBJECT_AREA = 'GLENCORE_HR_PROD'
-      AND run.START_TIME BETWEEN ? AND ?
+    JOIN #names n ON n.NAME = run.SUBJECT_AREA
+    WHERE run.START_TIME BETWEEN ? AND ?
+    ORDER BY UPPER(run.SUBJECT_AREA), run.START_TIME
     """
 
     # Session query
@@ -241,6 +421,9 @@ def get_recent_workflows_and_sessions():
         WORKFLOW_NAME,
         WORKFLOW_RUN_ID,
         SESSION_NAME,
+        ACTUAL_START AS START_TIME,
+        SESSION_TIMESTAMP AS END_TIME,
+        SUCCESSFUL_ROWS,
         CASE RUN_STATUS_CODE
             WHEN 1 THEN 'Succeeded'
             WHEN 2 THEN 'Disabled'
@@ -251,29 +434,26 @@ def get_recent_workflows_and_sessions():
             WHEN 15 THEN 'Terminated'
             ELSE 'Unknown'
         END AS Status
-    FROM REP_SESS_LOG
-    WHERE SUBJECT_AREA = '<modify this>'
-      AND ACTUAL_START BETWEEN ? AND ?
+    FROM REP_SESS_LOG sess
+    JOIN #names n ON n.NAME = sess.SUBJECT_AREA
+    WHERE sess.ACTUAL_START BETWEEN ? AND ?
+    ORDER BY UPPER(sess.SUBJECT_AREA), sess.ACTUAL_START
     """
 
-    cursor.execute(wf_query, yesterday_10pm, today_midnight)
-    workflows = cursor.fetchall()
-
-    cursor.execute(sess_query, yesterday_10pm, today_midnight)
-    sessions = cursor.fetchall()
-
-    cursor.close()
-    conn.close()
-
-    return workflows, sessions
+    workflows = stream_rows("pc", wf_query, yesterday_10pm, today_midnight,
+                            name="pc_workflows", names=PC_SUBJECT_AREAS)
+    sessions = stream_rows("pc", sess_query, yesterday_10pm, today_midnight,
+                           name="pc_sessions", names=PC_SUBJECT_AREAS)
+    if stream:
+        return workflows, sessions
+    return list(workflows), list(sessions)
 
 # ------------------ MDM Batch Jobs ------------------
 
-def get_recent_jobs():
-    """Fetch recent MDM jobs for selected job groups in the same time window."""
+@instrument.timed("collector")
+def get_recent_jobs(stream=False):
+    """Fetch recent MDM jobs of MDM_JOB_GROUPS in the same time window, ordered by group then start time."""
     print('Fetching MDM jobs')
-    conn = connect_to_db("mdm")
-    cursor = conn.cursor()
 
     now = datetime.datetime.now()
     today_midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
@@ -314,68 +494,152 @@ def get_recent_jobs():
     FROM C_REPOS_JOB_GROUP jg
     LEFT JOIN jgc ON jg.ROWID_JOB_GROUP = jgc.ROWID_JOB_GROUP
     LEFT JOIN jc ON jgc.ROWID_JOB_GROUP_CONTROL = jc.ROWID_JOB_GROUP_CONTROL
-    WHERE jg.JOB_GROUP_NAME IN (
-        'StgBatchGroupSAP', 'BOBatchGroupAD', 'StgBatchGroupAD', 
-        'BOBatchGroupSap', 'TokenMatchMergeGrp', 
-        'BOBatchGroup_SRC_ID_SAPNO_FLAG_LDG_STG_BO', 
-        'StgBatchGroupWorkday', 'BOBatchGroupWorkday'
-    )
-    AND jc.START_RUN_DATE >= ? AND jc.START_RUN_DATE < ?
+    JOIN #names n ON n.NAME = jg.JOB_GROUP_NAME
+    WHERE jc.START_RUN_DATE >= ? AND jc.START_RUN_DATE < ?
+    ORDER BY jg.JOB_GROUP_NAME, jc.START_RUN_DATE
     """
 
-    cursor.execute(jobs_query, yesterday_10pm, today_midnight)
-    jobs = cursor.fetchall()
+    jobs = stream_rows("mdm", jobs_query, yesterday_10pm, today_midnight, name="mdm_jobs", names=MDM_JOB_GROUPS)
+    return jobs if stream else list(jobs)
 
-    cursor.close()
-    conn.close()
+# ------------------ Formatting Helpers ------------------
 
-    return jobs
+def summarize_runs(rows, name_field, history=None, summary=None):
+    """Count failures, collect (name, succeeded) pairs and flag slow (and low-volume) runs in one pass, so rows can be streamed.
+
+    Pass an earlier `summary` to add the rows to it.
+    """
+    if summary is None:
+        summary = {"total": 0, "failed": 0, "runs": [], "slow": {}, "low": {}}
+    for row in rows:
+        name = getattr(row, name_field)
+        ok = row.Status == 'Succeeded'
+        summary["total"] += 1
+        summary["failed"] += not ok
+        summary["runs"].append((name, ok))
+
+        minutes = baselines.minutes_between(row.START_TIME, row.END_TIME)
+        if history is not None and minutes is not None:
+            key = f"pc:{row.SUBJECT_AREA}/{row.WORKFLOW_NAME}"
+            if name_field != "WORKFLOW_NAME":
+                key += f"/{name}"
+            started = row.START_TIME.isoformat()
+            usual = history.observe(key, minutes, started, learn=ok)
+            if usual is not None:
+                summary["slow"][name] = (minutes, usual)
+
+            # Sessions also keep a baseline of their row counts
+            loaded = getattr(row, "SUCCESSFUL_ROWS", None)
+            if loaded is not None:
+                usual_rows = history.typical(f"rows:{key}", started)
+                history.observe(f"rows:{key}", loaded, started, learn=ok)
+                if ok and LOW_VOLUME_RATIO and usual_rows and loaded < LOW_VOLUME_RATIO * usual_rows:
+                    summary["low"][name] = (loaded, usual_rows)
+    return summary
+
+
+def summarize_areas(workflows, sessions, history=None):
+    """{subject area: (workflow summary, session summary)} for every configured area, in config order.
+
+    Both streams arrive ordered by UPPER(SUBJECT_AREA), so each area is summarized as its rows are
+    fetched; an area whose rows come back in more than one run is still summarized once.
+    """
+    configured = {area.upper(): area for area in PC_SUBJECT_AREAS}
+
+    def by_area(rows, name_field):
+        # SQL Server compares names case-insensitively; report them as configured
+        groups = itertools.groupby(rows, key=lambda row: configured.get(row.SUBJECT_AREA.upper(), row.SUBJECT_AREA))
+        areas = {}
+        for area, group in groups:
+            areas[area] = summarize_runs(group, name_field, history, areas.get(area))
+        return areas
+
+    wf_areas = by_area(workflows, "WORKFLOW_NAME")
+    sess_areas = by_area(sessions, "SESSION_NAME")
+    return {
+        area: (wf_areas.get(area) or summarize_runs([], "WORKFLOW_NAME"),
+               sess_areas.get(area) or summarize_runs([], "SESSION_NAME"))
+        for area in dict.fromkeys([*PC_SUBJECT_AREAS, *wf_areas, *sess_areas])
+    }
+
+
+def summarize_jobs(rows, history=None):
+    """Count failures, map each MDM job to its status icon and flag slow jobs in one pass."""
+    summary = {"total": 0, "failed": 0, "status": {}, "slow": {}}
+    for row in rows:
+        ok = 'completed' in (row[4] or '').lower()
+        summary["total"] += 1
+        summary["failed"] += not ok
+        summary["status"][row[1]] = '✅' if ok else '❌'
+
+        minutes = baselines.minutes_between(row[2], row[3])
+        if history is not None and minutes is not None:
+            usual = history.observe(f"mdm:{row[0]}/{row[1]}", minutes, row[2].isoformat(), learn=ok)
+            if usual is not None:
+                summary["slow"][row[1]] = (minutes, usual)
+    return summary
+
+
+def slow_note(summary, name):
+    """Suffix like " 🐢 42 min (usual 20)" for a run slower than its baseline."""
+    if name not in summary["slow"]:
+        return ""
+    minutes, usual = summary["slow"][name]
+    return f" 🐢 {minutes:.0f} min (usual {usual:.0f})"
+
+
+def job_order(jobs):
+    """CUSTOM_ORDER, then any other job of the configured groups that ran."""
+    return CUSTOM_ORDER + sorted(set(jobs["status"]) - set(CUSTOM_ORDER))
+
+
+def volume_note(summary, name):
+    """Suffix like " 📉 1,200 rows (usual 48,000)" for a session that loaded far fewer rows than usual."""
+    if name not in summary["low"]:
+        return ""
+    loaded, usual = summary["low"][name]
+    return f" 📉 {loaded:,} rows (usual {usual:,.0f})"
 
-# ------------------ Formatting Helpers ------------------
 
 def get_date_str():
     fmt = "%B %#d, %Y" if platform.system() == "Windows" else "%B %-d, %Y"
     return datetime.datetime.now().strftime(fmt)
 
 
-def format_pc_chat(service_status, workflows, sessions, detailed=False):
-    failed_wf = [wf for wf in workflows if wf.Status != 'Succeeded']
-    failed_sess = [s for s in sessions if s.Status != 'Succeeded']
-    env_lines = "\n".join([f"{env} {'✅' if up else '❌'}" for env, up in service_status.items()])
+@instrument.timed("formatter")
+def format_pc_chat(service_status, areas, detailed=False):
+    env_lines = "\n".join([f"{env} {'✅' if up else '❌'}{breaker_note('pc:' + env)}" for env, up in service_status.items()])
 
     summary = (
         f"{get_date_str()}\n\n"
         f"**🔍 PowerCenter Monitoring Summary**\n\n"
         f"**Service Status:**\n{env_lines}\n\n"
-        f"**📦 Workflows and Sessions**\n\n"
-        f"**Workflows Failed:** {len(failed_wf)} / {len(workflows)}\n\n"
-        f"**Sessions Failed:** {len(failed_sess)} / {len(sessions)}\n\n"
     )
 
-    if detailed:
-        wf_lines = [f"{row.WORKFLOW_NAME} | {'✅' if row.Status == 'Succeeded' else '❌'}" for row in workflows]
-        sess_lines = [f"{row.SESSION_NAME} | {'✅' if row.Status == 'Succeeded' else '❌'}" for row in sessions]
+    for area, (workflows, sessions) in areas.items():
         summary += (
-            f"📊 **Workflow List:**\n```\nWorkflow Name | Status\n"
-            f"{chr(10).join(wf_lines)}\n```\n\n"
-            f"📊 **Session List:**\n```\nSession Name | Status\n"
-            f"{chr(10).join(sess_lines)}\n```"
+            f"**📦 {area}**\n\n"
+            f"**Workflows Failed:** {workflows['failed']} / {workflows['total']}\n\n"
+            f"**Sessions Failed:** {sessions['failed']} / {sessions['total']}\n\n"
         )
+        if detailed:
+            wf_lines = [f"{name} | {'✅' if ok else '❌'}" for name, ok in workflows["runs"]]
+            sess_lines = [f"{name} | {'✅' if ok else '❌'}" for name, ok in sessions["runs"]]
+            summary += (
+                f"📊 **Workflow List:**\n```\nWorkflow Name | Status\n"
+                f"{chr(10).join(wf_lines)}\n```\n\n"
+                f"📊 **Session List:**\n```\nSession Name | Status\n"
+                f"{chr(10).join(sess_lines)}\n```\n\n"
+            )
     return summary
 
 
-def format_pc_summary(service_status, workflows, sessions):
+@instrument.timed("formatter")
+def format_pc_summary(service_status, areas):
     print('Formatting PC summary')
-    failed_wf = [wf for wf in workflows if wf.Status != 'Succeeded']
-    failed_sess = [s for s in sessions if s.Status != 'Succeeded']
-
     env_status_icon = lambda status: '✅' if status else '❌'
-    wf_status_icon = lambda s: '✅' if s == 'Succeeded' else '❌'
 
-    wf_lines = [f"{row.WORKFLOW_NAME} | {wf_status_icon(row.Status)}" for row in workflows]
-    sess_lines = [f"{row.SESSION_NAME} | {wf_status_icon(row.Status)}" for row in sessions]
-
-    service_lines = "\n".join([f"{env} {env_status_icon(up)}" for env, up in service_status.items()])
+    service_lines = "\n".join([f"{env} {env_status_icon(up)}{breaker_note('pc:' + env)}" for env, up in service_status.items()])
 
     date_format = "%B %#d, %Y" if platform.system() == "Windows" else "%B %-d, %Y"
     current_date = datetime.datetime.now().strftime(date_format)
@@ -383,39 +647,51 @@ def format_pc_summary(service_status, workflows, sessions):
     summary = (
         f"{current_date}\n\n"
         f"**🔍 PowerCenter Monitoring Summary**\n\n"
-        f"**Service Status:**\n{service_lines}\n\n"
-        f"**📦 Workflows and Sessions**\n\n"
-        f"**Workflows\nFailed:** {len(failed_wf)} / {len(workflows)}\n\n"
-        f"**Sessions\nFailed:** {len(failed_sess)} / {len(sessions)}\n\n"
-        f"📊 **Workflow List:**\n"
-        "```\n"
-        "Workflow Name | Status\n"
-        "-----------------------\n"
-        f"{chr(10).join(wf_lines)}\n"
-        "```\n\n"
-        f"📊 **Session List:**\n"
-        "```\n"
-        "Session Name | Status\n"
-        "-----------------------\n"
-        f"{chr(10).join(sess_lines)}\n"
-        "```"
+        f"**Service Status:**\n{service_lines}"
     )
 
+    # One section per subject area
+    for area, (workflows, sessions) in areas.items():
+        wf_lines = [f"{name} | {env_status_icon(ok)}{slow_note(workflows, name)}" for name, ok in workflows["runs"]]
+        sess_lines = [
+            f"{name} | {env_status_icon(ok)}{slow_note(sessions, name)}{volume_note(sessions, name)}"
+            for name, ok in sessions["runs"]
+        ]
+        low_line = f"**📉 Low volume:** {len(sessions['low'])} sessions\n\n" if LOW_VOLUME_RATIO else ""
+        summary += (
+            f"\n\n**📦 {area}**\n\n"
+            f"**Workflows\nFailed:** {workflows['failed']} / {workflows['total']}\n\n"
+            f"**Sessions\nFailed:** {sessions['failed']} / {sessions['total']}\n\n"
+            f"**🐢 Slower than usual:** {len(workflows['slow'])} workflows, {len(sessions['slow'])} sessions\n\n"
+            f"{low_line}"
+            f"📊 **Workflow List:**\n"
+            "```\n"
+            "Workflow Name | Status\n"
+            "-----------------------\n"
+            f"{chr(10).join(wf_lines)}\n"
+            "```\n\n"
+            f"📊 **Session List:**\n"
+            "```\n"
+            "Session Name | Status\n"
+            "-----------------------\n"
+            f"{chr(10).join(sess_lines)}\n"
+            "```"
+        )
+
     return summary
 
 
+@instrument.timed("formatter")
 def format_mdm_chat(jboss_data, jobs, detailed=False):
-    status_icon = lambda s: '✅' if 'completed' in s.lower() else '❌'
-    status_dict = {row[1]: status_icon(row[4]) for row in jobs}
-    ordered_results = [f"{job} | {status_dict.get(job, '❌')}" for job in CUSTOM_ORDER]
+    ordered_results = [f"{job} | {jobs['status'].get(job, '❌')}" for job in job_order(jobs)]
 
-    total, failed = len(jobs), sum(1 for row in jobs if 'completed' not in row[4].lower())
+    total, failed = jobs["total"], jobs["failed"]
     env_lines, env_tables = [], []
 
     for env, deployments in jboss_data.items():
         ok = sum(1 for d in deployments if d["Status"] == "✅" and d["Enabled"] == "✅")
         fail = len(deployments) - ok
-        env_lines.append(f"{env} {ok} ✅ | {fail} ❌")
+        env_lines.append(f"{env} {ok} ✅ | {fail} ❌{breaker_note('jboss:' + env)}")
 
         if detailed:
             lines = [f"{d['Deployment']} | {d['Status']} | {d['Enabled']}" for d in deployments]
@@ -440,19 +716,17 @@ def format_mdm_chat(jboss_data, jobs, detailed=False):
     return summary
 
 
+@instrument.timed("formatter")
 def format_mdm_summary(jboss_data, jobs):
     print('Formatting MDM summary')
 
-    status_icon = lambda s: '✅' if 'completed' in s.lower() else '❌'
-
-    status_dict = {row[1]: status_icon(row[4]) for row in jobs}
     ordered_results = []
-    for job in CUSTOM_ORDER:
-        emoji = status_dict.get(job, '❌')
-        ordered_results.append(f"{job} | {emoji}")
+    for job in job_order(jobs):
+        emoji = jobs["status"].get(job, '❌')
+        ordered_results.append(f"{job} | {emoji}{slow_note(jobs, job)}")
 
-    total = len(jobs)
-    failed = sum(1 for row in jobs if 'completed' not in row[4].lower())
+    total = jobs["total"]
+    failed = jobs["failed"]
 
     env_summary_lines = []
     env_tables = []
@@ -460,7 +734,7 @@ def format_mdm_summary(jboss_data, jobs):
     for env, deployments in jboss_data.items():
         ok_count = sum(1 for d in deployments if d["Status"] == "✅" and d["Enabled"] == "✅")
         fail_count = len(deployments) - ok_count
-        env_summary_lines.append(f"{env} {ok_count} ✅ | {fail_count} ❌")
+        env_summary_lines.append(f"{env} {ok_count} ✅ | {fail_count} ❌{breaker_note('jboss:' + env)}")
 
         table_lines = [
             f"{d['Deployment']} | {d['Status']} | {d['Enabled']}"
@@ -487,6 +761,7 @@ def format_mdm_summary(jboss_data, jobs):
         + "\n\n".join(env_tables) + "\n\n"
         "**📦 Batch Jobs**\n\n"
         f"Failed: {failed} / {total}\n\n"
+        f"🐢 Slower than usual: {len(jobs['slow'])}\n\n"
         "```\n"
         "Job Name | Status\n"
         "----------------------\n"
@@ -500,50 +775,226 @@ def format_mdm_summary(jboss_data, jobs):
 
 def send_to_teams(webhook_url, message: str):
     print("Posting summary to Teams")
-    resp = requests.post(webhook_url, json={"text": message})
+    with instrument.span("http", "teams"):
+        resp = requests.post(webhook_url, json={"text": message})
     if resp.status_code != 200:
         print(f"❌ Teams post failed: {resp.status_code} - {resp.text}")
 
+def notify_dashboard():
+    """Ask the dashboard to reload its caches now that the night's data is in."""
+    if not PREWARM_URL:
+        return
+    headers = {"X-Prewarm-Token": PREWARM_TOKEN} if PREWARM_TOKEN else {}
+    try:
+        with instrument.span("http", "prewarm"):
+            resp = requests.post(PREWARM_URL, headers=headers, timeout=10)
+        if resp.status_code not in (202, 409):
+            print(f"⚠️ Dashboard pre-warm failed: {resp.status_code} - {resp.text}")
+    except requests.RequestException as e:
+        print(f"⚠️ Dashboard pre-warm failed: {e}")
+
 # ------------------ Main Orchestration ------------------
 
 def monitor():
     """End-to-end monitoring run and posting to Teams."""
     print(f"\n📅 Running Monitoring at {datetime.datetime.now()}")
     try:
-        pc_service = check_pc_service()
-        mdm_apps = check_mdm_apps()
-        workflows, sessions = get_recent_workflows_and_sessions()
-        jobs = get_recent_jobs()
+        # The latest results of the services and apps jobs, so the report agrees with their alerts
+        pc_service = shared_check("services", SERVICE_INTERVAL)
+        mdm_apps = shared_check("apps", APP_INTERVAL)
+        # Rows are streamed from the repository and summarized once for both posts,
+        # each run checked against and then folded into its duration baseline
+        history = baselines.load(BASELINE_FILE)
+        workflows, sessions = get_recent_workflows_and_sessions(stream=True)
+        areas = summarize_areas(workflows, sessions, history)
+        jobs = summarize_jobs(get_recent_jobs(stream=True), history)
+        try:
+            history.save(BASELINE_FILE)
+        except OSError as e:
+            print(f"⚠️ Could not save duration baselines: {e}")
 
         # Chat-friendly summaries
-        pc_chat = format_pc_chat(pc_service, workflows, sessions)
+        pc_chat = format_pc_chat(pc_service, areas)
         mdm_chat = format_mdm_chat(mdm_apps, jobs)
         send_to_teams(WEBHOOK_CHAT, pc_chat)
         send_to_teams(WEBHOOK_CHAT, mdm_chat)
 
         # Detailed posts
-        pc_summary = format_pc_summary(pc_service, workflows, sessions)
+        pc_summary = format_pc_summary(pc_service, areas)
         mdm_summary = format_mdm_summary(mdm_apps, jobs)
         send_to_teams(WEBHOOK_POST, pc_summary)
         send_to_teams(WEBHOOK_POST, mdm_summary)
 
         print("✅ Monitoring complete and sent to Teams.")
+        notify_dashboard()
     except Exception as e:
         print(f"❌ Error during monitoring: {e}")
 
 
-# Schedule at 06:00 daily
-schedule.clear()
-schedule.every().day.at("06:00").do(monitor)
+# ------------------ Scheduler ------------------
+
+JOBS = {}
+_last_results = {}
+_state_lock = threading.Lock()
+_wake = threading.Event()
+
+# Endpoint checks run by their own job and read by the report (looked up per call, so they can be wrapped)
+CHECKS = {"services": lambda: check_pc_service(), "apps": lambda: check_mdm_apps()}
+_check_locks = {name: threading.Lock() for name in CHECKS}
+_checked = {}  # name -> (monotonic start of the run, result)
+
+
+def shared_check(name, max_age=0):
+    """Result of one of CHECKS, with at most one run of each in flight.
+
+    A run that started at most `max_age` seconds before the call (or while the caller waited
+    for it) is reused instead of pinging the endpoints again.
+    """
+    requested = time.monotonic()
+    with _check_locks[name]:
+        checked = _checked.get(name)
+        if checked and checked[0] >= requested - max_age:
+            return checked[1]
+        started = time.monotonic()
+        result = CHECKS[name]()
+        _checked[name] = (started, result)
+        return result
+
+
+def ping_services():
+    """Ping the Integration Services and post to chat when an environment changes state."""
+    status = shared_check("services")
+    previous = _last_results.get("services")
+    _last_results["services"] = status
+    if previous is None:
+        return
+    changes = [
+        f"{env} {'✅' if up else '❌'}{breaker_note('pc:' + env)}"
+        for env, up in status.items() if previous.get(env) != up
+    ]
+    if changes:
+        send_to_teams(WEBHOOK_CHAT, "**⚡ PowerCenter Service Change**\n\n" + "\n".join(changes))
+
+
+def check_apps():
+    """Check the JBoss deployments and post to chat when an environment's app counts change."""
+    counts = {
+        env: sum(1 for d in deployments if d["Status"] == "✅" and d["Enabled"] == "✅")
+        for env, deployments in shared_check("apps").items()
+    }
+    previous = _last_results.get("apps")
+    _last_results["apps"] = counts
+    if previous is None:
+        return
+    changes = [f"{env} {ok} ✅" for env, ok in counts.items() if previous.get(env) != ok]
+    if changes:
+        send_to_teams(WEBHOOK_CHAT, "**⚡ MDM Application Change**\n\n" + "\n".join(changes))
+
+
+def load_state():
+    try:
+        with open(STATE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def mark_run(name):
+    """Record the last completed run of a job so missed runs can be caught up after downtime."""
+    with _state_lock:
+        state = load_state()
+        state[name] = datetime.datetime.now().isoformat(timespec="seconds")
+        try:
+            with open(STATE_FILE, "w") as f:
+                json.dump(state, f, indent=2)
+        except OSError as e:
+            print(f"⚠️ Could not save schedule state: {e}")
+
+
+def write_metrics():
+    try:
+        instrument.write_prometheus(METRICS_FILE)
+    except OSError as e:
+        print(f"⚠️ Could not write metrics: {e}")
+
+
+def run_job(name):
+    """Start a job in its own thread unless its previous run is still going."""
+    job = JOBS[name]
+    if not job["lock"].acquire(blocking=False):
+        print(f"⏭️ {name} is still running, skipping this run")
+        return
+
+    def target():
+        try:
+            time.sleep(random.uniform(0, job["jitter"]))
+            with instrument.span("job", name):
+                job["func"]()
+            mark_run(name)
+        except Exception as e:
+            print(f"❌ {name} failed: {e}")
+        finally:
+            write_metrics()
+            job["lock"].release()
+            _wake.set()
+
+    threading.Thread(target=target, name=name, daemon=True).start()
+
+
+def add_job(name, func, every=None, at=None, jitter=0):
+    """Register a job that runs every `every` seconds, or daily at `at` (HH:MM)."""
+    JOBS[name] = {"func": func, "every": every, "at": at, "jitter": jitter, "lock": threading.Lock()}
+    if every:
+        schedule.every(every).seconds.do(run_job, name).tag(name)
+    else:
+        schedule.every().day.at(at).do(run_job, name).tag(name)
+
+
+def register_jobs():
+    schedule.clear()
+    JOBS.clear()
+    add_job("services", ping_services, every=SERVICE_INTERVAL, jitter=SERVICE_INTERVAL * JITTER_RATIO)
+    add_job("apps", check_apps, every=APP_INTERVAL, jitter=APP_INTERVAL * JITTER_RATIO)
+    add_job("report", monitor, at=REPORT_TIME, jitter=REPORT_JITTER)
+
+
+def catch_up():
+    """Run once any job whose last run is older than its most recent due time."""
+    state = load_state()
+    now = datetime.datetime.now()
+    for name, job in JOBS.items():
+        last = state.get(name)
+        last = datetime.datetime.fromisoformat(last) if last else None
+        if job["every"]:
+            due = now - datetime.timedelta(seconds=job["every"])
+        else:
+            hour, minute = map(int, job["at"].split(":"))
+            due = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            if due > now:
+                due -= datetime.timedelta(days=1)
+            # Never ran before: nothing was missed, wait for the next slot
+            if last is None:
+                continue
+        if last is None or last < due:
+            print(f"↩️ Catching up missed {name} run")
+            run_job(name)
 
 
 def run_scheduler():
-    print("⏳ Scheduler started... waiting for 6:00 AM daily run.")
+    register_jobs()
+    catch_up()
+    print(
+        f"⏳ Scheduler started... services every {SERVICE_INTERVAL}s, "
+        f"apps every {APP_INTERVAL}s, report daily at {REPORT_TIME}."
+    )
     while True:
         schedule.run_pending()
-        time.sleep(30)
+        # Sleep until the next job is due or a running job finishes
+        idle = schedule.idle_seconds()
+        _wake.wait(timeout=max(idle, 0) if idle is not None else None)
+        _wake.clear()
 
 
 if __name__ == "__main__":
     # Make the script executable directly
-    run_scheduler()
\ No newline at end of file
+    run_scheduler()
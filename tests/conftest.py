@@ -0,0 +1,26 @@
+"""
+Unit tests for the dashboard (usage/) and monitor (infa/) modules.
+
+Run from the repository root with `python -m pytest -q`. The dashboard modules are imported
+the way app.py imports them, with CACHE_DIR pointed at a temporary directory so the tests never
+touch the real result cache or baselines. No test opens a database connection, so pyodbc is
+replaced by an empty stand-in where it (or the ODBC library it loads) is missing.
+"""
+
+import os
+import sys
+import tempfile
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="monitoring-tests-"))
+sys.path.insert(0, os.path.join(ROOT, "usage"))
+sys.path.insert(0, ROOT)
+
+try:
+    import pyodbc  # noqa: F401
+except ImportError:
+    pyodbc = sys.modules["pyodbc"] = types.ModuleType("pyodbc")
+    pyodbc.Error = Exception
+    pyodbc.pooling = True
@@ -0,0 +1,22 @@
+from common import baselines
+
+
+def test_slow_flags_leave_runs_without_a_baseline_blank():
+    history = baselines.Baselines({
+        "pc:HR/wf_known": [baselines.MIN_RUNS, 10.0, 1.0, "2026-10-17T22:00:00", [baselines.MIN_RUNS - 1, 10.0, 1.0]],
+        "pc:HR/wf_new": [1, 10.0, 0.0, "2026-10-17T22:00:00", [0, 0.0, 0.0]],
+    })
+
+    flags = baselines.slow_flags(history, ["pc:HR/wf_known", "pc:HR/wf_known", "pc:HR/wf_new", "pc:FIN/wf"],
+                                 [30.0, None, None, None])
+    assert flags == ["yes", "no", "", ""]
+
+
+def test_observe_flags_slow_runs_once_warmed_up():
+    history = baselines.Baselines()
+    for day in range(1, baselines.MIN_RUNS + 1):
+        assert history.observe("mdm:Stg/Party", 10.0, f"2026-10-0{day}T22:00:00") is None
+
+    assert history.observe("mdm:Stg/Party", 40.0, "2026-10-09T22:00:00") == 10.0
+    # Summarizing the same window again judges it against the baseline from before it
+    assert history.observe("mdm:Stg/Party", 40.0, "2026-10-09T22:00:00") == 10.0
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+import critical_path
+
+T = pd.Timestamp("2026-10-18 01:00")
+
+
+def minutes(n):
+    return pd.Timedelta(minutes=n)
+
+
+def runs(rows):
+    return pd.DataFrame(rows, columns=["Start", "End", "Lane"])
+
+
+def test_chain_is_critical_and_parallel_run_has_slack():
+    df = runs([
+        (T, T + minutes(30), "extract"),
+        (T + minutes(30), T + minutes(90), "load"),
+        (T + minutes(1), T + minutes(20), "side"),
+    ])
+    path = critical_path.analyze(df, "Start", "End", "Lane")
+    assert path == [0, 1]
+    assert df.loc[[0, 1], "Critical"].all()
+    assert df.loc[2, "Slack"] > 0
+
+
+def test_zero_duration_runs_at_the_same_time_do_not_depend_on_each_other():
+    df = runs([(T, T, "a"), (T, T, "b"), (T - minutes(5), T, "c")])
+    starts = df["Start"].to_numpy("datetime64[ns]").view(np.int64)
+    ends = df["End"].to_numpy("datetime64[ns]").view(np.int64)
+    assert critical_path.infer_predecessors(starts, ends, df["Lane"].to_numpy()) == [{2}, {2}, set()]
+    # Used to walk a <-> b forever
+    assert critical_path.analyze(df, "Start", "End", "Lane") == [2, 0]
+
+
+def test_same_timestamp_runs_with_circular_lane_dependencies_terminate():
+    df = runs([(T, T, "a"), (T, T, "b")])
+    path = critical_path.analyze(df, "Start", "End", "Lane", depends_on={"a": ["b"], "b": ["a"]})
+    assert len(path) == len(set(path)) <= 2
+
+
+def test_unfinished_runs_are_left_out():
+    df = runs([(T, T + minutes(10), "a"), (T + minutes(10), pd.NaT, "a")])
+    assert critical_path.analyze(df, "Start", "End", "Lane") == [0]
+    assert np.isnan(df.loc[1, "Slack"])
+
+
+def test_describe_abbreviates_long_paths():
+    df = runs([(T + minutes(i), T + minutes(i + 1), f"run{i}") for i in range(12)])
+    path = critical_path.analyze(df, "Start", "End", "Lane")
+    text = critical_path.describe(df, path, "Lane", "Start", "End")
+    assert text.startswith("Critical path (0 h 12 min): run0 → run1 → run2 → … 6 more …")
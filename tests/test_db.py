@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+
+import db
+
+
+class FakeReader:
+    def __init__(self, batches, schema):
+        self.batches, self.schema = batches, schema
+
+    def __iter__(self):
+        return iter(self.batches)
+
+
+@pytest.fixture
+def arrow(monkeypatch):
+    pa = pytest.importorskip("pyarrow")
+    monkeypatch.setattr(db, "pa", pa)
+    results = []
+    monkeypatch.setattr(db, "read_arrow_batches_from_odbc", lambda **kwargs: results.pop(0))
+    return pa, results
+
+
+def test_arrow_path_returns_columns_for_an_empty_result(arrow):
+    pa, results = arrow
+    results.append(FakeReader([], pa.schema([("START_TIME", pa.timestamp("ms")), ("Status", pa.string())])))
+
+    frame = db.read_frame("DSN=test", "SELECT START_TIME, Status FROM runs WHERE 1 = 0", name="test_empty")
+    assert frame.empty and list(frame.columns) == ["START_TIME", "Status"]
+
+
+def test_arrow_path_concatenates_batches(arrow):
+    pa, results = arrow
+    batches = [pa.record_batch({"n": [1, 2]}), pa.record_batch({"n": [3]})]
+    results.append(FakeReader(batches, batches[0].schema))
+
+    pd.testing.assert_frame_equal(db.read_frame("DSN=test", "SELECT n", name="test_batches"), pd.DataFrame({"n": [1, 2, 3]}))
+
+
+def test_statement_without_a_result_set_raises(arrow):
+    _pa, results = arrow
+    results.append(None)
+
+    with pytest.raises(ValueError, match="no result set: UPDATE runs SET"):
+        db.read_frame("DSN=test", "UPDATE runs\n    SET Status = 'x'", name="test_update")
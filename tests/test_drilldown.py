@@ -0,0 +1,76 @@
+import pandas as pd
+import pytest
+
+import drilldown
+
+
+def mdm_rows(n):
+    start = pd.Timestamp("2026-10-17 22:00")
+    return pd.DataFrame({
+        "GroupName": ["StgBatchGroupSAP" if i % 2 else "BOBatchGroupSap" for i in range(n)],
+        "Display": [f"Job {i:02d}" for i in range(n)],
+        "Start": [start + pd.Timedelta(minutes=i) for i in range(n)],
+        "End": [start + pd.Timedelta(minutes=i + 1) for i in range(n)],
+        "Status": ["Failed" if i % 5 == 0 else "Completed" for i in range(n)],
+        "Message": ["with 3 rejected records" if i % 5 == 0 else "ok" for i in range(n)],
+        "Rejects": [3 if i % 5 == 0 else 0 for i in range(n)],
+    })
+
+
+@pytest.fixture
+def loaded():
+    drilldown.refresh("mdm_jobs", lambda: mdm_rows(30), max_age=0)
+
+
+def test_parse_filter_maps_operators_and_strips_quotes():
+    sql, params = drilldown.parse_filter('{Status} = "Failed" && {Message} icontains rejected', ["Status", "Message"])
+    assert sql == '"Status" = ? AND "Message" LIKE ?'
+    assert params == ["Failed", "%rejected%"]
+
+
+def test_parse_filter_coerces_only_numeric_columns():
+    _sql, params = drilldown.parse_filter("{Rejects} >= 3 && {Display} = 10", ["Rejects", "Display"])
+    assert params == [3.0, "10"]
+
+
+def test_parse_filter_ignores_unknown_columns_and_operators():
+    assert drilldown.parse_filter("{Nope} = 1 && {Status} ~ x && junk", ["Status"]) == ("", [])
+
+
+def test_page_sorts_filters_and_counts(loaded):
+    rows, pages, page = drilldown.page(
+        "mdm_jobs", 0, 4, [{"column_id": "Display", "direction": "asc"}], "{Status} = Failed")
+    assert [r["Display"] for r in rows] == ["Job 00", "Job 05", "Job 10", "Job 15"]
+    assert (pages, page) == (2, 0)
+
+
+def test_page_clamps_past_the_end_and_reports_it(loaded):
+    rows, pages, page = drilldown.page("mdm_jobs", 9, 10, None, "{Status} = Failed")
+    assert (pages, page) == (1, 0)
+    assert len(rows) == 6
+
+
+def test_page_where_filters(loaded):
+    rows, _pages, _page = drilldown.page("mdm_jobs", 0, 100, None, "", {"GroupName": "BOBatchGroupSap"})
+    assert len(rows) == 15
+
+
+def test_refresh_skips_fresh_tables_and_replaces_only_the_scope(loaded):
+    calls = []
+
+    def group_rows():
+        calls.append(1)
+        rows = mdm_rows(4)
+        return rows.assign(GroupName="BOBatchGroupSap", Display=rows["Display"] + " new")
+
+    at = drilldown.refresh("mdm_jobs", group_rows)
+    assert calls == [] and at is not None  # the full load above is still fresh
+
+    drilldown.refresh("mdm_jobs", group_rows, max_age=0, where={"GroupName": "BOBatchGroupSap"})
+    sap, _pages, _page = drilldown.page("mdm_jobs", 0, 100, None, "", {"GroupName": "BOBatchGroupSap"})
+    other, _pages, _page = drilldown.page("mdm_jobs", 0, 100, None, "", {"GroupName": "StgBatchGroupSAP"})
+    assert len(sap) == 4 and all(r["Display"].endswith(" new") for r in sap)
+    assert len(other) == 15
+
+    drilldown.refresh("mdm_jobs", group_rows, where={"GroupName": "BOBatchGroupSap"})
+    assert calls == [1]
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import forecast
+import store
+
+
+def write_free_space(path, hours, start_gb, gb_per_day, spike_every=None):
+    """Hourly samples of one filling drive (minute samples would only slow the test down)."""
+    start = pd.Timestamp("2026-10-01")
+    with open(path, "w") as f:
+        f.write("|".join(store.COLUMNS) + "\n")
+        for h in range(hours):
+            free = start_gb + gb_per_day * h / 24
+            if spike_every and h % spike_every == 0:
+                free += 500  # a clean-up that is refilled an hour later
+            f.write(f"{start + pd.Timedelta(hours=h):%Y.%m.%d %H:%M:%S}|C: Free Space|{free * store.GB}|{1000 * store.GB}\n")
+
+
+@pytest.fixture(autouse=True)
+def fresh_fits():
+    forecast._fits.clear()
+    store._stores.clear()
+
+
+def test_theil_sen_ignores_outliers_and_padding():
+    times = np.array([[0, 1, 2, 3, 4, np.nan], [0, 1, 2, 3, np.nan, np.nan]], dtype=float)
+    values = np.array([[10, 8, 6, 100, 2, np.nan], [1, 1, 1, 1, np.nan, np.nan]], dtype=float)
+
+    slopes = forecast.theil_sen(times, values)
+    assert slopes[0] == pytest.approx(-2)
+    assert slopes[1] == 0
+
+
+def test_forecast_projects_days_to_full(tmp_path):
+    path = str(tmp_path / "usage.csv")
+    write_free_space(path, hours=10 * 24, start_gb=200, gb_per_day=-10, spike_every=37)
+
+    fit = forecast.forecasts([path])[path]["C: Free Space"]
+    assert fit.slope == pytest.approx(-10, rel=0.01)
+    assert fit.free == pytest.approx(200 - 10 * (10 * 24 - 1) / 24, rel=0.01)
+    assert fit.days_to_full == pytest.approx(fit.free / 10, rel=0.01)
+    assert forecast.at_risk({path: {"C: Free Space": fit}}) == [(path, "C: Free Space", fit)]
+
+
+def test_forecast_skips_drives_that_are_not_filling_or_too_new(tmp_path):
+    growing, new = str(tmp_path / "growing.csv"), str(tmp_path / "new.csv")
+    write_free_space(growing, hours=3 * 24, start_gb=200, gb_per_day=5)
+    write_free_space(new, hours=forecast.MIN_POINTS - 1, start_gb=200, gb_per_day=-10)
+
+    fits = forecast.forecasts([growing, new])
+    assert fits[growing]["C: Free Space"].days_to_full is None
+    assert fits[new] == {}
+    assert forecast.describe(fits[growing]["C: Free Space"]) == "Not filling"
+    assert forecast.describe(None) == "Not enough history to forecast"
+
+
+def test_forecast_refits_only_when_a_new_hour_starts(tmp_path, monkeypatch):
+    path = str(tmp_path / "usage.csv")
+    write_free_space(path, hours=48, start_gb=200, gb_per_day=-10)
+    calls = []
+    fit = forecast._fit
+    monkeypatch.setattr(forecast, "_fit", lambda series, now: calls.append(len(series)) or fit(series, now))
+
+    forecast.forecasts([path])
+    forecast.forecasts([path])
+    assert calls == [1]
+
+    with open(path, "a") as f:
+        f.write(f"2026.10.03 00:00:00|C: Free Space|{180 * store.GB}|{1000 * store.GB}\n")
+    forecast.forecasts([path])
+    assert calls == [1, 1]
+
+
+def test_describe_switches_to_hours_under_two_days():
+    assert forecast.describe(forecast.Forecast(-24.0, 12.0, 0.5)) == "Full in ~12 h (-24.0 GB/day)"
+    assert forecast.describe(forecast.Forecast(-3.4, 40.8, 12.0)) == "Full in ~12 days (-3.4 GB/day)"
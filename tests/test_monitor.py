@@ -0,0 +1,147 @@
+import collections
+import datetime
+import os
+import sys
+import threading
+
+import pytest
+
+from conftest import ROOT
+
+# The monitor checks its settings at import time (pyodbc is stubbed in conftest when missing)
+for var in ("PMCMD_PATH", "BAT_DEV", "BAT_SIT", "BAT_PRD", "WEBHOOK_POST", "WEBHOOK_CHAT", "DB_SERVER",
+            "DB_SCHEMA_PC", "DB_USER_PC", "DB_PASS_PC", "DB_SCHEMA_MDM", "DB_USER_MDM", "DB_PASS_MDM",
+            "SIT_JBOSS_URL", "SIT_JBOSS_USER", "SIT_JBOSS_PASS", "PRD_JBOSS_URL", "PRD_JBOSS_USER", "PRD_JBOSS_PASS"):
+    os.environ.setdefault(var, "test")
+sys.path.insert(0, os.path.join(ROOT, "infa"))
+import pc_mdm_monitor as monitor  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def scratch_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(monitor, "STATE_FILE", str(tmp_path / "schedule_state.json"))
+    monkeypatch.setattr(monitor, "METRICS_FILE", str(tmp_path / "pc_mdm_monitor.prom"))
+    yield
+    monitor.JOBS.clear()
+    monitor.schedule.clear()
+
+
+def test_breaker_opens_after_threshold_failures():
+    breaker = monitor.CircuitBreaker("pc:DEV", threshold=3, backoff=60, max_backoff=900)
+    for _ in range(2):
+        breaker.record_failure()
+        assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.describe().startswith("circuit open, retry in ")
+
+
+def test_breaker_lets_one_probe_through_and_backs_off():
+    breaker = monitor.CircuitBreaker("jboss:SIT", threshold=1, backoff=60, max_backoff=100)
+    breaker.record_failure()
+
+    breaker.opened_at -= 60
+    assert breaker.allow()
+    assert not breaker.allow()  # the probe is still out
+    assert breaker.describe() == "circuit half-open, probing"
+    breaker.record_failure()
+    assert (breaker.state, breaker.retry_in) == ("open", 100)
+
+    breaker.opened_at -= 100
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.retry_in == 100  # capped at max_backoff
+
+
+def test_breaker_closes_on_success():
+    breaker = monitor.CircuitBreaker("pc:SIT", threshold=1, backoff=60)
+    breaker.record_failure()
+    breaker.opened_at -= 60
+    breaker.allow()
+    breaker.record_success()
+
+    assert (breaker.state, breaker.failures, breaker.retry_in) == ("closed", 0, 60)
+    assert breaker.allow()
+    assert breaker.describe() == ""
+
+
+def test_run_job_skips_a_run_while_the_previous_one_is_going():
+    started, release = threading.Event(), threading.Event()
+    runs = []
+
+    def slow():
+        runs.append(1)
+        started.set()
+        release.wait(5)
+
+    monitor.add_job("slow", slow, every=60)
+    monitor.run_job("slow")
+    assert started.wait(5)
+    monitor.run_job("slow")
+    release.set()
+
+    with monitor.JOBS["slow"]["lock"]:  # free once the first run has finished
+        assert runs == [1]
+    assert "slow" in monitor.load_state()
+
+
+def test_catch_up_runs_only_jobs_that_missed_their_slot(monkeypatch):
+    now = datetime.datetime.now()
+    for name, every, at in (("stale", 60, None), ("fresh", 3600, None), ("never", 60, None),
+                            ("daily-missed", None, "00:00"), ("daily-new", None, "00:00")):
+        monitor.add_job(name, lambda: None, every=every, at=at)
+    monitor.mark_run("fresh")
+    state = monitor.load_state()
+    state["stale"] = (now - datetime.timedelta(minutes=5)).isoformat()
+    state["daily-missed"] = (now - datetime.timedelta(days=2)).isoformat()
+    with open(monitor.STATE_FILE, "w") as f:
+        monitor.json.dump(state, f)
+    ran = []
+    monkeypatch.setattr(monitor, "run_job", ran.append)
+
+    monitor.catch_up()
+    assert sorted(ran) == ["daily-missed", "never", "stale"]
+
+
+def test_summarize_areas_merges_an_area_split_across_the_stream(monkeypatch):
+    monkeypatch.setattr(monitor, "PC_SUBJECT_AREAS", ["HR_PROD", "FIN_PROD"])
+    run = collections.namedtuple("Run", "SUBJECT_AREA WORKFLOW_NAME Status START_TIME END_TIME")
+    workflows = [run("HR_PROD", "wf_a", "Succeeded", None, None), run("FIN_PROD", "wf_b", "Succeeded", None, None),
+                 run("hr_prod", "wf_c", "Failed", None, None)]
+
+    areas = monitor.summarize_areas(workflows, [])
+    assert list(areas) == ["HR_PROD", "FIN_PROD"]
+    assert (areas["HR_PROD"][0]["total"], areas["HR_PROD"][0]["failed"]) == (2, 1)
+    assert areas["HR_PROD"][0]["runs"] == [("wf_a", True), ("wf_c", False)]
+    assert areas["FIN_PROD"][1]["total"] == 0
+
+
+def test_shared_check_runs_once_for_concurrent_callers_and_feeds_the_report(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def ping():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"DEV": True}
+
+    monkeypatch.setitem(monitor.CHECKS, "services", ping)
+    monkeypatch.setattr(monitor, "_checked", {})
+    job = threading.Thread(target=monitor.shared_check, args=("services",))
+    job.start()
+    assert started.wait(5)
+    results = []
+    report = threading.Thread(target=lambda: results.append(monitor.shared_check("services", 60)))
+    report.start()
+    release.set()
+    job.join(5)
+    report.join(5)
+
+    assert calls == [1] and results == [{"DEV": True}]
+    assert monitor.shared_check("services", 60) == {"DEV": True}
+    assert calls == [1]
+    monitor.shared_check("services")
+    assert calls == [1, 1]
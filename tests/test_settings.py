@@ -0,0 +1,21 @@
+import pytest
+
+from common import settings
+
+
+def test_env_list_trims_and_drops_blanks(monkeypatch):
+    monkeypatch.setenv("PC_SUBJECT_AREAS", " HR_PROD, ,FIN_PROD,")
+    assert settings.env_list("PC_SUBJECT_AREAS", "unused") == ["HR_PROD", "FIN_PROD"]
+
+
+def test_mdm_job_groups_default_and_override(monkeypatch):
+    monkeypatch.delenv("MDM_JOB_GROUPS", raising=False)
+    assert settings.mdm_job_groups() == settings.DEFAULT_MDM_JOB_GROUPS.split(",")
+    monkeypatch.setenv("MDM_JOB_GROUPS", "StgBatchGroupSAP")
+    assert settings.mdm_job_groups() == ["StgBatchGroupSAP"]
+
+
+def test_empty_mdm_job_groups_is_rejected(monkeypatch):
+    monkeypatch.setenv("MDM_JOB_GROUPS", " , ")
+    with pytest.raises(EnvironmentError, match="MDM_JOB_GROUPS"):
+        settings.mdm_job_groups()
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import store
+
+MINUTE = 60 * 10 ** 9
+
+
+def minutes(start, n):
+    return np.arange(start, start + n, dtype=np.int64) * MINUTE
+
+
+def write_usage(path, rows, header=True):
+    with open(path, "a") as f:
+        if header:
+            f.write("|".join(store.COLUMNS) + "\n")
+        for ts, metric, value, threshold in rows:
+            f.write(f"{pd.Timestamp(ts):%Y.%m.%d %H:%M:%S}|{metric}|{value}|{threshold}\n")
+
+
+def test_ring_buffer_keeps_the_newest_samples_in_order():
+    buffer = store.MetricBuffer(capacity=5)
+    buffer.append(minutes(0, 3), np.array([0, 1, 2], dtype=np.float32))
+    buffer.append(minutes(3, 4), np.array([3, 4, 5, 6], dtype=np.float32))
+
+    times, values = buffer.view()
+    assert list(values) == [2, 3, 4, 5, 6]
+    assert list(times // MINUTE) == [2, 3, 4, 5, 6]
+    assert buffer.last == 6 * MINUTE
+
+
+def test_ring_buffer_drops_samples_that_are_not_newer():
+    buffer = store.MetricBuffer(capacity=5)
+    buffer.append(minutes(0, 3), np.array([0, 1, 2], dtype=np.float32))
+    buffer.append(minutes(1, 3), np.array([9, 9, 3], dtype=np.float32))
+
+    assert list(buffer.view()[1]) == [0, 1, 2, 3]
+
+
+def test_ring_buffer_range_is_exclusive_of_start():
+    buffer = store.MetricBuffer(capacity=10)
+    buffer.append(minutes(0, 8), np.arange(8, dtype=np.float32))
+
+    times, values = buffer.range(2 * MINUTE, 5 * MINUTE)
+    assert list(values) == [3, 4, 5]
+
+
+def test_rollup_folds_samples_into_buckets_across_appends():
+    rollup = store.RollupBuffer(seconds=15 * 60, retention_days=1)
+    rollup.add(minutes(0, 20), np.arange(20, dtype=np.float32))
+    rollup.add(minutes(20, 20), np.arange(20, 40, dtype=np.float32))
+
+    times, mean, low, high = rollup.range()
+    assert list(times // MINUTE) == [0, 15, 30]
+    assert list(low) == [0, 15, 30]
+    assert list(high) == [14, 29, 39]
+    assert mean[1] == pytest.approx(22)
+
+
+def test_rollup_wraps_at_capacity():
+    rollup = store.RollupBuffer(seconds=60, retention_days=3 / 1440)
+    rollup.add(minutes(0, 5), np.arange(5, dtype=np.float32))
+
+    times, mean, _, _ = rollup.range()
+    assert list(mean) == [2, 3, 4]
+
+
+def test_refresh_tails_the_file_and_waits_for_complete_lines(tmp_path):
+    path = tmp_path / "usage.csv"
+    write_usage(path, [("2026-10-18 00:00", "CPU Usage", 10, 85), ("2026-10-18 00:00", "C: Free Space", 50 * store.GB, 200 * store.GB)])
+    usage_store = store.UsageStore(str(path))
+    assert usage_store.refresh() == 2
+
+    with open(path, "a") as f:
+        f.write("2026.10.18 00:01:00|CPU Usage|20|85\n2026.10.18 00:02:00|CPU Us")
+    assert usage_store.refresh() == 1
+    with open(path, "a") as f:
+        f.write("age|30|85\n")
+    assert usage_store.refresh() == 1
+
+    assert list(usage_store.metrics["CPU Usage"].view()[1]) == [10, 20, 30]
+    assert usage_store.metrics["C: Free Space"].view()[1][-1] == 50
+    assert usage_store.latest() == {"CPU Usage": (30.0, 85.0)}
+    assert usage_store.thresholds()["C: Free Space"] == 200
+
+
+def test_refresh_starts_over_when_the_file_is_replaced(tmp_path):
+    path = tmp_path / "usage.csv"
+    write_usage(path, [(f"2026-10-18 00:0{i}", "CPU Usage", i, 85) for i in range(5)])
+    usage_store = store.UsageStore(str(path))
+    usage_store.refresh()
+
+    path.unlink()
+    write_usage(path, [("2026-10-19 00:00", "Memory Usage", store.GB, 16 * store.GB)])
+    usage_store.refresh()
+
+    assert set(usage_store.metrics) == {"Memory Usage"}
+    assert usage_store.first == usage_store.last == pd.Timestamp("2026-10-19").value
+
+
+def test_tier_for_picks_raw_samples_then_coarser_rollups():
+    usage_store = store.UsageStore("unused", retention_days=30, sample_seconds=60)
+    day = 86400 * 10 ** 9
+    assert usage_store.tier_for(day) is None
+    assert usage_store.tier_for(7 * day) == "15m"
+    assert usage_store.tier_for(365 * day) == "1d"
@@ -0,0 +1,48 @@
+import pandas as pd
+
+import timeline
+
+RANK = {'Failed': 0.0, 'Stopped': 0.0, 'Aborted': 0.0, 'Terminated': 0.0, 'Running': 0.5, 'Disabled': 0.75,
+        'Succeeded': 1.0}
+
+
+def runs(*rows):
+    start = pd.Timestamp("2026-10-17 22:00")
+    return pd.DataFrame([
+        {"Workflow": lane, "Start": start + pd.Timedelta(minutes=a), "End": start + pd.Timedelta(minutes=b),
+         "Status": status}
+        for lane, a, b, status in rows
+    ])
+
+
+def merge(df, tolerance=0):
+    return timeline.merge_runs(df, "Start", "End", "Workflow", "Status", RANK, tolerance)
+
+
+def test_merged_bar_keeps_the_name_of_its_worst_status():
+    bars = merge(runs(("wf_a", 0, 10, "Succeeded"), ("wf_a", 5, 15, "Failed"), ("wf_a", 12, 20, "Succeeded")))
+
+    assert bars[["Status", "Runs"]].values.tolist() == [["Failed", 3]]
+    assert bars["End"].iloc[0] == pd.Timestamp("2026-10-17 22:20")
+
+
+def test_unknown_status_outranks_every_known_one():
+    bars = merge(runs(("wf_a", 0, 10, "Failed"), ("wf_a", 5, 15, "Unknown"),
+                      ("wf_b", 0, 10, "Succeeded"), ("wf_b", 5, 15, "Queued")))
+
+    assert bars["Status"].tolist() == ["Unknown", "Queued"]
+
+
+def test_runs_further_apart_than_the_tolerance_stay_separate():
+    df = runs(("wf_a", 0, 10, "Aborted"), ("wf_a", 12, 20, "Succeeded"), ("wf_b", 0, 5, "Stopped"))
+
+    assert merge(df)["Status"].tolist() == ["Aborted", "Succeeded", "Stopped"]
+    assert merge(df, tolerance=pd.Timedelta(minutes=2).value)["Status"].tolist() == ["Aborted", "Stopped"]
+
+
+def test_figure_draws_missing_statuses_as_unknown(monkeypatch):
+    monkeypatch.setattr(timeline, "DETAIL_ROWS", 1)
+    df = runs(("wf_a", 0, 10, "Succeeded"), ("wf_a", 30, 40, None))
+
+    fig = timeline.figure(df, "Start", "End", "Workflow", "Status", {"Succeeded": "green"}, RANK)
+    assert sorted(trace.name for trace in fig.data) == ["Succeeded", "Unknown"]
@@ -1,13 +1,32 @@
 import csv
 import datetime
+import json
 import psutil
 import shutil
 import os
+import socket
 import string
+import urllib.request
 
 # Output CSV file path
 output_file = r'update this - usage.csv'
 
+# ----- Alerting -----
+# Teams incoming webhook for threshold alerts; leave empty to only write the CSV
+alert_webhook = r''
+# Hysteresis and pending alerts are kept between runs in this file
+alert_state_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'alert_state.json')
+server_name = socket.gethostname()
+# (alert at, clear at) in percent: CPU and memory used, disks free
+alert_thresholds = {
+    'cpu': (85, 80),
+    'memory': (85, 80),
+    'disk': (15, 20),
+}
+alert_min_seconds = 300   # a breach (or recovery) must last this long before it is reported
+alert_interval = 900      # at most one Teams post per this many seconds; alerts in between are batched
+alert_max_pending = 50    # queued alerts kept while Teams is unreachable; older ones are counted, not kept
+
 # Get current date and time
 now = datetime.datetime.now()
 dt = now.strftime('%Y.%m.%d %H:%M:%S')
@@ -51,3 +70,88 @@ with open(output_file, 'a', newline='') as f:
     writer.writerows(rows)
 
 print("Monitoring data written to CSV.")
+
+
+# ----- Threshold alerts -----
+def percent_of(metric, value, total):
+    """(kind, percent) compared against alert_thresholds."""
+    if metric == 'CPU Usage':
+        return 'cpu', value
+    if metric == 'Memory Usage':
+        return 'memory', value / total * 100
+    return 'disk', value / total * 100
+
+
+def breached(kind, percent, limit):
+    # Disks alert on low free space, CPU and memory on high usage
+    return percent < limit if kind == 'disk' else percent > limit
+
+
+def evaluate(state, metric, kind, percent, now):
+    """Advance one metric's hysteresis state; returns an alert line when it changes."""
+    alert_at, clear_at = alert_thresholds[kind]
+    entry = state.setdefault(metric, {'alerting': False, 'since': None})
+    # While alerting, the metric has to get past the clear level (not just back over the alert level)
+    changing = not breached(kind, percent, clear_at) if entry['alerting'] else breached(kind, percent, alert_at)
+    if not changing:
+        entry['since'] = None
+        return None
+    entry['since'] = entry['since'] or now
+    if now - entry['since'] < alert_min_seconds:
+        return None
+    entry['alerting'] = not entry['alerting']
+    entry['since'] = None
+    label = f"{percent:.1f}% {'free' if kind == 'disk' else 'used'}"
+    if entry['alerting']:
+        return f"🔴 {metric}: {label} (limit {alert_at}%)"
+    return f"✅ {metric} recovered: {label}"
+
+
+def post_alerts(lines, dropped=0):
+    if dropped:
+        lines = [f"… {dropped} older alert(s) dropped while Teams was unreachable"] + lines
+    body = json.dumps({'text': f"**⚠️ {server_name} usage alerts**\n\n" + "\n\n".join(lines)}).encode()
+    req = urllib.request.Request(alert_webhook, data=body, headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(req, timeout=10) as resp:
+        return resp.status == 200
+
+
+if alert_webhook:
+    try:
+        with open(alert_state_file) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = {}
+    metrics = state.setdefault('metrics', {})
+    pending = state.setdefault('pending', [])
+    now_ts = now.timestamp()
+
+    for _, metric, value, total in rows:
+        kind, percent = percent_of(metric, value, total)
+        line = evaluate(metrics, metric, kind, percent, now_ts)
+        if line:
+            pending.append(f"{dt} {line}")
+
+    # One batched post per alert_interval; pending alerts survive a failed post
+    if pending and now_ts - state.get('last_post', 0) >= alert_interval:
+        try:
+            if post_alerts(pending, state.get('dropped', 0)):
+                print(f"Posted {len(pending)} alert(s) to Teams.")
+                pending.clear()
+                state['dropped'] = 0
+                state['last_post'] = now_ts
+            else:
+                print("Teams did not accept the alerts; they stay queued.")
+        except OSError as e:
+            print(f"Error posting alerts: {e}")
+    if len(pending) > alert_max_pending:
+        dropped = len(pending) - alert_max_pending
+        state['dropped'] = state.get('dropped', 0) + dropped
+        del pending[:dropped]
+        print(f"⚠️ Dropped {dropped} queued alert(s) ({state['dropped']} since the last post).")
+
+    # Write and rename, so a run killed mid-write leaves the previous state instead of a torn file
+    tmp_file = alert_state_file + '.tmp'
+    with open(tmp_file, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_file, alert_state_file)
@@ -1,10 +1,26 @@
+import argparse
+import os
+import sys
+from importlib.util import find_spec
+from time import perf_counter
 from dash import Dash, html, dcc
 from dash.dependencies import Input, Output
+from flask import Response, g, request
+
+# Modules shared with the infa monitor live in ../common
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cache
+from common import instrument
+import prewarm
+import profiling
 import usage
 import mdm_jobs
 import pc_jobs
 
-app = Dash(__name__, suppress_callback_exceptions=True)
+# gzip/brotli responses through flask-compress when it is installed (brotli needs the brotli package)
+app = Dash(__name__, suppress_callback_exceptions=True, compress=find_spec('flask_compress') is not None,
+           background_callback_manager=cache.manager)
 app.title = "Monitoring Dashboard"
 
 # Set up routing
@@ -24,6 +40,7 @@ def index_page():
     ])
 
 @app.callback(Output('page-content', 'children'), Input('url', 'pathname'))
+@instrument.timed('callback')
 def display_page(pathname):
     if pathname == "/usage":
         return usage.layout
@@ -37,6 +54,105 @@ def display_page(pathname):
 # Register callbacks
 usage.register_callbacks(app)
 pc_jobs.register_callbacks(app)
+mdm_jobs.register_callbacks(app)
+
+# Request timings (callbacks are all POSTs to /_dash-update-component) and a Prometheus endpoint
+@app.server.before_request
+def start_timer():
+    g.started = perf_counter()
+
+@app.server.after_request
+def record_timing(response):
+    started = g.pop('started', None)
+    if started is not None:
+        # Label by route pattern so asset and component-suite URLs don't each get a series
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        instrument.observe('http', route, perf_counter() - started, response.status_code >= 500)
+    return response
+
+# Opt-in callback profiling, only hooked in when PROFILE_TOKEN is set (see profiling.py)
+if profiling.PROFILE_TOKEN:
+    @app.server.before_request
+    def start_profile():
+        if request.path.endswith('/_dash-update-component'):
+            body = request.get_json(silent=True) or {}
+            name = profiling.callback_name(app, body)
+            if profiling.wanted(name, request.headers):
+                g.profile = profiling.start(name, body)
+
+    @app.server.after_request
+    def save_profile(response):
+        profile = g.pop('profile', None)
+        if profile is not None:
+            profile.finish(response.status_code)
+        return response
+
+    @app.server.route('/_profile')
+    def arm_profile():
+        if request.headers.get('X-Profile') != profiling.PROFILE_TOKEN:
+            return Response('Forbidden', status=403)
+        callback = request.args.get('callback', '*')
+        try:
+            count = int(request.args.get('count', 1))
+        except ValueError:
+            return Response('count must be a whole number\n', status=400, mimetype='text/plain')
+        count = profiling.arm(callback, count)
+        return Response(f'Profiling the next {count} {callback} request(s)\n', mimetype='text/plain')
+
+# Asset URLs carry ?m=<mtime> and bundle URLs a fingerprint, so both can be cached for a year
+LONG_CACHE = 'public, max-age=31536000, immutable'
+
+@app.server.after_request
+def cache_static(response):
+    if response.status_code == 200:
+        if request.path.startswith('/assets/'):
+            response.headers['Cache-Control'] = LONG_CACHE if 'm' in request.args else 'public, max-age=3600'
+        elif request.path.startswith('/_dash-component-suites/') and 'Cache-Control' not in response.headers:
+            response.headers['Cache-Control'] = LONG_CACHE
+    return response
+
+@app.server.route('/metrics')
+def metrics():
+    return Response(instrument.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+# Called by the infa monitor after its 06:00 report (see prewarm.py); a rebuild runs the heavy
+# repository queries, so it takes the token, or a local caller when no token is configured
+@app.server.route('/prewarm', methods=['POST'])
+def prewarm_caches():
+    if prewarm.PREWARM_TOKEN:
+        allowed = request.headers.get('X-Prewarm-Token') == prewarm.PREWARM_TOKEN
+    else:
+        allowed = request.remote_addr in ('127.0.0.1', '::1')
+    if not allowed:
+        return Response('Forbidden', status=403)
+    if not prewarm.trigger('request'):
+        return Response('Already pre-warming\n', status=409, mimetype='text/plain')
+    return Response('Pre-warming\n', status=202, mimetype='text/plain')
+
+server = app.server
+
+def serve():
+    """Production server for a single host (and Windows, where gunicorn does not run)."""
+    parser = argparse.ArgumentParser(description='Monitoring dashboard')
+    parser.add_argument('--debug', action='store_true', help='Flask dev server with reloader and dev tools')
+    # Localhost unless HOST (or --host) asks for more: /metrics and /_profile have no login
+    parser.add_argument('--host', default=os.getenv('HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('PORT', '8050')))
+    parser.add_argument('--threads', type=int, default=int(os.getenv('WEB_THREADS', '8')))
+    args = parser.parse_args()
+
+    if args.debug:
+        app.run(debug=True, host=args.host, port=args.port)
+        return
+
+    prewarm.start()
+    if find_spec('waitress'):
+        from waitress import serve as waitress_serve
+        print(f"Serving on http://{args.host}:{args.port} with waitress ({args.threads} threads)")
+        waitress_serve(server, host=args.host, port=args.port, threads=args.threads)
+    else:
+        print("waitress is not installed, falling back to the threaded Flask server (debug off)")
+        app.run(debug=False, host=args.host, port=args.port, threaded=True)
 
 if __name__ == '__main__':
-    app.run(debug=True, port=8050)
+    serve()
@@ -0,0 +1,42 @@
+// Push refreshes for the usage page: /usage/events sends a message whenever a usage file changes,
+// which is handed to the usage-events store. The refresh interval only polls while the stream is down.
+// The stream is closed when the tab leaves /usage, so it does not hold a server thread.
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    usage: {
+        connect: function () {
+            if (!window.EventSource) {
+                return false;
+            }
+            if (!window.usageEvents || window.usageEvents.readyState === EventSource.CLOSED) {
+                const onUsagePage = function () {
+                    return window.location.pathname === '/usage';
+                };
+                const source = new EventSource('/usage/events');
+                source.onopen = function () {
+                    if (onUsagePage()) {
+                        window.dash_clientside.set_props('refresh-interval', {disabled: true});
+                    }
+                };
+                source.onmessage = function (event) {
+                    if (onUsagePage()) {
+                        window.dash_clientside.set_props('usage-events', {data: JSON.parse(event.data)});
+                    }
+                };
+                source.onerror = function () {
+                    // The browser reconnects by itself; poll in the meantime
+                    if (onUsagePage()) {
+                        window.dash_clientside.set_props('refresh-interval', {disabled: false});
+                    }
+                };
+                window.usageEvents = source;
+            }
+            return window.usageEvents.readyState === EventSource.OPEN;
+        },
+        disconnect: function (pathname) {
+            if (pathname !== '/usage' && window.usageEvents) {
+                window.usageEvents.close();
+                window.usageEvents = null;
+            }
+        }
+    }
+});
@@ -0,0 +1,124 @@
+"""
+Result cache and background-callback manager for the PC and MDM pages.
+
+With diskcache installed (plus multiprocess and psutil for Dash's DiskcacheManager), loader
+results are memoized in CACHE_DIR where every worker process can see them, and the data-heavy
+callbacks run as Dash background callbacks in their own process so a slow repository does not
+hold a web worker. Without it, results are memoized per process and callbacks run inline.
+"""
+
+import copy
+import os
+import threading
+from functools import wraps
+from time import monotonic
+
+try:
+    import diskcache
+except ImportError:  # optional, falls back to an in-process cache
+    diskcache = None
+
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache"))
+CACHE_TTL = int(os.getenv("CACHE_TTL", "300"))
+
+store = diskcache.Cache(CACHE_DIR) if diskcache is not None else None
+manager = None
+if store is not None:
+    from dash import DiskcacheManager
+    try:
+        manager = DiskcacheManager(store, expire=CACHE_TTL)
+    except ImportError as e:  # multiprocess or psutil missing
+        print(f"⚠️ Background callbacks disabled: {e}")
+
+# Duration baselines (see baselines.py): learned by the infa monitor, only read by the pages
+BASELINE_FILE = os.getenv(
+    "BASELINE_FILE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "infa", "baselines.json"),
+)
+
+# Passed as `background=` to the data-heavy callbacks; BACKGROUND_CALLBACKS=0 runs them inline
+# (needed to profile them, see profiling.py)
+BACKGROUND = manager is not None and os.getenv("BACKGROUND_CALLBACKS", "1") != "0"
+
+_MISS = object()
+_local = {}  # key -> (deadline, value) when there is no disk cache
+_locks = {}
+_locks_lock = threading.Lock()
+
+
+def _get(key):
+    if store is not None:
+        return store.get(key, default=_MISS)
+    hit = _local.get(key)
+    if hit is None or hit[0] < monotonic():
+        return _MISS
+    # Callers transform frames in place, so hand out copies like the disk cache does
+    return copy.deepcopy(hit[1])
+
+
+def _set(key, value, expire):
+    if store is not None:
+        store.set(key, value, expire=expire)
+    else:
+        _local[key] = (monotonic() + expire, copy.deepcopy(value))
+
+
+def _lock_for(key):
+    if store is not None:
+        return diskcache.Lock(store, f"lock:{key}", expire=600)
+    with _locks_lock:
+        return _locks.setdefault(key, threading.Lock())
+
+
+def memoize(expire=CACHE_TTL):
+    """Cache a loader's result per argument tuple for `expire` seconds.
+
+    Concurrent calls with the same arguments (e.g. two page sections sharing a query) wait
+    for the first one instead of running the query again. `func.refresh(*args)` reloads and
+    re-caches a result even if it has not expired (see prewarm.py).
+    """
+    def decorator(func):
+        name = f"{func.__module__}.{func.__name__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (name, args, tuple(sorted(kwargs.items())))
+            value = _get(key)
+            if value is _MISS:
+                with _lock_for(key):
+                    value = _get(key)
+                    if value is _MISS:
+                        value = func(*args, **kwargs)
+                        _set(key, value, expire)
+            return value
+
+        def refresh(*args, **kwargs):
+            key = (name, args, tuple(sorted(kwargs.items())))
+            with _lock_for(key):
+                value = func(*args, **kwargs)
+                _set(key, value, expire)
+            return value
+
+        wrapper.refresh = refresh
+        return wrapper
+    return decorator
+
+
+def claim(key, expire=3600):
+    """True for the first process to claim `key` within `expire` seconds (always True without the disk cache)."""
+    if store is None:
+        return True
+    return store.add(f"claim:{key}", True, expire=expire)
+
+
+def close():
+    """Close this thread's disk-cache connection; the next use opens a new one (see gunicorn.conf.py)."""
+    if store is not None:
+        store.close()
+
+
+def clear():
+    """Drop every cached result (the next page load queries the repository again)."""
+    if store is not None:
+        store.clear()
+    _local.clear()
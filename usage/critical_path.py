@@ -0,0 +1,142 @@
+"""
+Critical path and slack of a finished batch window.
+
+Dependencies are inferred from the run timings: a job depends on the previous job in its lane
+(workflow or MDM job group), on every job that finished at most CRITICAL_PATH_GAP seconds before
+it started (the scheduler starting the next step), and, for lanes listed in `depends_on`, on the
+last job of each upstream lane (e.g. TokenMatchMerge after the BO groups). A backward pass from
+the end of the window then gives every job its slack: how long it could run late without the
+window ending later, if every job started as soon as its predecessors were done. Jobs with no
+slack make up the critical path.
+"""
+
+import os
+
+import numpy as np
+import plotly.graph_objects as go
+
+GAP = float(os.getenv("CRITICAL_PATH_GAP", "120"))  # seconds
+MAX_LABELS = 8
+
+
+def infer_predecessors(starts, ends, lanes, depends_on=None, gap=GAP):
+    """Predecessor positions of every run (epoch-ns start/end arrays, lane labels).
+
+    Every predecessor comes earlier in start order, so the graph has no cycles even when
+    zero-length runs share a timestamp.
+    """
+    gap_ns = int(gap * 10 ** 9)
+    preds = [set() for _ in range(len(starts))]
+    order = np.argsort(starts, kind="stable")
+    rank = np.empty(len(starts), dtype=np.int64)
+    rank[order] = np.arange(len(starts))
+
+    # Runs that started earlier and finished shortly before each start
+    by_end = np.argsort(ends, kind="stable")
+    sorted_ends = ends[by_end]
+    lo = np.searchsorted(sorted_ends, starts - gap_ns, side="left")
+    hi = np.searchsorted(sorted_ends, starts, side="right")
+    for j in np.flatnonzero(hi > lo):
+        preds[j].update(int(p) for p in by_end[lo[j]:hi[j]] if starts[p] < starts[j])
+
+    # The previous run in the same lane, and the upstream lanes of each lane's first run
+    lane_runs = {}
+    for j in order:
+        lane_runs.setdefault(lanes[j], []).append(int(j))
+    for runs in lane_runs.values():
+        for prev, j in zip(runs, runs[1:]):
+            if ends[prev] <= starts[j]:
+                preds[j].add(prev)
+    for lane, upstream in (depends_on or {}).items():
+        if lane not in lane_runs:
+            continue
+        first = lane_runs[lane][0]
+        for up in upstream:
+            finished = sorted((ends[p], p) for p in lane_runs.get(up, ())
+                              if ends[p] <= starts[first] and rank[p] < rank[first])
+            if finished:
+                preds[first].add(finished[-1][1])
+    return preds
+
+
+def analyze(df, start, end, lane, depends_on=None, gap=GAP):
+    """Add Slack (minutes) and Critical columns to a frame of runs.
+
+    Returns the index labels of the critical path, first run first. Runs still going (no end)
+    get no slack and are left out.
+    """
+    df['Slack'] = np.nan
+    df['Critical'] = False
+    finished = df[df[start].notna() & df[end].notna()]
+    if finished.empty:
+        return []
+    starts = finished[start].to_numpy("datetime64[ns]").view(np.int64)
+    ends = finished[end].to_numpy("datetime64[ns]").view(np.int64)
+    preds = infer_predecessors(starts, ends, finished[lane].astype(str).to_numpy(), depends_on, gap)
+
+    # Forward pass: every run starts as soon as its predecessors are done (first runs when they
+    # actually started), so scheduler idle time does not hide which chain sets the end
+    durations = ends - starts
+    order = np.argsort(starts, kind="stable")
+    earliest_start = starts.copy()
+    for j in order:
+        if preds[j]:
+            earliest_start[j] = max(earliest_start[p] + durations[p] for p in preds[j])
+    earliest_finish = earliest_start + durations
+
+    # Backward pass: a run must finish before any successor has to start
+    latest_finish = np.full(len(starts), earliest_finish.max())
+    for j in order[::-1]:
+        latest_start = latest_finish[j] - durations[j]
+        for p in preds[j]:
+            latest_finish[p] = min(latest_finish[p], latest_start)
+    slack = latest_finish - earliest_finish
+    critical = slack <= 0
+    df.loc[finished.index, 'Slack'] = slack / 6e10
+    df.loc[finished.index, 'Critical'] = critical
+
+    # Walk back from the run that ends the window through the predecessor it waited on
+    path = [int(np.argmax(earliest_finish))]
+    visited = set(path)
+    while True:
+        j = path[-1]
+        candidates = [p for p in preds[j]
+                      if critical[p] and earliest_finish[p] == earliest_start[j] and p not in visited]
+        if not candidates:
+            break
+        path.append(candidates[0])
+        visited.add(candidates[0])
+    return [finished.index[p] for p in reversed(path)]
+
+
+def describe(df, path, label, start, end):
+    """Text like "Critical path (3 h 12 min): A → B → C", abbreviated for long chains."""
+    if not path:
+        return ""
+    rows = df.loc[path]
+    minutes = (rows[end].iloc[-1] - rows[start].iloc[0]).total_seconds() / 60
+    labels = rows[label].astype(str).tolist()
+    if len(labels) > MAX_LABELS:
+        labels = labels[:3] + [f"… {len(labels) - 6} more …"] + labels[-3:]
+    return f"Critical path ({int(minutes // 60)} h {int(minutes % 60)} min): {' → '.join(labels)}"
+
+
+def add_path(fig, df, path, start, end, lane):
+    """Overlay the critical path on a timeline figure as one connected line."""
+    if not path:
+        return fig
+    rows = df.loc[path]
+    x, y = [], []
+    for _, row in rows.iterrows():
+        x += [row[start], row[end]]
+        y += [row[lane], row[lane]]
+    fig.add_trace(go.Scatter(x=x, y=y, mode='lines+markers', name='Critical path',
+                             line=dict(color='black', width=3), marker=dict(size=6),
+                             hoverinfo='skip'))
+    return fig
+
+
+def with_subtitle(fig, text):
+    if text:
+        fig.update_layout(title_text=f"{fig.layout.title.text}<br><sup>{text}</sup>")
+    return fig
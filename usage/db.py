@@ -0,0 +1,177 @@
+"""
+Repository access for the PC and MDM dashboards.
+
+Results are streamed in large batches straight into columnar frames: through
+arrow-odbc when it is installed, otherwise through pyodbc `fetchmany` on a
+pooled connection that keeps one prepared cursor per statement.
+"""
+
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+import pandas as pd
+import pyodbc
+from dotenv import load_dotenv
+
+from common import instrument
+
+try:
+    import pyarrow as pa
+    from arrow_odbc import read_arrow_batches_from_odbc
+except ImportError:  # optional, falls back to pyodbc fetchmany
+    read_arrow_batches_from_odbc = None
+
+load_dotenv()
+
+BATCH_SIZE = int(os.getenv("FETCH_BATCH_SIZE", "50000"))
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "4"))
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "2000"))
+
+_pools = {}
+_pools_lock = threading.Lock()
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def connection_string(prefix):
+    """Build the SQL Server connection string from the PC_* or MDM_* environment variables."""
+    return (
+        f'DRIVER={{ODBC Driver 17 for SQL Server}};'
+        f"SERVER={os.getenv(prefix + '_SERVER')};DATABASE={os.getenv(prefix + '_DATABASE')};"
+        f"UID={os.getenv(prefix + '_USERNAME')};PWD={os.getenv(prefix + '_PASSWORD')}"
+    )
+
+
+class PooledConnection:
+    """A pyodbc connection plus one cursor per SQL text, so each statement is prepared only once."""
+
+    def __init__(self, conn_str):
+        self.conn = pyodbc.connect(conn_str)
+        self.cursors = {}
+
+    def cursor_for(self, query):
+        # pyodbc re-uses the prepared handle when a cursor executes the same SQL text again
+        if query not in self.cursors:
+            self.cursors[query] = self.conn.cursor()
+        return self.cursors[query]
+
+    def close(self):
+        try:
+            self.conn.close()
+        except pyodbc.Error:
+            pass
+
+
+@contextmanager
+def pooled_connection(conn_str):
+    """Borrow a connection from the pool for `conn_str`; it is discarded if the caller fails."""
+    with _pools_lock:
+        pool = _pools.setdefault(conn_str, queue.LifoQueue())
+    try:
+        conn = pool.get_nowait()
+    except queue.Empty:
+        conn = PooledConnection(conn_str)
+    try:
+        yield conn
+    except BaseException:
+        # broken link, bad statement or an abandoned fetch: don't hand the connection out again
+        conn.close()
+        raise
+    else:
+        if pool.qsize() < POOL_SIZE:
+            pool.put(conn)
+        else:
+            conn.close()
+
+
+def record_statement(query, seconds, rows):
+    """Accumulate execution time per statement text and warn about slow executions."""
+    key = " ".join(query.split())
+    with _stats_lock:
+        stat = _stats.setdefault(key, {"calls": 0, "total": 0.0, "max": 0.0, "rows": 0})
+        stat["calls"] += 1
+        stat["total"] += seconds
+        stat["max"] = max(stat["max"], seconds)
+        stat["rows"] += rows
+    if seconds * 1000 >= SLOW_QUERY_MS:
+        print(f"🐢 Slow query ({seconds:.2f}s, {rows} rows): {key[:120]}")
+
+
+def statement_stats():
+    """Per-statement timings as a DataFrame, slowest total time first."""
+    with _stats_lock:
+        rows = [
+            {"Statement": key, "Calls": s["calls"], "TotalSec": s["total"],
+             "AvgSec": s["total"] / s["calls"], "MaxSec": s["max"], "Rows": s["rows"]}
+            for key, s in _stats.items()
+        ]
+    df = pd.DataFrame(rows, columns=["Statement", "Calls", "TotalSec", "AvgSec", "MaxSec", "Rows"])
+    return df.sort_values("TotalSec", ascending=False, ignore_index=True)
+
+
+def _arrow_batches(conn_str, query, params, batch_size):
+    # arrow-odbc binds parameters as text; SQL Server converts them to the column type
+    parameters = [None if p is None else str(p) for p in params]
+    reader = read_arrow_batches_from_odbc(
+        query=query,
+        connection_string=conn_str,
+        batch_size=batch_size,
+        parameters=parameters or None,
+    )
+    if reader is None:
+        raise ValueError(f"Statement returned no result set: {' '.join(query.split())[:120]}")
+    empty = True
+    for batch in reader:
+        empty = False
+        yield pa.Table.from_batches([batch]).to_pandas()
+    if empty:
+        yield reader.schema.empty_table().to_pandas()
+
+
+def _fetchmany_batches(conn_str, query, params, batch_size):
+    with pooled_connection(conn_str) as conn:
+        cursor = conn.cursor_for(query)
+        cursor.execute(query, *params)
+        if cursor.description is None:
+            raise ValueError(f"Statement returned no result set: {' '.join(query.split())[:120]}")
+        columns = [c[0] for c in cursor.description]
+        empty = True
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            empty = False
+            yield pd.DataFrame.from_records(rows, columns=columns)
+        if empty:
+            yield pd.DataFrame(columns=columns)
+
+
+def iter_frames(conn_str, query, params=(), batch_size=BATCH_SIZE, name="query"):
+    """Yield the query result as a sequence of DataFrames of up to `batch_size` rows.
+
+    Execution time is also recorded as the `query` stage under `name`.
+    """
+    if read_arrow_batches_from_odbc is not None:
+        batches = _arrow_batches(conn_str, query, params, batch_size)
+    else:
+        batches = _fetchmany_batches(conn_str, query, params, batch_size)
+    started, rows, failed = perf_counter(), 0, True
+    try:
+        for frame in batches:
+            rows += len(frame)
+            yield frame
+        failed = False
+    finally:
+        elapsed = perf_counter() - started
+        record_statement(query, elapsed, rows)
+        instrument.observe("query", name, elapsed, failed)
+
+
+def read_frame(conn_str, query, params=(), batch_size=BATCH_SIZE, name="query"):
+    """Run the query and return the whole result as one DataFrame."""
+    frames = list(iter_frames(conn_str, query, params, batch_size, name))
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
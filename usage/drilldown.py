@@ -0,0 +1,185 @@
+"""
+Server-side paged drill-down tables over the cached run data.
+
+The rows behind the PC and MDM pages are copied into a SQLite file (DRILLDOWN_DB, next to the
+result cache so every worker shares it) with indexes on workflow/job, status and start time,
+at most once per CACHE_TTL, by pre-warming and by a background callback on each page. The
+DataTables use page_action/sort_action/filter_action='custom', so the browser only ever
+receives the page it shows, and paging, sorting and filtering are a LIMIT/ORDER BY/WHERE on the
+indexed table that never touch the repository.
+"""
+
+import math
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+from dash import dash_table
+
+import cache
+
+DRILLDOWN_DB = os.getenv("DRILLDOWN_DB", os.path.join(cache.CACHE_DIR, "drilldown.sqlite"))
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+DEFAULT_ORDER = '"Start" DESC'
+
+# table -> (columns, indexed column tuples)
+TABLES = {
+    "pc_runs": (
+        ["Level", "Folder", "Workflow", "Session", "RunID", "Start", "End", "Status",
+         "ErrCode", "ErrMsg", "UserName", "SuccessfulRows"],
+        [("Workflow", "Start"), ("Status", "Start"), ("Start",), ("Folder", "Start")],
+    ),
+    "mdm_jobs": (
+        ["GroupName", "Display", "Start", "End", "Status", "Message", "Rejects"],
+        [("GroupName", "Start"), ("Display", "Start"), ("Status", "Start"), ("Start",)],
+    ),
+}
+NUMERIC = {"RunID", "ErrCode", "SuccessfulRows", "Rejects"}
+OPERATORS = {
+    "=": "=", "eq": "=", "!=": "!=", "ne": "!=", "<": "<", "lt": "<", "<=": "<=", "le": "<=",
+    ">": ">", "gt": ">", ">=": ">=", "ge": ">=", "contains": "LIKE", "datestartswith": "LIKE",
+}
+
+_local = threading.local()
+
+
+def quote(column):
+    return f'"{column}"'
+
+
+def connect():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(os.path.dirname(DRILLDOWN_DB), exist_ok=True)
+        conn = _local.conn = sqlite3.connect(DRILLDOWN_DB, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS loaded (name TEXT PRIMARY KEY, at REAL)")
+        for table, (columns, indexes) in TABLES.items():
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(map(quote, columns))})")
+            for index in indexes:
+                conn.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_{'_'.join(index).lower()} "
+                             f"ON {table} ({', '.join(map(quote, index))})")
+    return conn
+
+
+def loaded_at(conn, names):
+    return conn.execute(f"SELECT MAX(at) FROM loaded WHERE name IN ({', '.join('?' * len(names))})",
+                        names).fetchone()[0]
+
+
+def refresh(table, load, max_age=cache.CACHE_TTL, where=None):
+    """Reload `table` from load() (a frame with the table's columns) once it is older than `max_age`.
+
+    With `where` ({column: value}, None values ignored) load() returns only those rows and only
+    they are replaced; a load of the whole table counts as fresh for them too. Returns the time
+    the rows were loaded.
+    """
+    where = {column: value for column, value in (where or {}).items() if value is not None}
+    names = [table]
+    if where:
+        names.append(f"{table}:" + ",".join(f"{column}={value}" for column, value in sorted(where.items())))
+    conn = connect()
+    at = loaded_at(conn, names)
+    if at and time.time() - at < max_age:
+        return at
+    frame = load()
+    columns = TABLES[table][0]
+    for column in ("Start", "End"):
+        frame[column] = pd.to_datetime(frame[column]).dt.strftime(TIME_FORMAT)
+    rows = frame[columns].astype(object).where(frame[columns].notna(), None).itertuples(index=False, name=None)
+    where_sql = " AND ".join(f"{quote(column)} = ?" for column in where)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Another worker may have reloaded it while this one was loading
+        at = loaded_at(conn, names)
+        if not at or time.time() - at >= max_age:
+            at = time.time()
+            conn.execute(f"DELETE FROM {table}" + (f" WHERE {where_sql}" if where else ""), list(where.values()))
+            conn.executemany(f"INSERT INTO {table} VALUES ({', '.join('?' * len(columns))})", rows)
+            conn.execute("INSERT OR REPLACE INTO loaded VALUES (?, ?)", (names[-1], at))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return at
+
+
+def parse_filter(filter_query, columns):
+    """DataTable filter_query ("{Status} = Failed && {ErrMsg} contains lock") as (SQL, params)."""
+    clauses, params = [], []
+    for part in (filter_query or "").split(" && "):
+        part = part.strip()
+        if not part.startswith("{") or "}" not in part:
+            continue
+        column, rest = part[1:].split("}", 1)
+        operator, _, value = rest.strip().partition(" ")
+        if operator[:1] in ("s", "i") and operator[1:] in OPERATORS:
+            operator = operator[1:]  # case-(in)sensitive variants; LIKE ignores case anyway
+        if column not in columns or operator not in OPERATORS:
+            continue
+        value = value.strip()
+        if len(value) > 1 and value[0] == value[-1] and value[0] in "\"'`":
+            value = value[1:-1]
+        if operator == "contains":
+            value = f"%{value}%"
+        elif operator == "datestartswith":
+            value = f"{value}%"
+        elif column in NUMERIC:
+            try:
+                value = float(value)  # numeric columns compare as numbers, text columns as text
+            except ValueError:
+                pass
+        clauses.append(f"{quote(column)} {OPERATORS[operator]} ?")
+        params.append(value)
+    return " AND ".join(clauses), params
+
+
+def page(table, page_current, page_size, sort_by=None, filter_query="", where=None):
+    """(rows as dicts, page count, page) for one DataTable page; `where` adds {column: value} equality filters.
+
+    The page comes back clamped to the page count, for the callback to write to page_current.
+    """
+    columns = TABLES[table][0]
+    sql, params = parse_filter(filter_query, columns)
+    clauses = [sql] if sql else []
+    for column, value in (where or {}).items():
+        if value is not None and column in columns:
+            clauses.append(f"{quote(column)} = ?")
+            params.append(value)
+    where_sql = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    order = [f"{quote(s['column_id'])} {'DESC' if s['direction'] == 'desc' else 'ASC'}"
+             for s in sort_by or [] if s.get("column_id") in columns]
+    order_sql = f" ORDER BY {', '.join(order or [DEFAULT_ORDER])}"
+
+    conn = connect()
+    total = conn.execute(f"SELECT COUNT(*) FROM {table}{where_sql}", params).fetchone()[0]
+    pages = max(1, math.ceil(total / page_size))
+    # A narrower filter can leave the table on a page past the end
+    page_current = max(0, min(page_current or 0, pages - 1))
+    cursor = conn.execute(f"SELECT * FROM {table}{where_sql}{order_sql} LIMIT ? OFFSET ?",
+                          params + [page_size, page_current * page_size])
+    names = [d[0] for d in cursor.description]
+    return [dict(zip(names, row)) for row in cursor], pages, page_current
+
+
+def table(table_id, name):
+    """Drill-down DataTable for one of TABLES.
+
+    Its page, sort and filter go to a callback calling page(), which also sets page_current;
+    a background callback refreshes the rows and bumps the dcc.Store `<table_id>-loaded`.
+    """
+    return dash_table.DataTable(
+        id=table_id,
+        columns=[{"name": c, "id": c, "type": "numeric" if c in NUMERIC else "text"} for c in TABLES[name][0]],
+        page_current=0,
+        page_size=25,
+        page_action="custom",
+        sort_action="custom",
+        sort_mode="multi",
+        filter_action="custom",
+        filter_query="",
+        style_table={"overflowX": "auto"},
+        style_cell={"textAlign": "left", "maxWidth": "400px", "whiteSpace": "normal"},
+    )
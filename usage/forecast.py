@@ -0,0 +1,116 @@
+"""
+Disk time-to-full forecasts for the usage page.
+
+Every "X: Free Space" series of every environment is fitted with a Theil–Sen line (the median
+of all pairwise slopes, so clean-ups and spikes barely move it) over the last FORECAST_DAYS of
+hourly rollups, all drives in one batched NumPy pass. Fits are cached per environment and only
+redone for environments whose hourly tier has started a new bucket since the last fit.
+"""
+
+import os
+import threading
+import warnings
+from collections import namedtuple
+
+import numpy as np
+
+import store
+
+FORECAST_DAYS = float(os.getenv("FORECAST_DAYS", "14"))
+FIT_POINTS = int(os.getenv("FORECAST_FIT_POINTS", "96"))  # points per drive fed into the pairwise slopes
+MIN_POINTS = 6
+AT_RISK_DAYS = float(os.getenv("FORECAST_AT_RISK_DAYS", "30"))
+TIER = "1h"
+DAY = 86400 * 10 ** 9
+
+# slope in GB/day, free in GB, days_to_full None when the drive is not filling
+Forecast = namedtuple("Forecast", "slope free days_to_full")
+
+_fits = {}  # path -> (hour bucket of the last fit, {metric: Forecast})
+_fits_lock = threading.Lock()
+
+
+def theil_sen(times, values):
+    """Row-wise Theil–Sen slopes for (series, points) arrays; NaN marks padding."""
+    i, j = np.triu_indices(times.shape[1], 1)
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN rows give NaN
+        slopes = (values[:, j] - values[:, i]) / (times[:, j] - times[:, i])
+        return np.nanmedian(slopes, axis=1)
+
+
+def _fit(series, now):
+    """Forecasts for [(key, times, values, free)], one batched Theil–Sen pass over all of them."""
+    times = np.full((len(series), FIT_POINTS), np.nan)
+    values = np.full((len(series), FIT_POINTS), np.nan)
+    for row, (_, t, v, _) in enumerate(series):
+        if len(t) > FIT_POINTS:
+            pick = np.linspace(0, len(t) - 1, FIT_POINTS).astype(int)
+            t, v = t[pick], v[pick]
+        times[row, :len(t)] = (t - now) / DAY
+        values[row, :len(v)] = v
+    slopes = theil_sen(times, values)
+
+    results = {}
+    for (key, _, _, free), slope in zip(series, slopes):
+        filling = np.isfinite(slope) and slope < 0
+        results[key] = Forecast(float(slope), free, float(free / -slope) if filling else None)
+    return results
+
+
+def forecasts(paths):
+    """{path: {metric: Forecast}} for the given usage files, refitting only stale environments."""
+    results, stale = {}, []
+    for path in paths:
+        if not path:
+            continue
+        usage_store = store.get_store(path)
+        if usage_store.last is None:
+            continue
+        bucket = usage_store.last // (DAY // 24)
+        with _fits_lock:
+            cached = _fits.get(path)
+        if cached and cached[0] == bucket:
+            results[path] = cached[1]
+            continue
+        start = usage_store.last - int(FORECAST_DAYS * DAY)
+        with usage_store.lock:  # a refresh on another thread rewrites the buffers
+            for metric, buffer in usage_store.metrics.items():
+                if "Free Space" not in metric:
+                    continue
+                times, values, _, _ = buffer.rollups[TIER].range(start)
+                if len(times) >= MIN_POINTS:
+                    free = float(buffer.view()[1][-1])
+                    stale.append(((path, metric, bucket), times.copy(), values.astype(np.float64), free))
+        results[path] = {}
+
+    if stale:
+        now = max(key[2] for key, _, _, _ in stale) * (DAY // 24)
+        for (path, metric, _), forecast in _fit(stale, now).items():
+            results[path][metric] = forecast
+        with _fits_lock:
+            for path, _, bucket in {key for key, _, _, _ in stale}:
+                _fits[path] = (bucket, results[path])
+    return results
+
+
+def at_risk(all_forecasts, limit=5):
+    """(path, metric, Forecast) for drives projected to fill within AT_RISK_DAYS, soonest first."""
+    risky = [
+        (path, metric, forecast)
+        for path, fits in all_forecasts.items()
+        for metric, forecast in fits.items()
+        if forecast.days_to_full is not None and forecast.days_to_full <= AT_RISK_DAYS
+    ]
+    return sorted(risky, key=lambda item: item[2].days_to_full)[:limit]
+
+
+def describe(forecast):
+    """Short card text, e.g. "Full in ~12 days (-3.4 GB/day)"."""
+    if forecast is None:
+        return "Not enough history to forecast"
+    if forecast.days_to_full is None:
+        return "Not filling"
+    days = forecast.days_to_full
+    when = f"~{days * 24:.0f} h" if days < 2 else f"~{days:.0f} days"
+    return f"Full in {when} ({forecast.slope:+.1f} GB/day)"
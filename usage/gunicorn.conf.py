@@ -0,0 +1,41 @@
+"""
+gunicorn settings for the dashboard (Linux); run from this folder:
+
+    gunicorn -c gunicorn.conf.py wsgi:server
+
+On Windows use `python app.py`, which serves through waitress.
+"""
+
+import multiprocessing
+import os
+
+# Localhost unless BIND says otherwise (e.g. BIND=0.0.0.0:8050 behind a firewall or proxy)
+bind = os.getenv("BIND", f"127.0.0.1:{os.getenv('PORT', '8050')}")
+# Callbacks spend most of their time waiting on SQL Server, so a few processes with threads each
+workers = int(os.getenv("WEB_WORKERS", min(multiprocessing.cpu_count() * 2 + 1, 8)))
+worker_class = "gthread"
+threads = int(os.getenv("WEB_THREADS", "4"))
+# Import the app (Dash layout, plotly, pandas) once in the master and fork; database
+# connections are opened lazily per worker, so nothing is shared across the fork
+preload_app = True
+timeout = int(os.getenv("WEB_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers now and then to bound memory growth from large frames
+max_requests = int(os.getenv("WEB_MAX_REQUESTS", "1000"))
+max_requests_jitter = 100
+accesslog = "-"
+errorlog = "-"
+
+
+def pre_fork(server, worker):
+    # Importing the app opened the result cache's SQLite database in the master, and an SQLite
+    # connection must not be used on both sides of a fork; close it so each worker opens its own
+    import cache
+    cache.close()
+
+
+def post_fork(server, worker):
+    # Threads do not survive the fork, so each worker starts its own pre-warm scheduler
+    import prewarm
+    prewarm.start()
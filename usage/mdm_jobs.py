@@ -1,32 +1,19 @@
 from dash import html, dcc
+from dash.dependencies import Input, Output
 import plotly.express as px
 import pandas as pd
-import pyodbc
-import warnings
 from datetime import datetime, timedelta, time
-from dotenv import load_dotenv
-import os
+import cache
+import critical_path
+import db
+import drilldown
+from common import baselines, instrument, settings
 
-load_dotenv()
+# Monitored job groups, shared with the infa monitor (db has loaded .env by now)
+JOB_GROUPS = settings.mdm_job_groups()
 
-warnings.filterwarnings(
-    "ignore",
-    message="pandas only supports SQLAlchemy connectable",
-    category=UserWarning,
-)
-
-def load_mdm_data():
-    server = os.getenv('MDM_SERVER')
-    database = os.getenv('MDM_DATABASE')
-    username = os.getenv('MDM_USERNAME')
-    password = os.getenv('MDM_PASSWORD')
-
-    conn_str = (
-        f'DRIVER={{ODBC Driver 17 for SQL Server}};'
-        f'SERVER={server};DATABASE={database};UID={username};PWD={password}'
-    )
-
-    query = """
+# Shared CTE; queries select from `jobs` and pass GROUP_PARAMS ahead of their own parameters
+JOBS_CTE = """
     WITH jgc AS (
         SELECT ROWID_JOB_GROUP_CONTROL, ROWID_JOB_GROUP
         FROM C_REPOS_JOB_GROUP_CONTROL
@@ -49,46 +36,109 @@ def load_mdm_data():
             END AS REJECTS
         FROM C_REPOS_JOB_CONTROL a
         LEFT JOIN C_REPOS_JOB_STATUS_TYPE b ON a.RUN_STATUS = b.JOB_STATUS_CODE
+    ),
+    jobs AS (
+        SELECT 
+            jg.JOB_GROUP_NAME AS GroupName,
+            jc.TABLE_DISPLAY_NAME AS Display,
+            jc.START_RUN_DATE AS Start,
+            jc.END_RUN_DATE AS [End],
+            SUBSTRING(jc.STATUS, CHARINDEX('|', jc.STATUS)+1, LEN(jc.STATUS) - CHARINDEX('|', jc.STATUS)) AS Status,
+            jc.STATUS_MESSAGE AS Message,
+            jc.REJECTS AS Rejects
+        FROM C_REPOS_JOB_GROUP jg
+        LEFT JOIN jgc ON jg.ROWID_JOB_GROUP = jgc.ROWID_JOB_GROUP
+        LEFT JOIN jc ON jgc.ROWID_JOB_GROUP_CONTROL = jc.ROWID_JOB_GROUP_CONTROL
+        WHERE jg.JOB_GROUP_NAME IN ({groups})
     )
-    SELECT 
-        jg.JOB_GROUP_NAME AS GroupName,
-        jc.TABLE_DISPLAY_NAME AS Display,
-        jc.START_RUN_DATE AS Start,
-        jc.END_RUN_DATE AS [End],
-        SUBSTRING(jc.STATUS, CHARINDEX('|', jc.STATUS)+1, LEN(jc.STATUS) - CHARINDEX('|', jc.STATUS)) AS Status,
-        jc.STATUS_MESSAGE AS Message,
-        jc.REJECTS AS Rejects
-    FROM C_REPOS_JOB_GROUP jg
-    LEFT JOIN jgc ON jg.ROWID_JOB_GROUP = jgc.ROWID_JOB_GROUP
-    LEFT JOIN jc ON jgc.ROWID_JOB_GROUP_CONTROL = jc.ROWID_JOB_GROUP_CONTROL
-    WHERE jg.JOB_GROUP_NAME IN (
-        'StgBatchGroupSAP', 'BOBatchGroupAD', 'StgBatchGroupAD', 
-        'BOBatchGroupSap', 'TokenMatchMergeGrp', 
-        'BOBatchGroup_SRC_ID_SAPNO_FLAG_LDG_STG_BO', 
-        'StgBatchGroupWorkday', 'BOBatchGroupWorkday'
-    )
-    AND jc.START_RUN_DATE >= '2025-01-01'
-    """
+    """.format(groups=", ".join("?" * len(JOB_GROUPS)))
+GROUP_PARAMS = tuple(JOB_GROUPS)
 
-    conn = pyodbc.connect(conn_str)
-    df = pd.read_sql(query, conn)
-    conn.close()
-
-    df['Start'] = pd.to_datetime(df['Start'])
-    df['End'] = pd.to_datetime(df['End'])
-    df['Date'] = df['Start'].dt.date
+TREND_START = '2025-01-01'
+# Job groups that only start once their upstream groups are done (staging → base objects → match/merge)
+GROUP_DEPENDENCIES = {
+    'BOBatchGroupAD': ['StgBatchGroupAD'],
+    'BOBatchGroupSap': ['StgBatchGroupSAP'],
+    'BOBatchGroupWorkday': ['StgBatchGroupWorkday'],
+    'TokenMatchMergeGrp': ['BOBatchGroupAD', 'BOBatchGroupSap', 'BOBatchGroupWorkday',
+                           'BOBatchGroup_SRC_ID_SAPNO_FLAG_LDG_STG_BO'],
+}
 
+def mdm_window():
+    """Today's batch window: yesterday 10 PM to today 10 AM."""
     now = datetime.now()
     start_time = datetime.combine(now.date() - timedelta(days=1), time(22, 0))
     end_time = datetime.combine(now.date(), time(10, 0))
+    return start_time, end_time
+
+@cache.memoize()
+def load_mdm_kpis():
+    """Summary card numbers and pie counts, aggregated by the repository for today's window."""
+    query = f"""{JOBS_CTE}
+    SELECT
+        j.Status,
+        COUNT(*) AS Count,
+        SUM(j.Rejects) AS Rejects,
+        SUM(CAST(DATEDIFF(SECOND, j.Start, j.[End]) AS FLOAT)) AS TotalSeconds,
+        COUNT(j.[End]) AS Timed,
+        SUM(CASE WHEN j.Message LIKE '%Error%' OR j.Message LIKE '%401%' OR j.Message LIKE '%Failed%'
+            THEN 1 ELSE 0 END) AS FailedJobs
+    FROM jobs j
+    WHERE j.Start BETWEEN ? AND ?
+    GROUP BY j.Status
+    """
+    status_counts = db.read_frame(db.connection_string('MDM'), query, GROUP_PARAMS + mdm_window(), name='mdm_kpis')
+    timed = status_counts['Timed'].sum()
+
+    return {
+        'total_jobs': int(status_counts['Count'].sum()),
+        'total_rejects': int(status_counts['Rejects'].sum()),
+        'avg_duration': status_counts['TotalSeconds'].sum() / timed if timed else 0,
+        'failed_jobs': int(status_counts['FailedJobs'].sum()),
+        'status_counts': status_counts[['Status', 'Count']],
+    }
+
+@cache.memoize()
+def fetch_mdm_frames():
+    """Query phase: today's job rows plus the daily trend."""
+    conn_str = db.connection_string('MDM')
+    start_time, end_time = mdm_window()
+
+    # Detail rows for today's window only; the trend is aggregated by the repository
+    df_today = db.read_frame(conn_str, f"{JOBS_CTE}\n    SELECT * FROM jobs j WHERE j.Start BETWEEN ? AND ?", GROUP_PARAMS + (start_time, end_time), name='mdm_jobs')
+
+    trend_query = f"""{JOBS_CTE}
+    SELECT
+        CAST(j.Start AS DATE) AS Date,
+        COUNT(j.Display) AS total_jobs,
+        SUM(j.Rejects) AS total_rejects,
+        AVG(CAST(DATEDIFF(SECOND, j.Start, j.[End]) AS FLOAT)) AS avg_duration
+    FROM jobs j
+    WHERE j.Start >= ?
+    GROUP BY CAST(j.Start AS DATE)
+    ORDER BY Date
+    """
+    trend_df = db.read_frame(conn_str, trend_query, GROUP_PARAMS + (TREND_START,), name='mdm_trend')
+    return df_today, trend_df
+
+def transform_mdm_frames(df_today):
+    """Transform phase: parse dates and flag jobs slower than their duration baseline (read-only, the monitor learns)."""
+    df_today['Start'] = pd.to_datetime(df_today['Start'])
+    df_today['End'] = pd.to_datetime(df_today['End'])
 
-    df_today = df[(df['Start'] >= start_time) & (df['Start'] <= end_time)]
+    # Same keys as the Teams monitor uses for its baselines
+    keys = ('mdm:' + df_today['GroupName'].astype(str) + '/' + df_today['Display'].astype(str)).tolist()
+    history = baselines.read(cache.BASELINE_FILE)
+    usual = baselines.flag_frame(history, df_today, keys, 'Start', 'End', learn=False)
+    df_today['Usual'] = pd.Series(usual, index=df_today.index, dtype=float)
+    df_today['Slow'] = df_today['Usual'].notna()
+    # Blank for jobs the monitor has no baseline for (it learns up to midnight)
+    df_today['SlowFlag'] = baselines.slow_flags(history, keys, usual)
+    df_today.attrs['critical_path'] = critical_path.analyze(df_today, 'Start', 'End', 'GroupName', GROUP_DEPENDENCIES)
+    return df_today
 
-    total_jobs = len(df_today)
-    total_rejects = df_today['Rejects'].sum()
-    avg_duration = (df_today['End'] - df_today['Start']).mean()
-    failed_jobs = df_today[df_today['Message'].str.contains("Error|401|Failed", case=False, na=False)].shape[0]
-    
+@instrument.timed('formatter')
+def build_mdm_figures(df_today, trend_df):
     custom_order = [
     "Party",
     "Party Relationship",
@@ -129,12 +179,6 @@ def load_mdm_data():
         legend_title_text=''
         )
 
-    status_counts = df_today['Status'].value_counts().reset_index()
-    status_counts.columns = ['Status', 'Count']
-    pie_fig = px.pie(status_counts, names='Status', values='Count', title='Job Status Distribution', hole=0.4)
-    pie_fig.update_layout(legend=dict(orientation="h", y=1.16, x=0.5, xanchor="center", yanchor="top"),
-        )
-
     group_order = [
     'StgBatchGroupAD', 'BOBatchGroupAD',
     'StgBatchGroupSAP', 'BOBatchGroupSap',
@@ -142,29 +186,44 @@ def load_mdm_data():
     'BOBatchGroup_SRC_ID_SAPNO_FLAG_LDG_STG_BO',
     'TokenMatchMergeGrp'
     ]
-    gantt_fig = px.timeline(df_today, x_start='Start', x_end='End', y='GroupName', color='Status', hover_data=['Display', 'Message', 'Rejects'], title='Job Durations', category_orders={'GroupName': group_order})
+    slow = df_today['Slow'].sum()
+    gantt_fig = px.timeline(df_today, x_start='Start', x_end='End', y='GroupName', color='Status', hover_data=['Display', 'Message', 'Rejects', 'Usual', 'Slack'], title=f'Job Durations (🐢 {slow} slower than usual)' if slow else 'Job Durations', category_orders={'GroupName': group_order},
+                            pattern_shape='SlowFlag', pattern_shape_map={'yes': '/', 'no': '', '': ''}, labels={'SlowFlag': 'Slower than usual', 'Usual': 'Usual (min)', 'Slack': 'Slack (min)'})
     gantt_fig.update_yaxes(autorange="reversed")
+    path = df_today.attrs.get('critical_path', [])
+    critical_path.add_path(gantt_fig, df_today, path, 'Start', 'End', 'GroupName')
+    critical_path.with_subtitle(gantt_fig, critical_path.describe(df_today, path, 'Display', 'Start', 'End'))
     gantt_fig.update_layout(xaxis_title=None, 
         yaxis_title=None, 
         legend=dict(orientation="h", y=1.16, x=0.5, xanchor="center", yanchor="top"),
         legend_title_text=''
         )
 
-    trend_df = df.groupby('Date').agg(
-        total_jobs=('Display', 'count'),
-        total_rejects=('Rejects', 'sum'),
-        avg_duration=('Start', lambda x: (df.loc[x.index, 'End'] - x).mean().total_seconds() if not x.empty else 0)
-    ).reset_index()
-
     line_fig = px.line(trend_df, x='Date', y=['total_jobs', 'total_rejects', 'avg_duration'], markers=True, title='Job Trends Over Time')
     line_fig.update_layout(legend=dict(orientation="h", y=1.16, x=0.5, xanchor="center", yanchor="top")
     )
 
-    return df_today, total_jobs, total_rejects, avg_duration, failed_jobs, bar_fig, pie_fig, gantt_fig, line_fig
+    return bar_fig, gantt_fig, line_fig
 
-def layout():
-    df_today, total_jobs, total_rejects, avg_duration, failed_jobs, bar_fig, pie_fig, gantt_fig, line_fig = load_mdm_data()
+def load_mdm_data():
+    df_today, trend_df = fetch_mdm_frames()
+    df_today = transform_mdm_frames(df_today)
+    bar_fig, gantt_fig, line_fig = build_mdm_figures(df_today, trend_df)
+    return df_today, bar_fig, gantt_fig, line_fig
+
+def mdm_run_rows():
+    """Today's job rows for the drill-down table."""
+    return fetch_mdm_frames()[0]
+
+
+def build_status_pie(status_counts):
+    pie_fig = px.pie(status_counts, names='Status', values='Count', title='Job Status Distribution', hole=0.4)
+    pie_fig.update_layout(legend=dict(orientation="h", y=1.16, x=0.5, xanchor="center", yanchor="top"),
+        )
+    return pie_fig
 
+def layout():
+    """Page skeleton; the cards and charts are filled in by register_callbacks as their data arrives."""
     return html.Div([
         html.H1("MDM Batch Summary", style={'textAlign': 'center'}),
         
@@ -182,20 +241,72 @@ def layout():
             "flexDirection": "column",
             "alignItems": "flex-start"}),
         
-        html.Div([
-            html.Div([html.H3("✅ Total Jobs Run"), html.P(str(int(total_jobs)))], className='card'),
-            html.Div([html.H3("❌ Total Rejects"), html.P(str(int(total_rejects)))], className='card'),
-            html.Div([html.H3("⏱️ Avg. Duration (sec)"), html.P(f"{avg_duration.total_seconds():.2f}" if pd.notnull(avg_duration) else "0.00")], className='card'),
-            html.Div([html.H3("⚠️ Failed Jobs Count"), html.P(str(int(failed_jobs)))], className='card'),
-        ], className='metric-container'),
+        html.Div([html.Div(className='card skeleton') for _ in range(4)],
+                 id='mdm-summary-cards', className='metric-container'),
 
         html.Div([
-            html.Div([dcc.Graph(figure=bar_fig)], className='graph-half'),
-            html.Div([dcc.Graph(figure=pie_fig)], className='graph-half'),
+            html.Div(html.Div(className='skeleton'), id='mdm-bar-chart', className='graph-half'),
+            html.Div(html.Div(className='skeleton'), id='mdm-pie-chart', className='graph-half'),
         ], className='graph-row'),
 
-        html.Div([dcc.Graph(figure=gantt_fig)], className='graph-full graph-section'),
-        html.Div([dcc.Graph(figure=line_fig)], className='graph-full graph-section'),
+        html.Div(html.Div(className='skeleton'), id='mdm-gantt-chart', className='graph-full graph-section'),
+        html.Div(html.Div(className='skeleton'), id='mdm-line-chart', className='graph-full graph-section'),
+        html.Div([html.H3("Job Details"), drilldown.table('mdm-run-table', 'mdm_jobs')], className='graph-full graph-section'),
+        dcc.Store(id='mdm-run-table-loaded'),
 
         dcc.Interval(id="daily-refresh", interval=24*60*60*1000, n_intervals=0)
     ])
+
+def register_callbacks(app):
+    @app.callback(
+        Output('mdm-summary-cards', 'children'),
+        Output('mdm-pie-chart', 'children'),
+        Input('daily-refresh', 'n_intervals'),
+        background=cache.BACKGROUND,
+    )
+    @instrument.timed('callback')
+    def update_mdm_cards(_):
+        kpis = load_mdm_kpis()
+        cards = [
+            html.Div([html.H3("✅ Total Jobs Run"), html.P(str(kpis['total_jobs']))], className='card'),
+            html.Div([html.H3("❌ Total Rejects"), html.P(str(kpis['total_rejects']))], className='card'),
+            html.Div([html.H3("⏱️ Avg. Duration (sec)"), html.P(f"{kpis['avg_duration']:.2f}")], className='card'),
+            html.Div([html.H3("⚠️ Failed Jobs Count"), html.P(str(kpis['failed_jobs']))], className='card'),
+        ]
+        return cards, dcc.Graph(figure=build_status_pie(kpis['status_counts']))
+
+    @app.callback(
+        Output('mdm-bar-chart', 'children'),
+        Output('mdm-gantt-chart', 'children'),
+        Output('mdm-line-chart', 'children'),
+        Input('daily-refresh', 'n_intervals'),
+        background=cache.BACKGROUND,
+    )
+    @instrument.timed('callback')
+    def update_mdm_charts(_):
+        df_today, bar_fig, gantt_fig, line_fig = load_mdm_data()
+        return dcc.Graph(figure=bar_fig), dcc.Graph(figure=gantt_fig), dcc.Graph(figure=line_fig)
+
+    # Loading may query the repository (background); paging only reads the SQLite copy
+    @app.callback(
+        Output('mdm-run-table-loaded', 'data'),
+        Input('daily-refresh', 'n_intervals'),
+        background=cache.BACKGROUND,
+    )
+    @instrument.timed('callback')
+    def load_mdm_table(_):
+        return drilldown.refresh('mdm_jobs', mdm_run_rows)
+
+    @app.callback(
+        Output('mdm-run-table', 'data'),
+        Output('mdm-run-table', 'page_count'),
+        Output('mdm-run-table', 'page_current'),
+        Input('mdm-run-table', 'page_current'),
+        Input('mdm-run-table', 'page_size'),
+        Input('mdm-run-table', 'sort_by'),
+        Input('mdm-run-table', 'filter_query'),
+        Input('mdm-run-table-loaded', 'data'),
+    )
+    @instrument.timed('callback')
+    def update_mdm_table(page_current, page_size, sort_by, filter_query, _):
+        return drilldown.page('mdm_jobs', page_current, page_size, sort_by, filter_query)
@@ -1,20 +1,18 @@
 from dash import html, dcc
-from dash.dependencies import Input, Output
+from dash.dependencies import Input, Output, State
+from dash.exceptions import PreventUpdate
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
-import pyodbc
-import warnings
 from datetime import datetime, timedelta, time
-from dotenv import load_dotenv
-import os
-
-warnings.filterwarnings(
-    "ignore",
-    message="pandas only supports SQLAlchemy connectable",
-    category=UserWarning,
-)
+import cache
+import critical_path
+import db
+import drilldown
+from common import baselines, instrument
+import throughput
+import timeline
 
 status_colors = {
     'Succeeded': 'green',
@@ -43,18 +41,86 @@ colorscale = [
     [1.0, 'green']       # Succeeded
 ]
 
-def load_pc_data(folder=None):
-    server = os.getenv('PC_SERVER')
-    database = os.getenv('PC_DATABASE')
-    username = os.getenv('PC_USERNAME')
-    password = os.getenv('PC_PASSWORD')
-
-    conn_str = (
-        f'DRIVER={{ODBC Driver 17 for SQL Server}};'
-        f'SERVER={server};DATABASE={database};UID={username};PWD={password}'
-    )
+def pc_window():
+    """Today's batch window: yesterday 10 PM to today 10 AM."""
+    now = datetime.now()
+    start_time = datetime.combine(now.date() - timedelta(days=1), time(22, 0))
+    end_time = datetime.combine(now.date(), time(10, 0))
+    return start_time, end_time
+
+@cache.memoize(expire=3600)
+def load_pc_folders():
+    query = """
+    SELECT DISTINCT SUBJECT_AREA AS Folder
+    FROM REP_WFLOW_RUN
+    WHERE SUBJECT_AREA NOT IN ('Shared', 'Monitoring')
+    ORDER BY SUBJECT_AREA
+    """
+    df = db.read_frame(db.connection_string('PC'), query, name='pc_folders')
+    return df['Folder'].dropna().tolist()
+
+@cache.memoize()
+def load_pc_kpis(folder=None):
+    """Summary card numbers and pie counts, aggregated by the repository for today's window."""
+    conn_str = db.connection_string('PC')
+    start_time, end_time = pc_window()
+    folder_filter = "\n      AND SUBJECT_AREA = ?" if folder else ""
+    params = (start_time, end_time) + ((folder,) if folder else ())
+
+    wf_query = f"""
+    SELECT
+      CASE RUN_STATUS_CODE
+        WHEN 1 THEN 'Succeeded'
+        WHEN 2 THEN 'Disabled'
+        WHEN 3 THEN 'Failed'
+        WHEN 4 THEN 'Stopped'
+        WHEN 5 THEN 'Aborted'
+        WHEN 6 THEN 'Running'
+        WHEN 15 THEN 'Terminated'
+        ELSE 'Unknown'
+      END AS Status,
+      COUNT(*) AS Count,
+      SUM(CAST(DATEDIFF(MINUTE, START_TIME, END_TIME) AS FLOAT)) AS TotalDuration,
+      COUNT(END_TIME) AS Timed
+    FROM REP_WFLOW_RUN
+    WHERE SUBJECT_AREA NOT IN ('Shared', 'Monitoring')
+      AND START_TIME BETWEEN ? AND ?{folder_filter}
+    GROUP BY RUN_STATUS_CODE
+    """
+    sess_query = f"""
+    SELECT
+      COUNT(*) AS TotalSessions,
+      COALESCE(SUM(CASE WHEN RUN_STATUS_CODE = 3 THEN 1 ELSE 0 END), 0) AS FailedSessions
+    FROM REP_SESS_LOG
+    WHERE SUBJECT_AREA NOT IN ('Shared', 'Monitoring')
+      AND ACTUAL_START BETWEEN ? AND ?{folder_filter}
+    """
 
-    # Workflow query
+    status_counts = db.read_frame(conn_str, wf_query, params, name='pc_kpis')
+    status_counts = status_counts.groupby('Status', as_index=False).sum()
+    sessions = db.read_frame(conn_str, sess_query, params, name='pc_kpis_sessions').iloc[0]
+    by_status = status_counts.set_index('Status')['Count']
+    timed = status_counts['Timed'].sum()
+
+    return {
+        'total_runs': int(status_counts['Count'].sum()),
+        'successes': int(by_status.get('Succeeded', 0)),
+        'failures': int(by_status.get('Failed', 0)),
+        'avg_duration': status_counts['TotalDuration'].sum() / timed if timed else 0,
+        'total_sessions': int(sessions['TotalSessions']),
+        'failed_sessions': int(sessions['FailedSessions']),
+        'status_counts': status_counts[['Status', 'Count']],
+    }
+
+@cache.memoize()
+def fetch_pc_frames(folder=None):
+    """Query phase: today's workflow and session rows plus the daily trend."""
+    conn_str = db.connection_string('PC')
+    start_time, end_time = pc_window()
+    # The folder is bound as a parameter so each query has only two statement texts to plan
+    folder_params = (folder,) if folder else ()
+
+    # Workflow query (today's window only; the trend is aggregated separately)
     wf_query = """
     SELECT
       run.SUBJECT_AREA        AS Folder,
@@ -77,17 +143,16 @@ def load_pc_data(folder=None):
       run.RUN_ERR_MSG       AS ErrMsg,
       run.USER_NAME         AS UserName
     FROM REP_WFLOW_RUN run
+    WHERE run.START_TIME BETWEEN ? AND ?
     """
 
+    wf_query += "\n  AND run.SUBJECT_AREA NOT IN ('Shared', 'Monitoring')"
     if folder:
-        wf_query += f"\nWHERE run.SUBJECT_AREA NOT IN ('Shared', 'Monitoring') AND run.SUBJECT_AREA = '{folder}'"
-    else:
-        wf_query += "\nWHERE run.SUBJECT_AREA NOT IN ('Shared', 'Monitoring')"
+        wf_query += "\n  AND run.SUBJECT_AREA = ?"
 
     wf_query += "\nORDER BY run.START_TIME DESC"
 
-    conn = pyodbc.connect(conn_str)
-    df_wf = pd.read_sql(wf_query, conn)
+    df_today = db.read_frame(conn_str, wf_query, (start_time, end_time) + folder_params, name='pc_workflows')
 
     # Session query
     sess_query = """
@@ -107,49 +172,115 @@ def load_pc_data(folder=None):
             ELSE 'Unknown'
         END AS Status,
         ACTUAL_START AS ActualStart,
+        SESSION_TIMESTAMP AS SessionEnd,
         SUCCESSFUL_ROWS AS SuccessfulRows
     FROM REP_SESS_LOG
+    WHERE ACTUAL_START BETWEEN ? AND ?
     """
 
+    sess_query += "\n  AND SUBJECT_AREA NOT IN ('Shared', 'Monitoring')"
     if folder:
-        sess_query += f"\nWHERE SUBJECT_AREA NOT IN ('Shared', 'Monitoring') AND SUBJECT_AREA = '{folder}'"
-    else:
-        sess_query += "\nWHERE SUBJECT_AREA NOT IN ('Shared', 'Monitoring')"
+        sess_query += "\n  AND SUBJECT_AREA = ?"
 
-    df_sess = pd.read_sql(sess_query, conn)
-    conn.close()
+    df_sess_today = db.read_frame(conn_str, sess_query, (start_time, end_time) + folder_params, name='pc_sessions')
 
-     # Process dates
-    df_wf['START_TIME'] = pd.to_datetime(df_wf['START_TIME'])
-    df_wf['END_TIME'] = pd.to_datetime(df_wf['END_TIME'])
-    df_sess['ActualStart'] = pd.to_datetime(df_sess['ActualStart'])
+    # Trend query (6 months, one row per day)
+    trend_query = """
+    SELECT
+      CAST(run.START_TIME AS DATE) AS Date,
+      COUNT(run.WORKFLOW_RUN_ID) AS total,
+      AVG(CAST(DATEDIFF(MINUTE, run.START_TIME, run.END_TIME) AS FLOAT)) AS avg_dur
+    FROM REP_WFLOW_RUN run
+    WHERE run.START_TIME >= ?
+    """
 
-    # Filter today’s timeframe
-    now = datetime.now()
-    start_time = datetime.combine(now.date() - timedelta(days=1), time(22, 0))
-    end_time = datetime.combine(now.date(), time(10, 0))
+    trend_query += "\n  AND run.SUBJECT_AREA NOT IN ('Shared', 'Monitoring')"
+    if folder:
+        trend_query += "\n  AND run.SUBJECT_AREA = ?"
 
-    df_today = df_wf[(df_wf['START_TIME'] >= start_time) & (df_wf['START_TIME'] <= end_time)]
-    df_sess_today = df_sess[df_sess['ActualStart'].between(start_time, end_time)]
+    trend_query += "\nGROUP BY CAST(run.START_TIME AS DATE)\nORDER BY Date"
+
+    trend_start = datetime.combine(datetime.now().date() - timedelta(days=180), time(0, 0))
+    trend = db.read_frame(conn_str, trend_query, (trend_start,) + folder_params, name='pc_trend')
+    return df_today, df_sess_today, trend
+
+@cache.memoize()
+def load_pc_throughput(folder=None):
+    """Daily rows and run minutes of successful sessions per workflow and session (THROUGHPUT_DAYS)."""
+    query = """
+    SELECT
+      CAST(ACTUAL_START AS DATE) AS Date,
+      WORKFLOW_NAME AS Workflow,
+      SESSION_NAME AS SessionName,
+      COUNT(*) AS Runs,
+      SUM(CAST(SUCCESSFUL_ROWS AS BIGINT)) AS LoadedRows,
+      SUM(DATEDIFF(SECOND, ACTUAL_START, SESSION_TIMESTAMP)) / 60.0 AS Minutes
+    FROM REP_SESS_LOG
+    WHERE ACTUAL_START >= ?
+      AND RUN_STATUS_CODE = 1
+      AND SESSION_TIMESTAMP > ACTUAL_START
+      AND SUBJECT_AREA NOT IN ('Shared', 'Monitoring')
+    """
+    if folder:
+        query += "\n  AND SUBJECT_AREA = ?"
+    query += "\nGROUP BY CAST(ACTUAL_START AS DATE), WORKFLOW_NAME, SESSION_NAME\nORDER BY Date"
 
-    # Metrics
-    total_runs = len(df_today)
-    successes = df_today[df_today.Status == 'Succeeded'].shape[0]
-    failures = df_today[df_today.Status == 'Failed'].shape[0]
-    avg_duration = df_today['Duration'].mean() or 0
+    start = datetime.combine(datetime.now().date() - timedelta(days=throughput.DAYS), time(0, 0))
+    params = (start,) + ((folder,) if folder else ())
+    daily = db.read_frame(db.connection_string('PC'), query, params, name='pc_throughput')
+    daily['Date'] = pd.to_datetime(daily['Date'])
+    return daily
 
-    total_sessions = len(df_sess_today)
-    failed_sessions = df_sess_today[df_sess_today.Status == 'Failed'].shape[0]
+def flag_slow_runs(df, keys, start, end):
+    """Add Usual (minutes), Slow and SlowFlag columns from each run's duration baseline (read-only, the monitor learns).
+
+    The monitor only learns its PC_SUBJECT_AREAS' runs up to midnight, so later runs and other
+    folders often have no baseline; their SlowFlag is blank rather than 'no'.
+    """
+    history = baselines.read(cache.BASELINE_FILE)
+    keys = keys.tolist()
+    usual = baselines.flag_frame(history, df, keys, start, end, learn=False)
+    df['Usual'] = pd.Series(usual, index=df.index, dtype=float)
+    df['Slow'] = df['Usual'].notna()
+    df['SlowFlag'] = baselines.slow_flags(history, keys, usual)
+
+def transform_pc_frames(df_today, df_sess_today):
+    """Transform phase: parse dates, session throughput, flag slow runs and join sessions to their workflow run."""
+    # Process dates
+    df_today['START_TIME'] = pd.to_datetime(df_today['START_TIME'])
+    df_today['END_TIME'] = pd.to_datetime(df_today['END_TIME'])
+    df_sess_today['ActualStart'] = pd.to_datetime(df_sess_today['ActualStart'])
+    df_sess_today['SessionEnd'] = pd.to_datetime(df_sess_today['SessionEnd'])
+    minutes = (df_sess_today['SessionEnd'] - df_sess_today['ActualStart']).dt.total_seconds() / 60
+    df_sess_today['RowsPerMinute'] = throughput.rows_per_minute(df_sess_today['SuccessfulRows'], minutes)
+
+    # Same keys as the Teams monitor uses for its baselines
+    workflow_keys = 'pc:' + df_today['Folder'] + '/' + df_today['Workflow']
+    flag_slow_runs(df_today, workflow_keys, 'START_TIME', 'END_TIME')
+    session_keys = 'pc:' + df_sess_today['Folder'] + '/' + df_sess_today['Workflow'] + '/' + df_sess_today['SessionName']
+    flag_slow_runs(df_sess_today, session_keys, 'ActualStart', 'SessionEnd')
+    df_today.attrs['critical_path'] = critical_path.analyze(df_today, 'START_TIME', 'END_TIME', 'Workflow')
 
     # Join session and workflow data for full view
     df_merged = pd.merge(
         df_sess_today,
-        df_today[['RunID', 'START_TIME', 'END_TIME']],
+        df_today[['RunID', 'START_TIME', 'END_TIME', 'Slow', 'SlowFlag', 'Usual', 'Slack']].rename(
+            columns={'Slow': 'WorkflowSlow', 'SlowFlag': 'WorkflowSlowFlag', 'Usual': 'WorkflowUsual'}),
         how='left',
         on='RunID'
     )
+    df_merged['WorkflowSlow'] = df_merged['WorkflowSlow'].fillna(False).astype(bool)
+    df_merged['WorkflowSlowFlag'] = df_merged['WorkflowSlowFlag'].fillna('')
     df_merged['Duration'] = (df_merged['END_TIME'] - df_merged['START_TIME']).dt.total_seconds() / 60
+    return df_today, df_merged
+
+def slow_title(title, workflows, sessions):
+    if not workflows and not sessions:
+        return title
+    return f"{title} (🐢 {workflows} workflows, {sessions} sessions slower than usual)"
 
+@instrument.timed('formatter')
+def build_pc_figures(df_today, df_merged, trend):
     # Bar chart (workflow-level durations)
     duration_df = (
         df_today
@@ -168,40 +299,44 @@ def load_pc_data(folder=None):
     bar_fig.update_layout(legend=dict(orientation='h', y=1.15, x=0.5, xanchor='center'),
         legend_title_text='', xaxis_title=None)
 
-    status_counts = df_today.Status.value_counts().reset_index()
-    status_counts.columns = ['Status', 'Count']
-    pie_fig = px.pie(status_counts,
-                     names='Status',
-                     values='Count',
-                     color='Status',
-                     color_discrete_map=status_colors,
-                     hole=0.4,
-                     title='Status Distribution')
-    pie_fig.update_layout(legend=dict(orientation='h', y=1.15, x=0.5, xanchor='center'))
-
-    # Gantt chart from session data
-    gantt_fig = px.timeline(
-        df_merged,
-        x_start='START_TIME',
-        x_end='END_TIME',
-        y='Workflow',
-        color='Status',
-        color_discrete_map=status_colors,
-        title='Workflow Durations'
-    )
-    gantt_fig.update_yaxes(autorange='reversed')
-    gantt_fig.update_layout(yaxis_title=None, xaxis_title=None, legend=dict(orientation='h', y=1.15, x=0.5, xanchor='center'), legend_title_text='')
+    gantt_fig = build_pc_gantt(df_today, df_merged)
 
     # Trend chart (6 months)
-    trend = (
-        df_wf[df_wf['START_TIME'] >= (datetime.now() - pd.Timedelta(days=180))]
-        .groupby(df_wf['START_TIME'].dt.date)
-        .agg(total=('RunID', 'count'), avg_dur=('Duration', 'mean'))
-        .reset_index()
-        .rename(columns={'START_TIME': 'Date'})
-    )
     line_fig = px.line(trend, x='Date', y=['total', 'avg_dur'], markers=True, title='Job Trends')
-    
+    return bar_fig, gantt_fig, line_fig
+
+def build_pc_gantt(df_today, df_merged, x_range=None):
+    """Gantt chart from session data; busy nights use the level-of-detail timeline instead of px.timeline."""
+    title = slow_title('Workflow Durations', df_today['Slow'].sum(), df_merged['Slow'].sum())
+    if len(df_merged) > timeline.DETAIL_ROWS:
+        # Sessions at their own times, merged per workflow lane when zoomed out
+        gantt_fig = timeline.figure(df_merged, 'ActualStart', 'SessionEnd', 'Workflow', 'Status',
+                                    status_colors, status_to_num, x_range, title)
+    else:
+        gantt_fig = px.timeline(
+            df_merged,
+            x_start='START_TIME',
+            x_end='END_TIME',
+            y='Workflow',
+            color='Status',
+            color_discrete_map=status_colors,
+            pattern_shape='WorkflowSlowFlag',
+            pattern_shape_map={'yes': '/', 'no': '', '': ''},
+            hover_data={'SessionName': True, 'WorkflowUsual': True, 'Slack': True,
+                        'SuccessfulRows': ':,', 'RowsPerMinute': ':,.0f'},
+            labels={'WorkflowSlowFlag': 'Slower than usual', 'WorkflowUsual': 'Usual (min)', 'Slack': 'Slack (min)',
+                    'SuccessfulRows': 'Rows', 'RowsPerMinute': 'Rows / min'},
+            title=title
+        )
+        gantt_fig.update_yaxes(autorange='reversed')
+        gantt_fig.update_layout(yaxis_title=None, xaxis_title=None, legend=dict(orientation='h', y=1.15, x=0.5, xanchor='center'), legend_title_text='')
+    path = df_today.attrs.get('critical_path', [])
+    critical_path.add_path(gantt_fig, df_today, path, 'START_TIME', 'END_TIME', 'Workflow')
+    critical_path.with_subtitle(gantt_fig, critical_path.describe(df_today, path, 'Workflow', 'START_TIME', 'END_TIME'))
+    return gantt_fig
+
+@instrument.timed('formatter')
+def build_pc_heatmap(df_merged):
     # Pivot-style chart (Workflow > Session > Status)
     pivot_data = df_merged[['Workflow', 'SessionName', 'Status']]
     pivot_data = pivot_data.sort_values(by=['Workflow', 'SessionName'])
@@ -258,29 +393,48 @@ def load_pc_data(folder=None):
         height=height
     )
 
-    return (
-        df_today,
-        total_runs,
-        successes,
-        failures,
-        avg_duration,
-        bar_fig,
-        pie_fig,
-        gantt_fig,
-        line_fig,
-        df_wf,
-        total_sessions,
-        failed_sessions,
-        pivot_fig
-    )
+    return pivot_fig
 
-    #return df_today, total_runs, successes, failures, avg_duration, bar_fig, pie_fig, gantt_fig, line_fig, df_wf, total_sessions, failed_sessions
+def load_pc_data(folder=None):
+    df_today, df_sess_today, trend = fetch_pc_frames(folder)
+    df_today, df_merged = transform_pc_frames(df_today, df_sess_today)
+    bar_fig, gantt_fig, line_fig = build_pc_figures(df_today, df_merged, trend)
+    pivot_fig = build_pc_heatmap(df_merged)
+    return df_today, bar_fig, gantt_fig, line_fig, pivot_fig
+
+
+def pc_run_rows(folder=None):
+    """Workflow and session rows of today's window for the drill-down table (all folders by default)."""
+    df_today, df_sess_today, _trend = fetch_pc_frames(folder)
+    workflows = pd.DataFrame({
+        'Level': 'Workflow', 'Folder': df_today['Folder'], 'Workflow': df_today['Workflow'], 'Session': None,
+        'RunID': df_today['RunID'], 'Start': df_today['START_TIME'], 'End': df_today['END_TIME'],
+        'Status': df_today['Status'], 'ErrCode': df_today['ErrCode'], 'ErrMsg': df_today['ErrMsg'],
+        'UserName': df_today['UserName'], 'SuccessfulRows': None,
+    })
+    sessions = pd.DataFrame({
+        'Level': 'Session', 'Folder': df_sess_today['Folder'], 'Workflow': df_sess_today['Workflow'],
+        'Session': df_sess_today['SessionName'], 'RunID': df_sess_today['RunID'],
+        'Start': df_sess_today['ActualStart'], 'End': df_sess_today['SessionEnd'], 'Status': df_sess_today['Status'],
+        'ErrCode': None, 'ErrMsg': None, 'UserName': None, 'SuccessfulRows': df_sess_today['SuccessfulRows'],
+    })
+    return pd.concat([workflows, sessions], ignore_index=True)
+
+
+def build_status_pie(status_counts):
+    pie_fig = px.pie(status_counts,
+                     names='Status',
+                     values='Count',
+                     color='Status',
+                     color_discrete_map=status_colors,
+                     hole=0.4,
+                     title='Status Distribution')
+    pie_fig.update_layout(legend=dict(orientation='h', y=1.15, x=0.5, xanchor='center'))
+    return pie_fig
 
 
 def layout():
-    _, _, _, _, _, _, _, _, _, df_wf, _, _, _ = load_pc_data()
-    folder_options = [{"label": f, "value": f} for f in sorted(df_wf['Folder'].dropna().unique()) if f not in ['Monitoring', 'Shared']]
-
+    """Page skeleton; every section is filled in by its own callback as its data arrives."""
     return html.Div([
         html.H1("PC Jobs Summary", style={'textAlign': 'center'}),
 
@@ -293,47 +447,150 @@ def layout():
             html.Label("Filter by Folder:"),
             dcc.Dropdown(
                 id='pc-folder-dropdown',
-                options=folder_options,
+                options=[],
                 value=None,
                 placeholder="Select a folder",
                 style={'width': '300px', 'margin': '0 auto'}
             )
         ], style={'textAlign': 'center', 'marginTop': '60px', 'marginBottom': '20px'}),
 
-        html.Div(id='pc-summary-cards', className='metric-container'),
-        html.Div(id='pc-graph-row', className='graph-row'),
-        html.Div(id='pc-gantt-chart', className='graph-full'),
-        html.Div(id='pc-pivot-chart', className='graph-tall', style={'overflowX': 'auto'}),
-        html.Div(id='pc-line-chart', className='graph-full'),
+        html.Div([html.Div(className='card skeleton') for _ in range(6)],
+                 id='pc-summary-cards', className='metric-container'),
+        html.Div([
+            html.Div(html.Div(className='skeleton'), id='pc-bar-chart', className='graph-half'),
+            html.Div(html.Div(className='skeleton'), id='pc-pie-chart', className='graph-half'),
+        ], className='graph-row'),
+        html.Div(html.Div(className='skeleton'), id='pc-gantt-chart', className='graph-full'),
+        html.Div(html.Div(className='skeleton'), id='pc-pivot-chart', className='graph-tall', style={'overflowX': 'auto'}),
+        html.Div(html.Div(className='skeleton'), id='pc-line-chart', className='graph-full'),
+        html.Div([
+            dcc.Dropdown(id='pc-throughput-workflow', options=[], value=None, placeholder="All workflows",
+                         style={'width': '400px'}),
+            html.Div(html.Div(className='skeleton'), id='pc-throughput-chart'),
+        ], className='graph-full'),
+        html.Div([html.H3("Run Details"), drilldown.table('pc-run-table', 'pc_runs')], className='graph-full'),
+        dcc.Store(id='pc-run-table-loaded'),
 
         dcc.Interval(id='pc-refresh', interval=24*60*60*1000, n_intervals=0)
     ])
 
 def register_callbacks(app):
+    # Each section is a separate (background) callback so they run side by side and the page
+    # fills in progressively; the frames they share come from the cache after the first load
+    @app.callback(
+        Output('pc-folder-dropdown', 'options'),
+        Input('pc-refresh', 'n_intervals'),
+        background=cache.BACKGROUND,
+    )
+    @instrument.timed('callback')
+    def update_pc_folders(_):
+        return [{"label": f, "value": f} for f in load_pc_folders()]
+
     @app.callback(
         Output('pc-summary-cards', 'children'),
-        Output('pc-graph-row', 'children'),
-        Output('pc-gantt-chart', 'children'),
-        Output('pc-line-chart', 'children'),
-        Output('pc-pivot-chart', 'children'),
+        Output('pc-pie-chart', 'children'),
         Input('pc-folder-dropdown', 'value'),
-        Input('pc-refresh', 'n_intervals')
+        Input('pc-refresh', 'n_intervals'),
+        background=cache.BACKGROUND,
     )
-    def update_pc_dashboard(selected_folder, _):
-        df_today, total_runs, successes, failures, avg_duration, bar_fig, pie_fig, gantt_fig, line_fig, _, total_sessions, failed_sessions, pivot_fig = load_pc_data(selected_folder)
+    @instrument.timed('callback')
+    def update_pc_cards(selected_folder, _):
+        kpis = load_pc_kpis(selected_folder)
 
         cards = [
-            html.Div([html.H3("Total Runs"), html.P(str(total_runs))], className='card'),
-            html.Div([html.H3("✅ Succeeded"), html.P(str(successes))], className='card'),
-            html.Div([html.H3("⚠️ Failed"), html.P(str(failures))], className='card'),
-            html.Div([html.H3("⏱️ Avg. Duration (m)"), html.P(f"{avg_duration:.2f}")], className='card'),
-            html.Div([html.H3("🧩 Total Sessions"), html.P(str(total_sessions))], className='card'),
-            html.Div([html.H3("❌ Failed Sessions"), html.P(str(failed_sessions))], className='card'),
+            html.Div([html.H3("Total Runs"), html.P(str(kpis['total_runs']))], className='card'),
+            html.Div([html.H3("✅ Succeeded"), html.P(str(kpis['successes']))], className='card'),
+            html.Div([html.H3("⚠️ Failed"), html.P(str(kpis['failures']))], className='card'),
+            html.Div([html.H3("⏱️ Avg. Duration (m)"), html.P(f"{kpis['avg_duration']:.2f}")], className='card'),
+            html.Div([html.H3("🧩 Total Sessions"), html.P(str(kpis['total_sessions']))], className='card'),
+            html.Div([html.H3("❌ Failed Sessions"), html.P(str(kpis['failed_sessions']))], className='card'),
         ]
+        return cards, dcc.Graph(figure=build_status_pie(kpis['status_counts']))
 
-        graphs = [
-            html.Div([dcc.Graph(figure=bar_fig)], className='graph-half'),
-            html.Div([dcc.Graph(figure=pie_fig)], className='graph-half'),
-        ]
+    @app.callback(
+        Output('pc-bar-chart', 'children'),
+        Output('pc-gantt-chart', 'children'),
+        Output('pc-line-chart', 'children'),
+        Input('pc-folder-dropdown', 'value'),
+        Input('pc-refresh', 'n_intervals'),
+        background=cache.BACKGROUND,
+    )
+    @instrument.timed('callback')
+    def update_pc_charts(selected_folder, _):
+        df_today, df_sess_today, trend = fetch_pc_frames(selected_folder)
+        df_today, df_merged = transform_pc_frames(df_today, df_sess_today)
+        bar_fig, gantt_fig, line_fig = build_pc_figures(df_today, df_merged, trend)
+        return dcc.Graph(figure=bar_fig), dcc.Graph(id='pc-gantt-graph', figure=gantt_fig), dcc.Graph(figure=line_fig)
+
+    # Loading the drill-down rows may query the repository, so it runs in the background; the
+    # table's paging, sorting and filtering below only read the SQLite copy
+    @app.callback(
+        Output('pc-run-table-loaded', 'data'),
+        Input('pc-folder-dropdown', 'value'),
+        Input('pc-refresh', 'n_intervals'),
+        background=cache.BACKGROUND,
+    )
+    @instrument.timed('callback')
+    def load_pc_table(selected_folder, _):
+        return drilldown.refresh('pc_runs', lambda: pc_run_rows(selected_folder), where={'Folder': selected_folder})
+
+    @app.callback(
+        Output('pc-run-table', 'data'),
+        Output('pc-run-table', 'page_count'),
+        Output('pc-run-table', 'page_current'),
+        Input('pc-run-table', 'page_current'),
+        Input('pc-run-table', 'page_size'),
+        Input('pc-run-table', 'sort_by'),
+        Input('pc-run-table', 'filter_query'),
+        Input('pc-run-table-loaded', 'data'),
+        State('pc-folder-dropdown', 'value'),
+    )
+    @instrument.timed('callback')
+    def update_pc_table(page_current, page_size, sort_by, filter_query, _, selected_folder):
+        return drilldown.page('pc_runs', page_current, page_size, sort_by, filter_query, {'Folder': selected_folder})
 
-        return cards, graphs, dcc.Graph(figure=gantt_fig), dcc.Graph(figure=line_fig), dcc.Graph(figure=pivot_fig)
+    # Zooming a level-of-detail timeline redraws just the visible range, in more detail
+    @app.callback(
+        Output('pc-gantt-graph', 'figure'),
+        Input('pc-gantt-graph', 'relayoutData'),
+        State('pc-folder-dropdown', 'value'),
+        prevent_initial_call=True,
+    )
+    @instrument.timed('callback')
+    def update_pc_timeline(relayout, selected_folder):
+        x_range = timeline.visible_range(relayout)
+        if x_range is False:
+            raise PreventUpdate
+        df_today, df_sess_today, _trend = fetch_pc_frames(selected_folder)
+        if len(df_sess_today) <= timeline.DETAIL_ROWS:
+            raise PreventUpdate  # px.timeline, zoomed in the browser
+        df_today, df_merged = transform_pc_frames(df_today, df_sess_today)
+        return build_pc_gantt(df_today, df_merged, x_range)
+
+    @app.callback(
+        Output('pc-pivot-chart', 'children'),
+        Input('pc-folder-dropdown', 'value'),
+        Input('pc-refresh', 'n_intervals'),
+        background=cache.BACKGROUND,
+    )
+    @instrument.timed('callback')
+    def update_pc_heatmap(selected_folder, _):
+        df_today, df_sess_today, _trend = fetch_pc_frames(selected_folder)
+        df_merged = transform_pc_frames(df_today, df_sess_today)[1]
+        return dcc.Graph(figure=build_pc_heatmap(df_merged))
+
+    @app.callback(
+        Output('pc-throughput-workflow', 'options'),
+        Output('pc-throughput-chart', 'children'),
+        Input('pc-folder-dropdown', 'value'),
+        Input('pc-throughput-workflow', 'value'),
+        Input('pc-refresh', 'n_intervals'),
+        background=cache.BACKGROUND,
+    )
+    @instrument.timed('callback')
+    def update_pc_throughput(selected_folder, selected_workflow, _):
+        daily = load_pc_throughput(selected_folder)
+        options = throughput.workflow_options(daily)
+        if selected_workflow not in {o['value'] for o in options}:
+            selected_workflow = None  # not in this folder
+        return options, dcc.Graph(figure=throughput.figure(daily, selected_workflow))
@@ -0,0 +1,107 @@
+"""
+Cache pre-warming for the dashboards.
+
+The default views (every PC folder and today's window, MDM, each usage environment) are loaded
+into the caches when a worker starts, at PREWARM_TIMES (default 06:05, after the infa monitor's
+06:00 report, and 10:05, after the PC batch window closes) and whenever something POSTs
+/prewarm, which the infa monitor does after its report when PREWARM_URL is set. The first page
+load of the morning is then a cache hit.
+
+Scheduled and requested runs reload the repository data even if it is still cached; with
+several gunicorn workers only one of them does that per run (cache.claim), while each warms
+its own in-memory usage stores.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import cache
+import drilldown
+import forecast
+from common import instrument
+import mdm_jobs
+import pc_jobs
+import usage
+
+PREWARM_TIMES = [t.strip() for t in os.getenv("PREWARM_TIMES", "06:05,10:05").split(",") if t.strip()]
+PREWARM_TOKEN = os.getenv("PREWARM_TOKEN")
+
+_started = False
+_started_lock = threading.Lock()
+_running = threading.Lock()
+
+
+def warm_repository(reload):
+    """PC and MDM loaders with the arguments the pages use by default; `reload` bypasses the cache."""
+    max_age = 0 if reload else cache.CACHE_TTL
+    for loader, args in (
+        (pc_jobs.load_pc_folders, ()),
+        (pc_jobs.load_pc_kpis, (None,)),
+        (pc_jobs.fetch_pc_frames, (None,)),
+        (pc_jobs.load_pc_throughput, (None,)),
+        (mdm_jobs.load_mdm_kpis, ()),
+        (mdm_jobs.fetch_mdm_frames, ()),
+    ):
+        (loader.refresh if reload else loader)(*args)
+    drilldown.refresh('pc_runs', pc_jobs.pc_run_rows, max_age)
+    drilldown.refresh('mdm_jobs', mdm_jobs.mdm_run_rows, max_age)
+
+
+def warm_usage():
+    # Loads (or tails) every environment's store on the way
+    forecast.forecasts(list(usage.csv_file_paths))
+
+
+def warm(reason, reload=True, run_id=None):
+    """One pre-warm run; returns False if another one is still going in this process."""
+    if not _running.acquire(blocking=False):
+        return False
+    try:
+        with instrument.span("job", f"prewarm:{reason}"):
+            started = time.perf_counter()
+            if not reload or cache.claim(f"prewarm:{run_id or time.time()}"):
+                warm_repository(reload)
+            warm_usage()
+            print(f"🔥 Pre-warmed caches ({reason}) in {time.perf_counter() - started:.1f}s")
+    except Exception as e:
+        print(f"⚠️ Pre-warm ({reason}) failed: {e}")
+    finally:
+        _running.release()
+    return True
+
+
+def trigger(reason):
+    """Pre-warm in the background (for the /prewarm endpoint); False if a run is already going."""
+    if _running.locked():
+        return False
+    threading.Thread(target=warm, args=(reason,), name="prewarm", daemon=True).start()
+    return True
+
+
+def next_run(now):
+    runs = []
+    for at in PREWARM_TIMES:
+        hour, minute = map(int, at.split(":"))
+        run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        runs.append(run if run > now else run + timedelta(days=1))
+    return min(runs)
+
+
+def _schedule():
+    warm("startup", reload=False)
+    while PREWARM_TIMES:
+        run = next_run(datetime.now())
+        time.sleep(max(0.0, (run - datetime.now()).total_seconds()))
+        # Every worker wakes up at the same time; run_id lets only one reload the repository data
+        warm(f"scheduled {run:%H:%M}", run_id=run.isoformat())
+
+
+def start():
+    """Start the pre-warm thread once per process (after a gunicorn fork, see gunicorn.conf.py)."""
+    global _started
+    with _started_lock:
+        if not _started:
+            _started = True
+            threading.Thread(target=_schedule, name="prewarm-scheduler", daemon=True).start()
@@ -0,0 +1,126 @@
+"""
+Opt-in profiling of Dash callback requests.
+
+Nothing is hooked in unless PROFILE_TOKEN is set. With a token, a callback request is profiled when
+
+- it carries an `X-Profile: <token>` header (optionally `X-Profile-Callback: update_pc_heatmap`), or
+- profiling was armed with `GET /_profile?callback=update_pc_heatmap&count=5`, again with the
+  `X-Profile: <token>` header (kept out of the URL so access logs do not record it)
+
+Each profile is written to PROFILE_DIR with a JSON sidecar holding the callback inputs. pyinstrument
+(a sampling profiler, HTML flame view) is used when installed, otherwise cProfile (.pstats).
+Background callbacks run in another process, so start the app with BACKGROUND_CALLBACKS=0 to profile them.
+"""
+
+import cProfile
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from time import perf_counter
+
+try:
+    from pyinstrument import Profiler
+except ImportError:  # optional, falls back to cProfile
+    Profiler = None
+
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"))
+SAMPLE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.001"))  # pyinstrument sampling interval, seconds
+MAX_ARMED = 20  # requests armed per callback at most
+
+_armed = {}  # callback name ("*" for any) -> remaining requests to profile
+_armed_lock = threading.Lock()
+_running = threading.Lock()  # one profile at a time; the profilers are process-wide
+
+
+def callback_name(app, body):
+    """Name of the Python function behind a /_dash-update-component request."""
+    callback = app.callback_map.get(body.get("output"), {}).get("callback")
+    return getattr(callback, "__name__", None) or body.get("output", "unknown")
+
+
+def arm(callback="*", count=1):
+    """Profile the next `count` requests of `callback`; returns how many are now armed for it."""
+    with _armed_lock:
+        _armed[callback] = min(_armed.get(callback, 0) + max(count, 1), MAX_ARMED)
+        return _armed[callback]
+
+
+def _take_armed(name):
+    with _armed_lock:
+        for key in (name, "*"):
+            if _armed.get(key):
+                _armed[key] -= 1
+                if not _armed[key]:
+                    del _armed[key]
+                return True
+    return False
+
+
+def wanted(name, headers):
+    """Whether this callback request should be profiled; consumes an armed slot if it matches."""
+    if headers.get("X-Profile") == PROFILE_TOKEN:
+        return headers.get("X-Profile-Callback", name) == name
+    return bool(_armed) and _take_armed(name)
+
+
+class RequestProfile:
+    def __init__(self, name, body):
+        self.name = name
+        self.body = body
+        self.started = perf_counter()
+        if Profiler is not None:
+            self.profiler = Profiler(interval=SAMPLE_INTERVAL)
+            self.profiler.start()
+        else:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def finish(self, status_code):
+        """Stop profiling and write the profile plus its inputs; returns the profile path."""
+        try:
+            if Profiler is not None:
+                self.profiler.stop()
+            else:
+                self.profiler.disable()
+        finally:
+            _running.release()
+        elapsed = perf_counter() - self.started
+
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        safe_name = re.sub(r"[^\w.-]", "_", self.name)
+        stem = os.path.join(PROFILE_DIR, f"{datetime.now():%Y%m%d_%H%M%S_%f}_{safe_name}")
+        if Profiler is not None:
+            path = f"{stem}.html"
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(self.profiler.output_html())
+        else:
+            path = f"{stem}.pstats"
+            self.profiler.dump_stats(path)
+
+        with open(f"{stem}.json", "w", encoding="utf-8") as f:
+            json.dump({
+                "callback": self.name,
+                "output": self.body.get("output"),
+                "inputs": self.body.get("inputs"),
+                "state": self.body.get("state"),
+                "seconds": round(elapsed, 4),
+                "status": status_code,
+                "profile": os.path.basename(path),
+            }, f, indent=2, default=str)
+        print(f"🔬 Profiled {self.name} ({elapsed:.2f}s) -> {path}")
+        return path
+
+
+def start(name, body):
+    """Begin profiling a request, or return None if another request is already being profiled."""
+    if not _running.acquire(blocking=False):
+        print(f"⏭️ Not profiling {name}, another profile is running")
+        return None
+    try:
+        return RequestProfile(name, body)
+    except Exception:
+        _running.release()
+        raise
@@ -0,0 +1,263 @@
+"""
+Resident time-series store for the usage CSV files.
+
+Each environment file is read once and then tailed: only bytes appended since the last refresh
+are parsed. Every metric lives in a preallocated NumPy ring buffer (int64 epoch nanoseconds,
+float32 values) sized for USAGE_RETENTION_DAYS of samples every USAGE_SAMPLE_SECONDS, plus
+rollup tiers (see TIERS) holding min/max/avg per bucket, updated as samples arrive, so long
+ranges can be drawn from a few hundred buckets instead of every raw sample.
+
+The buffers are written twice (at i and i + capacity), so the most recent samples are always
+one contiguous slice and range queries return views instead of copies. A refresh (from any
+callback thread) writes over the oldest samples and may replace `metrics`, so readers hold the
+store's `lock` while they walk the buffers and copy what they keep past it.
+"""
+
+import io
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+RETENTION_DAYS = float(os.getenv("USAGE_RETENTION_DAYS", "30"))
+SAMPLE_SECONDS = int(os.getenv("USAGE_SAMPLE_SECONDS", "60"))
+MAX_POINTS = int(os.getenv("USAGE_MAX_POINTS", "1500"))  # points a chart needs at most
+COLUMNS = ["Timestamp", "Metric", "Value", "Threshold"]
+TIMESTAMP_FORMAT = "%Y.%m.%d %H:%M:%S"
+GB = 1024 ** 3
+# (name, bucket seconds, retention days)
+TIERS = (
+    ("1m", 60, 7),
+    ("15m", 15 * 60, 90),
+    ("1h", 60 * 60, 400),
+    ("1d", 24 * 60 * 60, 5 * 366),
+)
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def in_gb(metric):
+    return metric == "Memory Usage" or "Free Space" in metric
+
+
+def _retained(count, capacity):
+    """Slice of a double-written ring holding its retained rows, oldest first."""
+    size = min(count, capacity)
+    end = (count - 1) % capacity + capacity + 1 if count else 0
+    return slice(end - size, end)
+
+
+class RollupBuffer:
+    """Ring buffer of fixed-width buckets with min/max/avg, the newest bucket still open."""
+
+    __slots__ = ("width", "capacity", "times", "low", "high", "mean", "total", "samples", "count")
+
+    def __init__(self, seconds, retention_days):
+        self.width = seconds * 10 ** 9
+        self.capacity = max(1, int(retention_days * 86400 / seconds))
+        self.times = np.zeros(2 * self.capacity, dtype=np.int64)  # bucket start
+        self.low = np.zeros(2 * self.capacity, dtype=np.float32)
+        self.high = np.zeros(2 * self.capacity, dtype=np.float32)
+        self.mean = np.zeros(2 * self.capacity, dtype=np.float32)
+        self.total = np.zeros(2 * self.capacity, dtype=np.float64)
+        self.samples = np.zeros(2 * self.capacity, dtype=np.int64)
+        self.count = 0
+
+    def add(self, times, values):
+        """Fold samples (in time order, newer than any seen before) into their buckets."""
+        buckets = times - times % self.width
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        bucket_times = buckets[starts]
+        low = np.minimum.reduceat(values, starts)
+        high = np.maximum.reduceat(values, starts)
+        total = np.add.reduceat(values.astype(np.float64), starts)
+        samples = np.diff(np.r_[starts, len(values)])
+
+        last = (self.count - 1) % self.capacity
+        if self.count and bucket_times[0] == self.times[last]:
+            # Samples for the bucket that is still open
+            for i in (last, last + self.capacity):
+                self.low[i] = min(self.low[i], low[0])
+                self.high[i] = max(self.high[i], high[0])
+                self.total[i] += total[0]
+                self.samples[i] += samples[0]
+                self.mean[i] = self.total[i] / self.samples[i]
+            bucket_times, low, high, total, samples = (
+                bucket_times[1:], low[1:], high[1:], total[1:], samples[1:])
+
+        if len(bucket_times) > self.capacity:
+            keep = slice(-self.capacity, None)
+            bucket_times, low, high, total, samples = (
+                bucket_times[keep], low[keep], high[keep], total[keep], samples[keep])
+        if not len(bucket_times):
+            return
+        index = (self.count + np.arange(len(bucket_times))) % self.capacity
+        for i in (index, index + self.capacity):
+            self.times[i] = bucket_times
+            self.low[i] = low
+            self.high[i] = high
+            self.total[i] = total
+            self.samples[i] = samples
+            self.mean[i] = total / samples
+        self.count += len(bucket_times)
+
+    def range(self, start=None, end=None):
+        """Buckets starting in (start, end] as (times, mean, low, high) views."""
+        rows = _retained(self.count, self.capacity)
+        times = self.times[rows]
+        lo = np.searchsorted(times, start, side="right") if start is not None else 0
+        hi = np.searchsorted(times, end, side="right") if end is not None else len(times)
+        window = slice(rows.start + lo, rows.start + hi)
+        return self.times[window], self.mean[window], self.low[window], self.high[window]
+
+
+class MetricBuffer:
+    """Ring buffer of (timestamp, value) samples for one metric, with its rollup tiers."""
+
+    __slots__ = ("capacity", "times", "values", "count", "threshold", "rollups")
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.times = np.zeros(2 * capacity, dtype=np.int64)
+        self.values = np.zeros(2 * capacity, dtype=np.float32)
+        self.count = 0
+        self.threshold = np.nan
+        self.rollups = {name: RollupBuffer(seconds, days) for name, seconds, days in TIERS}
+
+    @property
+    def last(self):
+        return int(self.times[(self.count - 1) % self.capacity]) if self.count else None
+
+    def append(self, times, values):
+        """Append samples in time order; anything not newer than the last sample is dropped."""
+        if self.count:
+            keep = times > self.last
+            times, values = times[keep], values[keep]
+        if not len(times):
+            return
+        for rollup in self.rollups.values():
+            rollup.add(times, values)
+        if len(times) > self.capacity:
+            times, values = times[-self.capacity:], values[-self.capacity:]
+        index = (self.count + np.arange(len(times))) % self.capacity
+        self.times[index] = self.times[index + self.capacity] = times
+        self.values[index] = self.values[index + self.capacity] = values
+        self.count += len(times)
+
+    def view(self):
+        """All retained samples, oldest first, as views into the buffer."""
+        rows = _retained(self.count, self.capacity)
+        return self.times[rows], self.values[rows]
+
+    def range(self, start=None, end=None):
+        """Samples with start < timestamp <= end (epoch ns, either bound optional), as views."""
+        times, values = self.view()
+        lo = np.searchsorted(times, start, side="right") if start is not None else 0
+        hi = np.searchsorted(times, end, side="right") if end is not None else len(times)
+        return times[lo:hi], values[lo:hi]
+
+
+class UsageStore:
+    """All metrics of one usage file, kept up to date by tailing the file."""
+
+    def __init__(self, path, retention_days=RETENTION_DAYS, sample_seconds=SAMPLE_SECONDS):
+        self.path = path
+        self.sample_seconds = sample_seconds
+        self.capacity = max(1, int(retention_days * 86400 / sample_seconds))
+        self.metrics = {}
+        self.offset = 0
+        self.first = None
+        self.last = None
+        self.lock = threading.Lock()  # held by refresh() and by readers of the buffers
+
+    def reset(self):
+        self.metrics = {}
+        self.offset = 0
+        self.first = None
+        self.last = None
+
+    def tier_for(self, span, max_points=MAX_POINTS):
+        """Coarsest resolution that still draws `span` ns with detail: None for raw samples, else a tier name.
+
+        That is the finest source needing at most `max_points` points whose retention covers the span.
+        """
+        if span <= self.capacity * self.sample_seconds * 10 ** 9 and span <= max_points * self.sample_seconds * 10 ** 9:
+            return None
+        for name, seconds, days in TIERS:
+            if span <= max_points * seconds * 10 ** 9 and span <= days * 86400 * 10 ** 9:
+                return name
+        return TIERS[-1][0]
+
+    def latest(self):
+        """{metric: (value, threshold)} for the metrics in the newest sample."""
+        with self.lock:
+            return {
+                metric: (float(buffer.view()[1][-1]), float(buffer.threshold))
+                for metric, buffer in self.metrics.items()
+                if buffer.last == self.last
+            }
+
+    def thresholds(self):
+        """{metric: threshold} as of the last refresh."""
+        with self.lock:
+            return {metric: float(buffer.threshold) for metric, buffer in self.metrics.items()}
+
+    def refresh(self):
+        """Ingest lines appended since the last call; returns the number of new rows."""
+        with self.lock:
+            try:
+                size = os.path.getsize(self.path)
+            except OSError:
+                return 0
+            if size < self.offset:  # truncated or replaced
+                self.reset()
+            if size == self.offset:
+                return 0
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                chunk = f.read(size - self.offset)
+            # Leave a partially written last line for the next refresh
+            complete = chunk.rfind(b"\n") + 1
+            if not complete:
+                return 0
+            header = 0 if self.offset == 0 else None
+            self.offset += complete
+            df = pd.read_csv(io.BytesIO(chunk[:complete]), sep="|", header=header, names=COLUMNS)
+            if df.empty:
+                return 0
+            self._ingest(df)
+            return len(df)
+
+    def _ingest(self, df):
+        times = pd.to_datetime(df["Timestamp"], format=TIMESTAMP_FORMAT).to_numpy("datetime64[ns]").view(np.int64)
+        values = df["Value"].to_numpy(dtype=np.float64)
+        thresholds = df["Threshold"].to_numpy(dtype=np.float64)
+        codes, names = pd.factorize(df["Metric"])
+        for code, metric in enumerate(names):
+            rows = codes == code
+            scale = GB if in_gb(metric) else 1
+            buffer = self.metrics.get(metric)
+            if buffer is None:
+                buffer = self.metrics[metric] = MetricBuffer(self.capacity)
+            buffer.append(times[rows], (values[rows] / scale).astype(np.float32))
+            buffer.threshold = thresholds[rows][-1] / scale
+        if self.first is None:
+            self.first = int(times.min())
+        self.last = max(b.last for b in self.metrics.values())
+
+
+def get_store(path):
+    """The resident store for a usage file, refreshed with anything appended since the last call."""
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = UsageStore(path)
+    store.refresh()
+    return store
+
+
+def to_datetime(times):
+    """Zero-copy datetime64 view of epoch-ns timestamps (for plotting)."""
+    return times.view("datetime64[ns]")
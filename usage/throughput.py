@@ -0,0 +1,53 @@
+"""
+Session throughput: rows loaded per minute of run time.
+
+SUCCESSFUL_ROWS over the ACTUAL_START to SESSION_TIMESTAMP duration shows a load that slowed
+down (fewer rows per minute) or shrank (fewer rows) even when its runtime looks normal. The
+repository rolls successful sessions up per day, workflow and session for the last
+THROUGHPUT_DAYS days; the trend chart has one line per workflow, or per session once a workflow
+is picked.
+"""
+
+import os
+
+import pandas as pd
+import plotly.express as px
+
+DAYS = int(os.getenv("THROUGHPUT_DAYS", "90"))
+MAX_LINES = int(os.getenv("THROUGHPUT_MAX_LINES", "10"))  # busiest workflows/sessions drawn
+
+
+def rows_per_minute(rows, minutes):
+    """Element-wise rate; NaN where the duration is missing or not positive."""
+    return pd.to_numeric(rows, errors='coerce') / minutes.where(minutes > 0)
+
+
+def rollup(daily, workflow=None):
+    """Daily rows, minutes and rate per workflow, or per session of `workflow`."""
+    if workflow:
+        daily, lane = daily[daily['Workflow'] == workflow], 'SessionName'
+    else:
+        lane = 'Workflow'
+    df = daily.groupby(['Date', lane], as_index=False)[['Runs', 'LoadedRows', 'Minutes']].sum()
+    df['RowsPerMinute'] = rows_per_minute(df['LoadedRows'], df['Minutes'])
+    return df, lane
+
+
+def workflow_options(daily):
+    """Dropdown options, busiest workflow first."""
+    totals = daily.groupby('Workflow')['LoadedRows'].sum().sort_values(ascending=False)
+    return [{"label": w, "value": w} for w in totals.index]
+
+
+def figure(daily, workflow=None):
+    df, lane = rollup(daily, workflow)
+    busiest = df.groupby(lane)['LoadedRows'].sum().nlargest(MAX_LINES).index
+    df = df[df[lane].isin(busiest)]
+    title = f"Throughput: {workflow}" if workflow else "Throughput by Workflow"
+    if len(busiest) == MAX_LINES:
+        title += f" (busiest {MAX_LINES})"
+    fig = px.line(df, x='Date', y='RowsPerMinute', color=lane, markers=True, title=title,
+                  hover_data={'LoadedRows': ':,', 'Runs': True, 'Minutes': ':.0f'},
+                  labels={'RowsPerMinute': 'rows / min', 'LoadedRows': 'Rows', 'SessionName': 'Session'})
+    fig.update_layout(legend_title_text='', xaxis_title=None)
+    return fig
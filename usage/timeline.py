@@ -0,0 +1,98 @@
+"""
+Level-of-detail timeline for Gantt charts with many bars.
+
+px.timeline draws one bar per row, so a busy night of thousands of sessions becomes megabytes
+of figure JSON. Here each status is a single WebGL trace of thick line segments, and runs in
+the same lane that overlap or sit closer together than TIMELINE_MIN_PIXELS at the current zoom
+are merged into one bar. When the chart is zoomed, only the visible range is redrawn, with every
+run as its own bar once no more than TIMELINE_DETAIL_ROWS of them are in view.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+PIXELS = int(os.getenv("TIMELINE_PIXELS", "1200"))  # assumed plot width
+MIN_PIXELS = float(os.getenv("TIMELINE_MIN_PIXELS", "3"))
+DETAIL_ROWS = int(os.getenv("TIMELINE_DETAIL_ROWS", "500"))  # px.timeline below this, no merging in view
+BAR_WIDTH = 12
+
+
+def visible_range(relayout):
+    """(start, end) Timestamps of a zoomed x axis, None once it is reset, or False if the x axis did not change."""
+    if not relayout:
+        return False
+    if relayout.get('xaxis.autorange'):
+        return None
+    if 'xaxis.range[0]' in relayout:
+        return pd.Timestamp(relayout['xaxis.range[0]']), pd.Timestamp(relayout['xaxis.range[1]'])
+    if 'xaxis.range' in relayout:
+        return tuple(pd.Timestamp(x) for x in relayout['xaxis.range'])
+    return False
+
+
+def merge_runs(df, start, end, lane, status, rank, tolerance):
+    """One row per chain of overlapping or near-adjacent runs in a lane.
+
+    Columns lane, start, end, status (the worst one by `rank`, lowest first) and Runs. Statuses
+    missing from `rank` count as worse than any ranked one, so they stay visible.
+    """
+    df = df.sort_values([lane, start])
+    starts = df[start].to_numpy("datetime64[ns]").view(np.int64)
+    ends = df[end].to_numpy("datetime64[ns]").view(np.int64)
+    codes = pd.factorize(df[lane])[0]
+
+    # A run starts a new bar unless it begins before the lane's bar so far has ended (+ tolerance)
+    reach = pd.Series(ends).groupby(codes).cummax().to_numpy()
+    new_bar = np.r_[True, (codes[1:] != codes[:-1]) | (starts[1:] > reach[:-1] + tolerance)]
+    bars = np.cumsum(new_bar) - 1
+
+    # Several statuses can share a rank (Failed, Aborted, ...), so keep the name of each bar's worst run
+    severity = pd.Series(df[status].map(rank).fillna(min(rank.values(), default=0) - 1).to_numpy())
+    worst = severity.groupby(bars).idxmin().to_numpy()
+    first = np.flatnonzero(new_bar)
+    return pd.DataFrame({
+        lane: df[lane].to_numpy()[first],
+        start: pd.to_datetime(np.minimum.reduceat(starts, first)),
+        end: pd.to_datetime(np.maximum.reduceat(ends, first)),
+        status: df[status].to_numpy()[worst],
+        'Runs': np.bincount(bars),
+    })
+
+
+def figure(df, start, end, lane, status, colors, rank, x_range=None, title=None):
+    """Timeline of `df` (one row per run) for the given x range (None for the whole frame)."""
+    df = df.dropna(subset=[start, end]).fillna({status: 'Unknown'})
+    lanes = sorted(df[lane].astype(str).unique())
+    if x_range is not None:
+        df = df[(df[end] >= x_range[0]) & (df[start] <= x_range[1])]
+    if len(df) > DETAIL_ROWS:
+        lo, hi = x_range if x_range is not None else (df[start].min(), df[end].max())
+        tolerance = int((hi - lo).value / PIXELS * MIN_PIXELS)
+        df = merge_runs(df, start, end, lane, status, rank, tolerance)
+    else:
+        df = df.assign(Runs=1)
+
+    fig = go.Figure()
+    for name, rows in df.groupby(status, sort=False):
+        n = len(rows)
+        starts = np.datetime_as_string(rows[start].to_numpy("datetime64[ms]"))
+        ends = np.datetime_as_string(rows[end].to_numpy("datetime64[ms]"))
+        x = np.empty(3 * n, dtype=object)
+        x[0::3], x[1::3] = starts, ends
+        y = np.empty(3 * n, dtype=object)
+        y[0::3] = y[1::3] = rows[lane].astype(str).to_numpy()
+        text = np.empty(3 * n, dtype=object)
+        text[0::3] = text[1::3] = [f"{runs} run{'s' if runs > 1 else ''}" for runs in rows['Runs']]
+        fig.add_trace(go.Scattergl(
+            x=x, y=y, text=text, mode='lines', name=str(name), connectgaps=False,
+            line=dict(color=colors.get(name, 'grey'), width=BAR_WIDTH),
+            hovertemplate='%{y}<br>%{x}<br>%{text}<extra>' + str(name) + '</extra>',
+        ))
+    fig.update_yaxes(type='category', categoryorder='array', categoryarray=lanes, autorange='reversed')
+    fig.update_xaxes(type='date', range=list(x_range) if x_range is not None else None)
+    fig.update_layout(title=title, yaxis_title=None, xaxis_title=None, height=max(400, 24 * len(lanes)),
+                      legend=dict(orientation='h', y=1.15, x=0.5, xanchor='center'), uirevision='timeline')
+    return fig
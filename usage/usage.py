@@ -1,9 +1,19 @@
-from dash import dcc, html, Output, Input
+import json
+from dash import dcc, html, Output, Input, State, ALL, ClientsideFunction, ctx, no_update
+from dash.exceptions import PreventUpdate
+from flask import Response
 import plotly.express as px
+import numpy as np
 import pandas as pd
 import datetime
 from dotenv import load_dotenv
 import os
+import threading
+import time
+import forecast
+from common import instrument
+import store
+import watcher
 
 load_dotenv()
 
@@ -20,25 +30,24 @@ csv_file_paths = {
     os.getenv("PWC_PRD"): "PWC Prd"
 }
 
-# Load and process data
-def load_data(file_path):
-    df = pd.read_csv(file_path, sep='|')
-    df['Timestamp'] = pd.to_datetime(df['Timestamp'])
-    df['Value'] = df['Value'].astype(float)
-    df['Threshold'] = df['Threshold'].astype(float)
-
-    gb_metrics = ['Memory Usage'] + [m for m in df['Metric'].unique() if 'Free Space' in m]
-    df.loc[df['Metric'].isin(gb_metrics), ['Value', 'Threshold']] /= 1024 ** 3
-    return df
-
 # Time range options
 TIME_OPTIONS = {
     "All": None,
     "Last 15 minutes": datetime.timedelta(minutes=15),
     "Last 1 hour": datetime.timedelta(hours=1),
-    "Last 6 hours": datetime.timedelta(hours=6)
+    "Last 6 hours": datetime.timedelta(hours=6),
+    # Longer ranges are drawn from the store's rollup tiers (min/max band around the average)
+    "Last 7 days": datetime.timedelta(days=7),
+    "Last 30 days": datetime.timedelta(days=30),
+    "Last 1 year": datetime.timedelta(days=365)
 }
 
+# Each event stream holds a server thread: at most this many per process (the rest of the tabs
+# poll), each ended after EVENT_STREAM_SECONDS and reopened by the browser after `retry`
+EVENT_STREAMS = int(os.getenv("USAGE_EVENT_STREAMS", "2"))
+EVENT_STREAM_SECONDS = int(os.getenv("USAGE_EVENT_STREAM_SECONDS", "300"))
+_event_slots = threading.BoundedSemaphore(EVENT_STREAMS)
+
 # Layout for the /usage route
 layout = html.Div([
     html.H1("System Metrics Dashboard", style={"textAlign": "center"}),
@@ -79,6 +88,13 @@ layout = html.Div([
         )
     ], style={"textAlign": "center", "marginTop": "20px", "marginBottom": "30px"}),
 
+    # Drives across all environments projected to fill soon
+    html.Div(id='forecast-summary', style={
+        "display": "flex",
+        "justifyContent": "center",
+        "marginTop": "20px"
+    }),
+
     html.Div(id='latest-values', style={
         "display": "flex",
         "flexWrap": "wrap",
@@ -88,6 +104,12 @@ layout = html.Div([
 
     html.Div(id='metrics-grid-container', className="grid-container", style={"padding": "10px"}),
 
+    # What the graphs currently show, so refreshes can append instead of redrawing
+    dcc.Store(id='usage-state'),
+    # Set by assets/usage_events.js when the server reports a changed usage file
+    dcc.Store(id='usage-events'),
+
+    # Fallback polling, disabled while the event stream is connected
     dcc.Interval(
         id='refresh-interval',
         interval=300000,  # 5 minutes
@@ -95,101 +117,305 @@ layout = html.Div([
     ),
 ])
 
-def register_callbacks(app):
-    @app.callback(
-        Output('metrics-grid-container', 'children'),
-        Output('latest-values', 'children'),
-        Input('refresh-interval', 'n_intervals'),
-        Input('time-range-dropdown', 'value'),
-        Input('file-selector', 'value')
-    )
-    def update_dashboard(n, selected_range, selected_file):
-        df = load_data(selected_file)
+def select(usage_store, selected_range):
+    """Resolution, {metric: (times, values, low, high)} for the selected range, and the newest timestamp.
 
-        if TIME_OPTIONS[selected_range]:
-            time_cutoff = df['Timestamp'].max() - TIME_OPTIONS[selected_range]
-            df = df[df['Timestamp'] >= time_cutoff]
+    Raw samples (low and high None) when the range fits a chart, otherwise rollup buckets of the
+    coarsest tier that still gives the chart enough points. Copied under the store lock (at most
+    a chart's worth of points per metric), so a refresh on another thread cannot change them.
+    """
+    with usage_store.lock:
+        last = usage_store.last
+        if last is None:
+            return None, {}, None
+        span = TIME_OPTIONS[selected_range]
+        if span:
+            span = pd.Timedelta(span).value
+            start = last - span - 1
+        else:
+            span = last - usage_store.first
+            start = None
+        tier = usage_store.tier_for(span)
+        series = {}
+        for metric, buffer in usage_store.metrics.items():
+            if tier is None:
+                times, values = buffer.range(start)
+                low = high = None
+            else:
+                times, values, low, high = buffer.rollups[tier].range(start)
+                low, high = low.copy(), high.copy()
+            if len(times):
+                series[metric] = (times.copy(), values.copy(), low, high)
+    return tier, series, last
 
-        latest_time = df['Timestamp'].max()
-        latest = df[df['Timestamp'] == latest_time]
 
-        metric_cards = []
+def metric_graph(metric, fig):
+    return dcc.Graph(id={'type': 'usage-graph', 'metric': metric}, figure=fig,
+                     config={'displayModeBar': False}, style={"height": "300px"})
 
-        # CPU
-        cpu_df = df[df['Metric'] == 'CPU Usage']
-        cpu_fig = px.line(cpu_df, x="Timestamp", y="Value", title="CPU Usage")
-        cpu_fig.update_layout(yaxis=dict(range=[0, 100]))
-        if not cpu_df.empty:
-            cpu_fig.add_hline(y=85, line_dash="dot", annotation_text="CPU Threshold", line_color="red")
-        metric_cards.append(html.Div([
-            html.H2("CPU Usage", style={"textAlign": "center"}),
-            dcc.Graph(figure=cpu_fig, config={'displayModeBar': False}, style={"height": "300px"})
-        ], className="metric-card"))
 
-        # Memory
-        mem_df = df[df['Metric'] == 'Memory Usage']
-        mem_fig = px.line(mem_df, x="Timestamp", y="Value", title="Memory Usage (GB)")
-        if not mem_df.empty:
-            max_mem = max(mem_df['Threshold'].max() * 1.1, mem_df['Value'].max() * 1.1)
-            mem_fig.update_layout(yaxis=dict(range=[0, max_mem]))
-            mem_fig.add_hline(y=mem_df['Threshold'].iloc[-1], line_dash="dot", annotation_text="Memory Threshold", line_color="red")
+def line_figure(times, values, title, low=None, high=None):
+    x = store.to_datetime(times)
+    fig = px.line(x=x, y=values, title=title, labels={'x': 'Timestamp', 'y': 'Value'})
+    if low is not None:
+        # Min/max of each rollup bucket as a band behind the average
+        fig.add_scatter(x=x, y=high, mode='lines', line=dict(width=0), showlegend=False, hoverinfo='skip')
+        fig.add_scatter(x=x, y=low, mode='lines', line=dict(width=0), fill='tonexty',
+                        fillcolor='rgba(99, 110, 250, 0.2)', showlegend=False, hoverinfo='skip')
+    return fig
+
+
+def render_state(last, tier, series, selected_range, selected_file):
+    """What the page shows, kept in the usage-state store."""
+    return {
+        'file': selected_file,
+        'range': selected_range,
+        'tier': tier,
+        'last': pd.Timestamp(last).isoformat() if last is not None else None,
+        'metrics': sorted(series),
+    }
+
+
+def build_latest_cards(usage_store):
+    # Latest metric status cards
+    latest_cards = []
+    for metric, (value, threshold) in usage_store.latest().items():
+        is_good = True
+        if 'CPU' in metric:
+            is_good = value <= 85
+        elif 'Memory' in metric:
+            is_good = (value / threshold) <= 0.85
+        elif 'Free Space' in metric:
+            is_good = (value / threshold) >= 0.15
+
+        bar_color = "green" if is_good else "red"
+
+        latest_cards.append(
+            html.Div([
+                html.H4(metric, style={"textAlign": "center"}),
+                html.P(f"Value: {value:.2f} GB" if 'Memory' in metric or 'Free Space' in metric else f"Value: {value:.2f}%", style={"textAlign": "center"}),
+                html.P(f"Threshold: {threshold:.2f} GB" if 'Memory' in metric or 'Free Space' in metric else f"Threshold: {threshold:.2f}%", style={"textAlign": "center"}),
+                html.Div(style={
+                    "height": "10px",
+                    "width": "100%",
+                    "backgroundColor": bar_color,
+                    "marginTop": "10px",
+                    "borderRadius": "5px"
+                })
+            ], style={
+                "padding": "20px",
+                "border": "1px solid #ddd",
+                "borderRadius": "10px",
+                "margin": "10px",
+                "minWidth": "200px",
+                "textAlign": "center",
+                "boxShadow": "0 2px 4px rgba(0,0,0,0.1)"
+            })
+        )
+    return latest_cards
+
+
+def build_metric_cards(usage_store, series, fits=None):
+    fits = fits or {}
+    metric_cards = []
+    thresholds = usage_store.thresholds()
+    empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32), None, None)
+
+    # CPU
+    cpu_times, cpu_values, cpu_low, cpu_high = series.get('CPU Usage', empty)
+    cpu_fig = line_figure(cpu_times, cpu_values, "CPU Usage", cpu_low, cpu_high)
+    cpu_fig.update_layout(yaxis=dict(range=[0, 100]))
+    if len(cpu_times):
+        cpu_fig.add_hline(y=85, line_dash="dot", annotation_text="CPU Threshold", line_color="red")
+    metric_cards.append(html.Div([
+        html.H2("CPU Usage", style={"textAlign": "center"}),
+        metric_graph('CPU Usage', cpu_fig)
+    ], className="metric-card"))
+
+    # Memory
+    mem_times, mem_values, mem_low, mem_high = series.get('Memory Usage', empty)
+    mem_fig = line_figure(mem_times, mem_values, "Memory Usage (GB)", mem_low, mem_high)
+    if len(mem_times):
+        mem_threshold = thresholds['Memory Usage']
+        mem_peak = mem_high if mem_high is not None else mem_values
+        max_mem = max(mem_threshold * 1.1, float(mem_peak.max()) * 1.1)
+        mem_fig.update_layout(yaxis=dict(range=[0, max_mem]))
+        mem_fig.add_hline(y=mem_threshold, line_dash="dot", annotation_text="Memory Threshold", line_color="red")
+    metric_cards.append(html.Div([
+        html.H2("Memory Usage", style={"textAlign": "center"}),
+        metric_graph('Memory Usage', mem_fig)
+    ], className="metric-card"))
+
+    # Disks
+    disk_metrics = sorted(m for m in series if 'Free Space' in m)
+    max_disk_threshold = max((thresholds[m] for m in disk_metrics), default=1)
+
+    for disk_metric in disk_metrics:
+        times, values, low, high = series[disk_metric]
+        fig = line_figure(times, values, f"{disk_metric}", low, high)
+        fig.update_traces(line=dict(color='blue'))
+        fig.add_hline(y=thresholds[disk_metric], line_dash="dash", line_color="red", annotation_text="Threshold")
+        fig.update_layout(yaxis=dict(range=[0, max_disk_threshold * 1.1]))
         metric_cards.append(html.Div([
-            html.H2("Memory Usage", style={"textAlign": "center"}),
-            dcc.Graph(figure=mem_fig, config={'displayModeBar': False}, style={"height": "300px"})
+            html.H2(disk_metric, style={"textAlign": "center"}),
+            html.P(forecast.describe(fits.get(disk_metric)), style={"textAlign": "center", "margin": "0"}),
+            metric_graph(disk_metric, fig)
         ], className="metric-card"))
+    return metric_cards
 
-        # Disks
-        disk_df = df[df['Metric'].str.contains('Free Space')]
-        max_disk_threshold = disk_df['Threshold'].max() if not disk_df.empty else 1
-
-        for disk_metric in sorted(disk_df['Metric'].unique()):
-            sub_df = disk_df[disk_df['Metric'] == disk_metric]
-            if sub_df.empty:
-                continue
-            fig = px.line(sub_df, x="Timestamp", y="Value", title=f"{disk_metric}")
-            fig.update_traces(line=dict(color='blue'))
-            fig.add_hline(y=sub_df['Threshold'].iloc[-1], line_dash="dash", line_color="red", annotation_text="Threshold")
-            fig.update_layout(yaxis=dict(range=[0, max_disk_threshold * 1.1]))
-            metric_cards.append(html.Div([
-                html.H2(disk_metric, style={"textAlign": "center"}),
-                dcc.Graph(figure=fig, config={'displayModeBar': False}, style={"height": "300px"})
-            ], className="metric-card"))
-
-        # Latest metric status cards
-        latest_cards = []
-        for _, row in latest.iterrows():
-            metric = row['Metric']
-            is_good = True
-            if 'CPU' in metric:
-                is_good = row['Value'] <= 85
-            elif 'Memory' in metric:
-                is_good = (row['Value'] / row['Threshold']) <= 0.85
-            elif 'Free Space' in metric:
-                is_good = (row['Value'] / row['Threshold']) >= 0.15
-
-            bar_color = "green" if is_good else "red"
-
-            latest_cards.append(
-                html.Div([
-                    html.H4(metric, style={"textAlign": "center"}),
-                    html.P(f"Value: {row['Value']:.2f} GB" if 'Memory' in metric or 'Free Space' in metric else f"Value: {row['Value']:.2f}%", style={"textAlign": "center"}),
-                    html.P(f"Threshold: {row['Threshold']:.2f} GB" if 'Memory' in metric or 'Free Space' in metric else f"Threshold: {row['Threshold']:.2f}%", style={"textAlign": "center"}),
-                    html.Div(style={
-                        "height": "10px",
-                        "width": "100%",
-                        "backgroundColor": bar_color,
-                        "marginTop": "10px",
-                        "borderRadius": "5px"
-                    })
-                ], style={
-                    "padding": "20px",
-                    "border": "1px solid #ddd",
-                    "borderRadius": "10px",
-                    "margin": "10px",
-                    "minWidth": "200px",
-                    "textAlign": "center",
-                    "boxShadow": "0 2px 4px rgba(0,0,0,0.1)"
-                })
-            )
 
-        return metric_cards, latest_cards
+def build_forecast_summary(all_fits):
+    risky = forecast.at_risk(all_fits)
+    if risky:
+        rows = [
+            html.P(f"{csv_file_paths.get(path, path)} {metric.split(':')[0]}: {forecast.describe(fit)}",
+                   style={"textAlign": "center", "color": "red" if fit.days_to_full <= 7 else "inherit"})
+            for path, metric, fit in risky
+        ]
+    else:
+        rows = [html.P(f"No drive projected to fill within {forecast.AT_RISK_DAYS:.0f} days", style={"textAlign": "center"})]
+    return html.Div([html.H4("Drives at risk", style={"textAlign": "center"}), *rows], style={
+        "padding": "20px",
+        "border": "1px solid #ddd",
+        "borderRadius": "10px",
+        "margin": "10px",
+        "minWidth": "300px",
+        "textAlign": "center",
+        "boxShadow": "0 2px 4px rgba(0,0,0,0.1)"
+    })
+
+
+@instrument.timed('callback')
+def update_dashboard(selected_range, selected_file):
+    """Full rebuild, when the environment or time range changes."""
+    usage_store = store.get_store(selected_file)
+    tier, series, last = select(usage_store, selected_range)
+    fits = forecast.forecasts([selected_file]).get(selected_file)
+    return (build_metric_cards(usage_store, series, fits), build_latest_cards(usage_store),
+            render_state(last, tier, series, selected_range, selected_file))
+
+
+@instrument.timed('callback')
+def extend_dashboard(n, event, state, selected_range, selected_file):
+    """File change or interval refresh: append the samples that arrived since the last render.
+
+    Windowed ranges cap each trace at the window's point count, so old points drop off the front.
+    Falls back to a full rebuild when a metric appears or disappears, or, for ranges drawn from
+    rollups, when a new bucket starts (until then only the latest cards change).
+    """
+    if ctx.triggered_id == 'usage-events' and event['file'] != selected_file:
+        raise PreventUpdate
+    if not state or state['file'] != selected_file or state['range'] != selected_range or not state['last']:
+        raise PreventUpdate
+    usage_store = store.get_store(selected_file)
+    shown = pd.Timestamp(state['last']).value
+    tier, series, last = select(usage_store, selected_range)
+    if last is None or last <= shown:
+        raise PreventUpdate
+
+    graphs = [output['id']['metric'] for output in ctx.outputs_list[3]]
+    rebuild = sorted(series) != state['metrics'] or tier != state.get('tier')
+    if tier is not None and not rebuild:
+        width = dict((name, seconds) for name, seconds, _ in store.TIERS)[tier] * 10 ** 9
+        if last // width == shown // width:
+            return (no_update, build_latest_cards(usage_store), no_update, [no_update] * len(graphs))
+        rebuild = True
+    if rebuild:
+        fits = forecast.forecasts([selected_file]).get(selected_file)
+        return (build_metric_cards(usage_store, series, fits), build_latest_cards(usage_store),
+                render_state(last, tier, series, selected_range, selected_file), [no_update] * len(graphs))
+
+    windowed = TIME_OPTIONS[selected_range] is not None
+    extend = []
+    for metric in graphs:
+        # Raw samples here, so the selected window holds everything newer than what is drawn
+        times, values, _, _ = series[metric]
+        new = np.searchsorted(times, shown, side='right')
+        times, values = times[new:], values[new:]
+        if not len(times):
+            extend.append(no_update)
+            continue
+        update = {
+            'x': [store.to_datetime(times).astype('datetime64[ms]').tolist()],
+            'y': [values.astype(np.float64).round(4).tolist()],
+        }
+        extend.append((update, [0], len(series[metric][0])) if windowed else (update, [0]))
+
+    return (no_update, build_latest_cards(usage_store),
+            render_state(last, tier, series, selected_range, selected_file), extend)
+
+
+@instrument.timed('callback')
+def update_forecast_summary(state):
+    """Runs after every render of the page; only environments with a new hourly bucket are refitted."""
+    return build_forecast_summary(forecast.forecasts(list(csv_file_paths)))
+
+
+def usage_events():
+    """Server-sent events: one `data: {"file", "version"}` message per changed usage file.
+
+    503 once EVENT_STREAMS streams are open in this process; the browser then stops retrying and
+    the page falls back to polling.
+    """
+    if not _event_slots.acquire(blocking=False):
+        return Response('Too many event streams\n', status=503, mimetype='text/plain')
+    file_watcher = watcher.get_watcher(csv_file_paths)
+
+    def stream():
+        try:
+            sequence = file_watcher.sequence
+            deadline = time.monotonic() + EVENT_STREAM_SECONDS
+            yield "retry: 5000\n\n"
+            while time.monotonic() < deadline:
+                sequence, changed = file_watcher.wait(sequence, timeout=min(15, max(0, deadline - time.monotonic())))
+                if not changed:
+                    yield ": keep-alive\n\n"
+                for path, version in changed.items():
+                    yield f"data: {json.dumps({'file': path, 'version': version})}\n\n"
+        finally:
+            # Also runs when the server closes the response after the client went away
+            _event_slots.release()
+
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+def register_callbacks(app):
+    app.callback(
+        Output('metrics-grid-container', 'children'),
+        Output('latest-values', 'children'),
+        Output('usage-state', 'data'),
+        Input('time-range-dropdown', 'value'),
+        Input('file-selector', 'value')
+    )(update_dashboard)
+
+    app.callback(
+        Output('metrics-grid-container', 'children', allow_duplicate=True),
+        Output('latest-values', 'children', allow_duplicate=True),
+        Output('usage-state', 'data', allow_duplicate=True),
+        Output({'type': 'usage-graph', 'metric': ALL}, 'extendData'),
+        Input('refresh-interval', 'n_intervals'),
+        Input('usage-events', 'data'),
+        State('usage-state', 'data'),
+        State('time-range-dropdown', 'value'),
+        State('file-selector', 'value'),
+        prevent_initial_call=True
+    )(extend_dashboard)
+
+    app.callback(
+        Output('forecast-summary', 'children'),
+        Input('usage-state', 'data')
+    )(update_forecast_summary)
+
+    # Opens the event stream once per browser tab; the interval only runs while it is down
+    app.clientside_callback(
+        ClientsideFunction(namespace='usage', function_name='connect'),
+        Output('refresh-interval', 'disabled'),
+        Input('file-selector', 'value')
+    )
+    # ...and closes it when the tab navigates away from /usage
+    app.clientside_callback(
+        ClientsideFunction(namespace='usage', function_name='disconnect'),
+        Input('url', 'pathname')
+    )
+    app.server.add_url_rule('/usage/events', view_func=usage_events)
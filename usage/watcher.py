@@ -0,0 +1,101 @@
+"""
+Change notifications for the usage CSV files.
+
+watchdog (inotify on Linux, ReadDirectoryChangesW on Windows) is used when installed, otherwise
+the files are polled with os.stat every WATCH_INTERVAL seconds. WATCH_MODE=poll forces polling,
+e.g. for files on a network share where native notifications are not delivered.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # optional, falls back to polling
+    Observer = None
+
+WATCH_INTERVAL = float(os.getenv("WATCH_INTERVAL", "2"))
+WATCH_MODE = os.getenv("WATCH_MODE", "auto")
+
+_watcher = None
+_watcher_lock = threading.Lock()
+
+
+class FileWatcher:
+    """Tracks a set of files and wakes up waiters when any of them changes."""
+
+    def __init__(self, paths):
+        # Absolute path -> the path as configured (what the page uses as dropdown value)
+        self.paths = {os.path.abspath(p): p for p in paths if p}
+        self.versions = dict.fromkeys(self.paths.values(), 0)
+        self.sequence = 0
+        self.recent = deque(maxlen=256)  # (sequence, path)
+        self.changed = threading.Condition()
+
+    def notify(self, changed_path):
+        path = self.paths.get(os.path.abspath(changed_path))
+        if path is None:
+            return
+        with self.changed:
+            self.sequence += 1
+            self.versions[path] += 1
+            self.recent.append((self.sequence, path))
+            self.changed.notify_all()
+
+    def wait(self, after, timeout):
+        """Block until something changes after sequence `after`; returns (sequence, {path: version})."""
+        with self.changed:
+            self.changed.wait_for(lambda: self.sequence > after, timeout)
+            paths = {path for sequence, path in self.recent if sequence > after}
+            return self.sequence, {path: self.versions[path] for path in paths}
+
+    def start(self):
+        if Observer is not None and WATCH_MODE != "poll":
+            self._start_observer()
+        else:
+            threading.Thread(target=self._poll, name="usage-watcher", daemon=True).start()
+
+    def _start_observer(self):
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if not event.is_directory:
+                    watcher.notify(getattr(event, "dest_path", "") or event.src_path)
+
+        observer = Observer()
+        for directory in {os.path.dirname(p) for p in self.paths}:
+            if os.path.isdir(directory):
+                observer.schedule(Handler(), directory, recursive=False)
+        observer.daemon = True
+        observer.start()
+
+    def _poll(self):
+        def stat(path):
+            try:
+                info = os.stat(path)
+                return info.st_mtime_ns, info.st_size
+            except OSError:
+                return None
+
+        seen = {path: stat(path) for path in self.paths}
+        while True:
+            time.sleep(WATCH_INTERVAL)
+            for path, previous in seen.items():
+                current = stat(path)
+                if current != previous:
+                    seen[path] = current
+                    self.notify(path)
+
+
+def get_watcher(paths):
+    """The process-wide watcher, started on first use (so nothing runs before a gunicorn fork)."""
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None:
+            _watcher = FileWatcher(paths)
+            _watcher.start()
+        return _watcher
@@ -0,0 +1,7 @@
+"""
+WSGI entry point for multi-worker servers:
+
+    gunicorn -c gunicorn.conf.py wsgi:server
+"""
+
+from app import server  # noqa: F401